@@ -0,0 +1,91 @@
+"""
+Mede o tempo de abertura da interface gráfica, do início do processo até a
+janela ser exibida, em processos novos do Python (sem módulos já carregados).
+
+Uso:
+    python benchmark_inicializacao.py [--repeticoes N] [--importacoes]
+
+Sem display disponível, mede apenas a importação dos módulos da interface.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+META_MS = 300
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Executado em um processo novo: imprime o tempo em ms até a janela aparecer
+# (ou até o fim das importações, se não houver display)
+SCRIPT_MEDICAO = r"""
+import time
+inicio = time.perf_counter()
+import tkinter as tk
+import gui
+importado = time.perf_counter()
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("importacao", (importado - inicio) * 1000)
+else:
+    gui.CompiladorJuridicoGUI(root)
+    root.update()
+    print("janela", (time.perf_counter() - inicio) * 1000)
+    root.destroy()
+"""
+
+
+def medir(repeticoes):
+    """
+    Executa a medição em `repeticoes` processos novos.
+
+    Returns:
+        tuple: (etapa medida — "janela" ou "importacao", lista de tempos em ms)
+    """
+    tempos = []
+    etapa = None
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", SCRIPT_MEDICAO], cwd=BASE_DIR,
+                               capture_output=True, text=True, check=True).stdout
+        etapa, tempo = saida.strip().splitlines()[-1].split()
+        tempos.append(float(tempo))
+    return etapa, tempos
+
+
+def importacoes_mais_lentas(quantidade=10):
+    """Módulos com maior tempo de importação acumulado (python -X importtime)."""
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import gui"], cwd=BASE_DIR,
+                           capture_output=True, text=True, check=True).stderr
+    tempos = []
+    for linha in saida.splitlines()[1:]:
+        partes = linha.split("|")
+        if len(partes) == 3:
+            tempos.append((int(partes[1]), partes[2].strip()))
+    return sorted(tempos, reverse=True)[:quantidade]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de abertura da interface gráfica")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--importacoes", action="store_true",
+                        help="lista também os módulos mais lentos de importar")
+    args = parser.parse_args()
+
+    etapa, tempos = medir(args.repeticoes)
+    mediana = statistics.median(tempos)
+    descricao = "até a janela ser exibida" if etapa == "janela" else "importação (sem display)"
+    print(f"Tempo {descricao}: mediana {mediana:.0f} ms "
+          f"(mín. {min(tempos):.0f} ms, máx. {max(tempos):.0f} ms, {len(tempos)} execuções)")
+    print(f"Meta: {META_MS} ms — {'atingida' if mediana <= META_MS else 'NÃO atingida'}")
+
+    if args.importacoes:
+        print("\nImportações mais lentas (tempo acumulado):")
+        for microssegundos, modulo in importacoes_mais_lentas():
+            print(f"  {microssegundos / 1000:7.1f} ms  {modulo}")
+    return 0 if mediana <= META_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
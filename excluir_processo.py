@@ -1,6 +1,8 @@
 import os
 from src.config import LISTA_TJ_FILE, LISTA_TRF_FILE, RESULTADO_TJ_FILE, RESULTADO_TRF_FILE
-from src.utils.file_handler import carregar_arquivo_json, salvar_arquivo_json
+from src.utils.arquivamento import abrir_arquivados
+from src.utils.file_handler import abrir_armazenamento, salvar_lista_processos
+from src.utils.registro import RegistroProcessos, descrever_operacao, obter_registro
 from src.models.processo import Processo
 
 def excluir_processo(numero_processo, tipo, excluir_resultados=True):
@@ -53,24 +55,20 @@ def excluir_processo_da_lista(numero_processo, arquivo_lista):
     Returns:
         bool: True se a operação foi bem-sucedida, False caso contrário
     """
-    # Carregar a lista atual
-    lista = carregar_arquivo_json(arquivo_lista)
-    
-    # Verificar se o processo existe na lista
-    if numero_processo not in lista:
-        print(f"Processo {numero_processo} não encontrado na lista.")
+    # Remover pelo registro compartilhado do tribunal (o mesmo da GUI e do menu),
+    # para que o índice em memória não fique desatualizado; uma única gravação
+    registro = obter_registro("TJ" if arquivo_lista == LISTA_TJ_FILE else "TRF")
+    if os.path.abspath(registro.caminho) != os.path.abspath(arquivo_lista):
+        registro = RegistroProcessos(registro.tipo, arquivo_lista)
+    resumo = registro.remover([numero_processo])
+    if "erro" in resumo:
+        print(f"Erro ao salvar a lista após remover o processo {numero_processo}: {resumo['erro']}")
         return False
-    
-    # Remover o processo da lista
-    lista.remove(numero_processo)
-    
-    # Salvar a lista atualizada
-    if salvar_arquivo_json(arquivo_lista, lista):
-        print(f"Processo {numero_processo} removido da lista com sucesso.")
-        return True
-    else:
-        print(f"Erro ao salvar a lista após remover o processo {numero_processo}.")
+    if not resumo["removidos"]:
+        print(f"Processo {numero_processo} não encontrado na lista.")
         return False
+    print(f"Processo {numero_processo} removido da lista com sucesso.")
+    return True
 
 def excluir_processo_dos_resultados(numero_processo, arquivo_resultados):
     """
@@ -83,29 +81,52 @@ def excluir_processo_dos_resultados(numero_processo, arquivo_resultados):
     Returns:
         bool: True se a operação foi bem-sucedida, False caso contrário
     """
-    # Verificar se o arquivo de resultados existe
-    if not os.path.exists(arquivo_resultados):
-        print(f"Arquivo de resultados {arquivo_resultados} não encontrado.")
+    # Abrir o armazenamento de resultados e a camada de arquivados (apenas os
+    # índices são carregados; um arquivo JSON de versões anteriores é migrado
+    # na primeira abertura)
+    resultados = abrir_armazenamento(arquivo_resultados)
+    arquivados = abrir_arquivados(arquivo_resultados)
+    
+    # Remover o processo dos resultados (grava apenas um registro de exclusão);
+    # o resumo de uma resposta descartada pelo limite do cache também é removido
+    try:
+        removidos = resultados.remover_varios([numero_processo]) + arquivados.remover_varios([numero_processo])
+        if not removidos:
+            print(f"Processo {numero_processo} não encontrado nos resultados.")
+            return False
+        print(f"Processo {numero_processo} removido dos resultados com sucesso.")
+        return True
+    except Exception as e:
+        print(f"Erro ao salvar os resultados após remover o processo {numero_processo}: {str(e)}")
         return False
+
+def excluir_varios_processos(numeros, tipo, excluir_resultados=True):
+    """
+    Exclui vários processos da lista com uma única gravação e, opcionalmente,
+    seus resultados.
     
-    # Carregar o dicionário de resultados
-    resultados = carregar_arquivo_json(arquivo_resultados)
-    
-    # Verificar se o processo existe nos resultados
-    if numero_processo not in resultados:
-        print(f"Processo {numero_processo} não encontrado nos resultados.")
-        return False
+    Args:
+        numeros (list): Números dos processos a excluir
+        tipo (str): Tipo dos processos ('TJ' ou 'TRF')
+        excluir_resultados (bool): Se True, também remove os resultados dos processos
+        
+    Returns:
+        dict: Resumo da operação (removidos, ausentes e invalidos)
+    """
+    tipo = tipo.upper()
+    if tipo not in ["TJ", "TRF"]:
+        print("Erro: Tipo de processo inválido. Use 'TJ' ou 'TRF'.")
+        return {"removidos": [], "ausentes": [], "invalidos": list(numeros), "erro": "Tipo inválido"}
     
-    # Remover o processo dos resultados
-    del resultados[numero_processo]
+    resumo = obter_registro(tipo).remover(numeros)
+    print(f"Processos {tipo}: {descrever_operacao(resumo)}.")
     
-    # Salvar o dicionário atualizado
-    if salvar_arquivo_json(arquivo_resultados, resultados):
-        print(f"Processo {numero_processo} removido dos resultados com sucesso.")
-        return True
-    else:
-        print(f"Erro ao salvar os resultados após remover o processo {numero_processo}.")
-        return False
+    if excluir_resultados and resumo["removidos"]:
+        arquivo_resultados = RESULTADO_TJ_FILE if tipo == "TJ" else RESULTADO_TRF_FILE
+        removidos = (abrir_armazenamento(arquivo_resultados).remover_varios(resumo["removidos"])
+                     + abrir_arquivados(arquivo_resultados).remover_varios(resumo["removidos"]))
+        print(f"{removidos} resultados removidos.")
+    return resumo
 
 def excluir_todos_processos(tipo, confirmar=True):
     """
@@ -135,16 +156,19 @@ def excluir_todos_processos(tipo, confirmar=True):
             print("Operação cancelada.")
             return False
     
-    # Criar listas vazias
+    # Criar lista vazia
     lista_vazia = []
-    resultados_vazios = {}
     
-    # Salvar arquivos vazios
-    sucesso_lista = salvar_arquivo_json(arquivo_lista, lista_vazia)
+    # Salvar lista vazia e limpar os resultados
+    sucesso_lista = salvar_lista_processos(arquivo_lista, lista_vazia)
     sucesso_resultados = True
     
-    if os.path.exists(arquivo_resultados):
-        sucesso_resultados = salvar_arquivo_json(arquivo_resultados, resultados_vazios)
+    try:
+        abrir_armazenamento(arquivo_resultados).limpar()
+        abrir_arquivados(arquivo_resultados).limpar()
+    except Exception as e:
+        print(f"Erro ao limpar os resultados: {str(e)}")
+        sucesso_resultados = False
     
     if sucesso_lista and sucesso_resultados:
         print(f"Todos os processos {tipo} foram excluídos com sucesso.")
@@ -157,7 +181,8 @@ if __name__ == "__main__":
     # Exemplo de uso do script
     print("===== EXCLUSÃO DE PROCESSOS =====")
     print("1. Excluir um processo específico")
-    print("2. Excluir todos os processos de um tipo")
+    print("2. Excluir vários processos")
+    print("3. Excluir todos os processos de um tipo")
     
     opcao = input("\nEscolha uma opção: ")
     
@@ -169,6 +194,13 @@ if __name__ == "__main__":
         excluir_processo(numero, tipo, excluir_resultados)
         
     elif opcao == "2":
+        tipo = input("Digite o tipo dos processos (TJ ou TRF): ")
+        numeros = input("Digite os números dos processos separados por vírgula ou espaço: ")
+        excluir_resultados = input("Excluir também os resultados? (s/n): ").lower() == 's'
+        
+        excluir_varios_processos(numeros.replace(",", " ").split(), tipo, excluir_resultados)
+        
+    elif opcao == "3":
         tipo = input("Digite o tipo de processos a excluir (TJ ou TRF): ")
         excluir_todos_processos(tipo)
         
@@ -1,18 +1,15 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
-import requests
 import json
-from datetime import datetime
 import os
 
 
-from src.config import LISTA_TJ_FILE, LISTA_TRF_FILE
-from src.utils.file_handler import carregar_arquivo_json
+from src.utils.registro import obter_registro, descrever_operacao
+from src.utils.importacao import importar_processos
 from src.models.processo import Processo
-from src.api.tjmg import consultar_processo_tjmg, consultar_todos_processos_tjmg
-from src.api.trf6 import consultar_processo_trf6, consultar_todos_processos_trf6
-from src.models.gerador_pdf_file import GeradorPDF
+from src.models.resumo import obter_resumo, linhas_resumo
+from src.utils.alteracoes import carregar_alteracoes, linhas_alteracoes
 from excluir_processo import excluir_processo, excluir_todos_processos
 
 class CompiladorJuridicoGUI:
@@ -27,6 +24,7 @@ class CompiladorJuridicoGUI:
         self.resultado_consulta_individual_numero = ""
         self.resultado_consulta_individual_tipo = ""
         self.resultados_consulta_lote = {}
+        self.alteracoes_consulta_lote = []
         self.ultimo_tipo_consulta_lote = ""
 
         # Criar abas
@@ -89,6 +87,10 @@ class CompiladorJuridicoGUI:
         button_frame = ttk.Frame(frame)
         button_frame.grid(row=6, column=0, columnspan=3, padx=5, pady=10, sticky="w")
         
+        # Botão para importar processos de um arquivo
+        self.importar_button = ttk.Button(button_frame, text="Importar de Arquivo...", command=self.importar_arquivo)
+        self.importar_button.pack(side="left", padx=5)
+        
         # Botão para abrir o manual do usuário
         self.manual_button = ttk.Button(button_frame, text="Manual do Usuário", command=self.abrir_manual)
         self.manual_button.pack(side="left", padx=5)
@@ -113,8 +115,12 @@ class CompiladorJuridicoGUI:
         ttk.Radiobutton(individual_frame, text="TJ", variable=self.consulta_tipo_var, value="TJ").grid(row=1, column=1, sticky="w", padx=5, pady=5)
         ttk.Radiobutton(individual_frame, text="TRF", variable=self.consulta_tipo_var, value="TRF").grid(row=2, column=1, sticky="w", padx=5, pady=5)
         
+        # Ignorar o resultado em cache e consultar novamente a API
+        self.forcar_atualizacao_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(individual_frame, text="Forçar nova consulta (ignorar cache)", variable=self.forcar_atualizacao_var).grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
         button_frame = ttk.Frame(individual_frame)
-        button_frame.grid(row=3, column=0, columnspan=2, padx=5, pady=10)
+        button_frame.grid(row=4, column=0, columnspan=2, padx=5, pady=10)
         
         self.consultar_button = ttk.Button(button_frame, text="Consultar", command=self.consultar_processo)
         self.consultar_button.pack(side="left", padx=5)
@@ -148,6 +154,14 @@ class CompiladorJuridicoGUI:
         self.gerar_pdf_trf_button.pack(side="left", padx=5)
         self.gerar_pdf_trf_button.config(state="disabled")  # Desabilitado inicialmente
         
+        # Opção de sincronização incremental (somente processos alterados desde a última consulta)
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(lote_frame, text="Somente alterações desde a última consulta", variable=self.incremental_var).grid(row=1, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 10))
+        
+        # Processos encerrados ficam na camada de arquivados e, por padrão, não são consultados
+        self.incluir_arquivados_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(lote_frame, text="Incluir processos arquivados (encerrados)", variable=self.incluir_arquivados_var).grid(row=2, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 10))
+        
         # Frame de resultados
         resultado_frame = ttk.LabelFrame(self.consulta_frame, text="Resultados")
         resultado_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -231,42 +245,62 @@ class CompiladorJuridicoGUI:
         
         # Validar o número do processo
         if not Processo.validar_numero(numero):
-            messagebox.showerror("Erro", "Número de processo inválido. Deve conter exatamente 20 dígitos numéricos.")
+            messagebox.showerror("Erro", "Número de processo inválido. Deve conter exatamente 20 dígitos numéricos e dígito verificador válido.")
             return
         
         try:
             # Criar objeto Processo para validação
             processo = Processo(numero, tipo)
             
-            # Determinar qual arquivo usar
-            arquivo = LISTA_TJ_FILE if processo.tipo == "TJ" else LISTA_TRF_FILE
-            
-            # Carregar lista atual
-            lista = carregar_arquivo_json(arquivo)
-            
-            # Verificar se já existe
-            if numero in lista:
+            # Incluir no registro do tribunal (verificação de duplicidade em O(1))
+            resumo = obter_registro(processo.tipo).adicionar([numero])
+            if resumo["existentes"]:
                 self.append_log(f"Processo {tipo} {numero} já existe na lista.")
-                return
-            
-            # Adicionar à lista
-            lista.append(numero)
-            
-            # Importar a função só quando necessário para evitar circular imports
-            from src.utils.file_handler import salvar_arquivo_json
-            
-            # Salvar lista atualizada
-            if salvar_arquivo_json(arquivo, lista):
+            elif resumo["adicionados"]:
                 self.append_log(f"Processo {tipo} {numero} adicionado com sucesso.")
                 self.processo_entry.delete(0, tk.END)  # Limpar entrada
                 # Atualizar estatísticas
                 self.exibir_estatisticas()
             else:
-                self.append_log("Erro ao salvar o arquivo.")
+                self.append_log(f"Erro ao salvar o arquivo: {resumo.get('erro', '')}")
                 
         except (ValueError, OSError, IOError, json.JSONDecodeError) as e:
             self.append_log(f"Erro: {str(e)}")
 
+    def importar_arquivo(self):
+        """Importar processos de um arquivo TXT, CSV ou XLSX"""
+        caminho = filedialog.askopenfilename(
+            title="Importar processos",
+            filetypes=[("Planilhas e textos", "*.xlsx *.csv *.txt"), ("Todos os arquivos", "*.*")]
+        )
+        if not caminho:
+            return
+        
+        self.importar_button.config(state="disabled")
+        self.status_var.set(f"Importando processos de {os.path.basename(caminho)}...")
+        threading.Thread(target=self._importar_arquivo_thread, args=(caminho,), daemon=True).start()
+    
+    def _importar_arquivo_thread(self, caminho):
+        """Thread para importação de processos de arquivo"""
+        def registrar(texto):
+            self.root.after(0, self.append_log, texto)
+        
+        try:
+            resumo = importar_processos(caminho)
+            registrar(f"Importação de {os.path.basename(caminho)}:")
+            for tipo in ("TJ", "TRF"):
+                registrar(f"Processos {tipo}: {descrever_operacao(resumo[tipo])}.")
+            if resumo["outros_tribunais"]:
+                registrar(f"Números de outros tribunais ignorados: {len(resumo['outros_tribunais'])}")
+            if resumo["invalidos"]:
+                registrar(f"Números em formato inválido ignorados: {resumo['invalidos']}")
+            self.root.after(0, self.exibir_estatisticas)
+        except (OSError, ValueError, ImportError) as e:
+            registrar(f"Erro ao importar o arquivo: {str(e)}")
+        finally:
+            self.status_var.set("Pronto")
+            self.root.after(0, lambda: self.importar_button.config(state="normal"))
+    
     def abrir_manual(self):
         """Abrir o manual do usuário em PDF"""
         import sys
@@ -316,7 +350,7 @@ class CompiladorJuridicoGUI:
         
         # Validar o número do processo
         if not Processo.validar_numero(numero):
-            messagebox.showerror("Erro", "Número de processo inválido. Deve conter exatamente 20 dígitos numéricos.")
+            messagebox.showerror("Erro", "Número de processo inválido. Deve conter exatamente 20 dígitos numéricos e dígito verificador válido.")
             return
         
         # Limpar resultado anterior e desabilitar botão de PDF
@@ -335,371 +369,48 @@ class CompiladorJuridicoGUI:
         self.root.update_idletasks()
         
         # Usar thread para não bloquear a interface durante a consulta
-        threading.Thread(target=self._consultar_processo_thread, args=(numero, tipo)).start()
+        threading.Thread(target=self._consultar_processo_thread, args=(numero, tipo, self.forcar_atualizacao_var.get())).start()
     
-    def _consultar_processo_thread(self, numero, tipo):
+    def _consultar_processo_thread(self, numero, tipo, forcar_atualizacao=False):
         """Thread para consulta de processo"""
+        # requests e as APIs só são importados na primeira consulta, para não atrasar a abertura da janela
+        import requests
         try:
             if tipo == "TJ":
-                resultado = consultar_processo_tjmg(numero)
-                # Verificar se houve erro na consulta
-                if "erro" in resultado:
-                    self.update_resultado_text(f"Erro na consulta: {resultado['erro']}\n")
-                else:
-                    self.update_resultado_text("Consulta realizada com sucesso!\n\n")
-                    
-                    # Exibir informações específicas para processos TJ no formato solicitado
-                    if "hits" in resultado and "total" in resultado["hits"]:
-                        total = resultado["hits"]["total"]["value"]
-                        
-                        # Verificar se foram encontrados resultados
-                        if total > 0 and "hits" in resultado["hits"]:
-                            hits = resultado["hits"]["hits"]
-                            
-                            # Cabeçalho
-                            self.update_resultado_text("=" * 60 + "\n")
-                            self.update_resultado_text(f"PROCESSO TJ {numero}\n")
-                            self.update_resultado_text("=" * 60 + "\n\n")
-                            
-                            # INFORMAÇÕES BÁSICAS
-                            self.update_resultado_text("INFORMAÇÕES BÁSICAS\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            
-                            # Número do Processo
-                            self.update_resultado_text(f"* Número do Processo: {numero}\n")
-                            
-                            # Tribunal
-                            if len(hits) > 0 and "_source" in hits[0] and "tribunal" in hits[0]["_source"]:
-                                tribunal = hits[0]["_source"]["tribunal"]
-                                self.update_resultado_text(f"* Tribunal: {tribunal}")
-                                if tribunal == "TJMG":
-                                    self.update_resultado_text(" (Tribunal de Justiça de Minas Gerais)\n")
-                                else:
-                                    self.update_resultado_text("\n")
-                            
-                            # Data de Ajuizamento 
-                            if len(hits) > 0 and "_source" in hits[0] and "dataAjuizamento" in hits[0]["_source"]:
-                                data_str = hits[0]["_source"]["dataAjuizamento"]
-                                try:
-                                    data = datetime.strptime(data_str.split("T")[0], "%Y-%m-%d")
-                                    data_formatada = data.strftime("%d/%m/%Y")
-                                    self.update_resultado_text(f"* Data de Ajuizamento: {data_formatada}\n")
-                                except (ValueError, TypeError, IndexError):
-                                    self.update_resultado_text(f"* Data de Ajuizamento: {data_str}\n")
-                            
-                            # Classe Original
-                            primeira_instancia = None
-                            for hit in hits:
-                                if "_source" in hit and "grau" in hit["_source"] and hit["_source"]["grau"] == "G1":
-                                    primeira_instancia = hit["_source"]
-                                    break
-                                    
-                            if primeira_instancia and "classe" in primeira_instancia and "nome" in primeira_instancia["classe"]:
-                                self.update_resultado_text(f"* Classe Original: {primeira_instancia['classe']['nome']} (primeira instância)\n")
-                            
-                            # Formato
-                            formato_convertido = False
-                            if primeira_instancia and "movimentos" in primeira_instancia:
-                                for mov in primeira_instancia["movimentos"]:
-                                    if "codigo" in mov and mov["codigo"] == 14732:  # Conversão de Autos Físicos em Eletrônicos
-                                        formato_convertido = True
-                                        data_conversao = mov.get("dataHora", "").split("T")[0]
-                                        try:
-                                            data = datetime.strptime(data_conversao, "%Y-%m-%d")
-                                            data_formatada = data.strftime("%d/%m/%Y")
-                                            self.update_resultado_text(f"* Formato: Inicialmente Físico, convertido para Eletrônico em {data_formatada}\n")
-                                        except (ValueError, TypeError, IndexError):
-                                            self.update_resultado_text(f"* Formato: Inicialmente Físico, convertido para Eletrônico em {data_conversao}\n")
-                                        break
-                                        
-                            if not formato_convertido and primeira_instancia and "formato" in primeira_instancia and "nome" in primeira_instancia["formato"]:
-                                self.update_resultado_text(f"* Formato: {primeira_instancia['formato']['nome']}\n")
-                            
-                            # Assunto
-                            if primeira_instancia and "assuntos" in primeira_instancia and len(primeira_instancia["assuntos"]) > 0:
-                                self.update_resultado_text(f"* Assunto: {primeira_instancia['assuntos'][0]['nome']}\n")
-                            
-                            # SITUAÇÃO ATUAL
-                            self.update_resultado_text("\nSITUAÇÃO ATUAL\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            
-                            # Última Atualização
-                            if primeira_instancia and "dataHoraUltimaAtualizacao" in primeira_instancia:
-                                data_str = primeira_instancia["dataHoraUltimaAtualizacao"]
-                                try:
-                                    data = datetime.strptime(data_str.split("T")[0], "%Y-%m-%d")
-                                    data_formatada = data.strftime("%d/%m/%Y")
-                                    self.update_resultado_text(f"* Última Atualização: {data_formatada}\n")
-                                except (ValueError, TypeError, IndexError):
-                                    self.update_resultado_text(f"* Última Atualização: {data_str}\n")
-                            
-                            # Status
-                            status = "Em andamento"
-                            data_baixa = ""
-                            if primeira_instancia and "movimentos" in primeira_instancia:
-                                try:
-                                    movimentos = sorted(primeira_instancia["movimentos"], 
-                                                    key=lambda x: x.get("dataHora", ""), 
-                                                    reverse=True)
-                                except (KeyError, TypeError, ValueError, AttributeError):
-                                    movimentos = primeira_instancia["movimentos"]
-                                
-                                for mov in movimentos:
-                                    if "codigo" in mov and mov["codigo"] == 22:  # Baixa Definitiva
-                                        status = "Arquivado definitivamente"
-                                        data_str = mov.get("dataHora", "").split("T")[0]
-                                        try:
-                                            data = datetime.strptime(data_str, "%Y-%m-%d")
-                                            data_baixa = data.strftime("%d/%m/%Y")
-                                        except (ValueError, TypeError, IndexError):
-                                            data_baixa = data_str
-                                        break
-                            
-                            if data_baixa:
-                                self.update_resultado_text(f"* Status: {status} (Baixa Definitiva em {data_baixa})\n")
-                            else:
-                                self.update_resultado_text(f"* Status: {status}\n")
-                            
-                            # Órgão Julgador Original
-                            if primeira_instancia and "orgaoJulgador" in primeira_instancia and "nome" in primeira_instancia["orgaoJulgador"]:
-                                self.update_resultado_text(f"* Órgão Julgador Original: {primeira_instancia['orgaoJulgador']['nome']}\n")
-                            
-                            # HISTÓRICO PROCESSUAL
-                            self.update_resultado_text("\nHISTÓRICO PROCESSUAL\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            self.update_resultado_text("O processo passou por três instâncias/fases:\n")
-                            
-                            # Identificar as diferentes instâncias
-                            instancias = []
-                            for hit in hits:
-                                if "_source" in hit:
-                                    source = hit["_source"]
-                                    if "grau" in source and "classe" in source and "nome" in source["classe"]:
-                                        grau = source["grau"]
-                                        classe = source["classe"]["nome"]
-                                        data_ajuizamento = ""
-                                        if "dataAjuizamento" in source:
-                                            data_str = source["dataAjuizamento"].split("T")[0]
-                                            try:
-                                                data = datetime.strptime(data_str, "%Y-%m-%d")
-                                                data_ajuizamento = data.strftime("%d/%m/%Y")
-                                            except (ValueError, TypeError, IndexError):
-                                                data_ajuizamento = data_str
-                                        
-                                        instancias.append((grau, classe, data_ajuizamento))
-                            
-                            # Exibir instâncias ordenadas
-                            contador = 1
-                            for grau, classe, data in instancias:
-                                desc = ""
-                                if grau == "G1":
-                                    desc = "Primeira Instância (G1)"
-                                elif grau == "G2":
-                                    if "Recurso" in classe or "Agravo" in classe:
-                                        desc = "Recurso (G2)"
-                                    else:
-                                        desc = "Segunda Instância (G2)"
-                                
-                                if data:
-                                    self.update_resultado_text(f"{contador}. **{desc}**: {classe} (iniciada em {data})\n")
-                                else:
-                                    self.update_resultado_text(f"{contador}. **{desc}**: {classe}\n")
-                                contador += 1
-                            
-                            # MOVIMENTAÇÕES IMPORTANTES
-                            self.update_resultado_text("\nMOVIMENTAÇÕES IMPORTANTES\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            
-                            # Coletar movimentações importantes
-                            movimentacoes = []
-                            if primeira_instancia and "movimentos" in primeira_instancia:
-                                for mov in primeira_instancia["movimentos"]:
-                                    if "codigo" in mov and "dataHora" in mov:
-                                        codigo = mov["codigo"]
-                                        nome = mov.get("nome", "")
-                                        data_str = mov["dataHora"].split("T")[0]
-                                        
-                                        # Códigos importantes
-                                        if codigo in [22, 848, 893, 14732, 246]:  # Baixa, Trânsito em julgado, Desarquivamento, Conversão, Arquivamento Definitivo
-                                            try:
-                                                data = datetime.strptime(data_str, "%Y-%m-%d")
-                                                data_formatada = data.strftime("%d/%m/%Y")
-                                            except (ValueError, TypeError, IndexError):
-                                                data_formatada = data_str
-                                                
-                                            movimentacoes.append((data_str, f"* {nome} em {data_formatada}"))
-                            
-                            # Extrair datas de início e fim
-                            data_inicio = ""
-                            data_fim = ""
-                            if len(instancias) > 0:
-                                for grau, classe, data in instancias:
-                                    if grau == "G1" and data:
-                                        data_inicio = data
-                                        break
-                            
-                            # Encontrar data de trânsito em julgado
-                            if primeira_instancia and "movimentos" in primeira_instancia:
-                                for mov in primeira_instancia["movimentos"]:
-                                    if "codigo" in mov and mov["codigo"] == 848:  # Trânsito em julgado
-                                        data_str = mov.get("dataHora", "").split("T")[0]
-                                        try:
-                                            data = datetime.strptime(data_str, "%Y-%m-%d")
-                                            data_fim = data.strftime("%d/%m/%Y")
-                                        except (ValueError, TypeError, IndexError):
-                                            data_fim = data_str
-                                        break
-                            
-                            if data_inicio and data_fim:
-                                self.update_resultado_text(f"* O processo tramitou de {data_inicio} a {data_fim}\n")
-                            
-                            # Exibir movimentações importantes ordenadas por data
-                            try:
-                                movimentacoes.sort(key=lambda x: x[0], reverse=False)  # Ordenar por data (mais antiga primeiro)
-                            except (KeyError, TypeError, ValueError, AttributeError):
-                                # Em caso de erro na ordenação, mantemos a ordem original
-                                pass
-                                
-                            for _, texto in movimentacoes:
-                                self.update_resultado_text(f"{texto}\n")
-                        else:
-                            # Tratamento específico para quando o processo não é encontrado
-                            self.update_resultado_text("=" * 60 + "\n")
-                            self.update_resultado_text(f"PROCESSO {numero}\n")
-                            self.update_resultado_text("=" * 60 + "\n\n")
-                            self.update_resultado_text("PROCESSO NÃO ENCONTRADO\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            self.update_resultado_text(f"A consulta foi realizada com sucesso, mas não há informações sobre o processo {numero} no TJMG.\n")
-                            self.update_resultado_text("\nPossíveis motivos:\n")
-                            self.update_resultado_text("- O número do processo pode estar incorreto\n")
-                            self.update_resultado_text("- O processo pode estar em sigilo\n")
-                            self.update_resultado_text("- O processo pode não existir na base de dados\n")
-                    else:
-                        self.update_resultado_text("Formato de resposta inesperado.\n")
-            
+                from src.api.tjmg import consultar_processo_tjmg
+                resultado = consultar_processo_tjmg(numero, forcar_atualizacao=forcar_atualizacao)
+                nome_tribunal = "TJMG"
             else:  # TRF
-                resultado = consultar_processo_trf6(numero)
-                # Verificar se houve erro na consulta
-                if "erro" in resultado:
-                    self.update_resultado_text(f"Erro na consulta: {resultado['erro']}\n")
+                from src.api.trf6 import consultar_processo_trf6
+                resultado = consultar_processo_trf6(numero, forcar_atualizacao=forcar_atualizacao)
+                nome_tribunal = "TRF"
+
+            # Verificar se houve erro na consulta
+            if "erro" in resultado:
+                self.update_resultado_text(f"Erro na consulta: {resultado['erro']}\n")
+            elif "hits" not in resultado:
+                self.update_resultado_text("Formato de resposta inesperado.\n")
+            else:
+                self.update_resultado_text("Consulta realizada com sucesso!\n\n")
+                # Os dados exibidos vêm do resumo calculado uma única vez por resposta
+                resumo = obter_resumo(numero, resultado)
+
+                # Cabeçalho
+                self.update_resultado_text("=" * 60 + "\n")
+                self.update_resultado_text(f"PROCESSO {tipo} {numero}\n")
+                self.update_resultado_text("=" * 60 + "\n\n")
+
+                if resumo.encontrado:
+                    self.update_resultado_text("\n".join(linhas_resumo(resumo)) + "\n")
                 else:
-                    self.update_resultado_text("Consulta realizada com sucesso!\n\n")
-                    # Exibir informações para processos TRF com formato específico
-                    if "hits" in resultado and "total" in resultado["hits"]:
-                        total = resultado["hits"]["total"]["value"]
-                        
-                        if total > 0 and "hits" in resultado["hits"]:
-                            hits = resultado["hits"]["hits"]
-                            
-                            # Cabeçalho
-                            self.update_resultado_text("=" * 50 + "\n")
-                            self.update_resultado_text(f"PROCESSO TRF {numero}\n")
-                            self.update_resultado_text("=" * 50 + "\n\n")
-                            
-                            # Informações Básicas
-                            self.update_resultado_text("INFORMAÇÕES BÁSICAS:\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            
-                            for hit in hits:
-                                if "_source" in hit:
-                                    source = hit["_source"]
-                                    
-                                    # Número do Processo
-                                    if "numeroProcesso" in source:
-                                        self.update_resultado_text(f"Número do Processo: {source['numeroProcesso']}\n")
-                                    
-                                    # Classe Processual
-                                    if "classeProcessual" in source:
-                                        self.update_resultado_text(f"Classe Processual: {source['classeProcessual']}\n")
-                                    elif "classe" in source and "nome" in source["classe"]:
-                                        self.update_resultado_text(f"Classe Processual: {source['classe']['nome']}\n")
-                                    
-                                    # Data de Ajuizamento
-                                    if "dataAjuizamento" in source:
-                                        self.update_resultado_text(f"Data de Ajuizamento: {source['dataAjuizamento']}\n")
-                                        
-                                    # Sistema
-                                    if "sistema" in source and "nome" in source["sistema"]:
-                                        self.update_resultado_text(f"Sistema: {source['sistema']['nome']}\n")
-                                    
-                                    # Formato
-                                    if "formato" in source and "nome" in source["formato"]:
-                                        self.update_resultado_text(f"Formato: {source['formato']['nome']}\n")
-                                    
-                                    # Assunto
-                                    if "assuntos" in source and len(source["assuntos"]) > 0:
-                                        self.update_resultado_text("Assuntos:\n")
-                                        for i, assunto in enumerate(source["assuntos"]):
-                                            if "nome" in assunto:
-                                                self.update_resultado_text(f"- {assunto['nome']}\n")
-                                    
-                                    # Órgão Julgador
-                                    if "orgaoJulgador" in source:
-                                        if isinstance(source["orgaoJulgador"], dict) and "nome" in source["orgaoJulgador"]:
-                                            self.update_resultado_text(f"Órgão Julgador: {source['orgaoJulgador']['nome']}\n")
-                                        else:
-                                            self.update_resultado_text(f"Órgão Julgador: {source['orgaoJulgador']}\n")
-                                    
-                                    # Situação Atual
-                                    self.update_resultado_text("\nSITUAÇÃO ATUAL:\n")
-                                    self.update_resultado_text("-" * 30 + "\n")
-                                    
-                                    # Última atualização
-                                    if "dataHoraUltimaAtualizacao" in source:
-                                        self.update_resultado_text(f"Última Atualização: {source['dataHoraUltimaAtualizacao']}\n")
-                                    
-                                    # Movimentos
-                                    if "movimentos" in source and len(source["movimentos"]) > 0:
-                                        # Ordenar movimentos por data (mais recente primeiro)
-                                        try:
-                                            movimentos = sorted(source["movimentos"], 
-                                                                key=lambda x: x.get("dataHora", ""), 
-                                                                reverse=True)
-                                        except (KeyError, TypeError, ValueError, AttributeError):
-                                            # Especificamos os tipos de exceção que podem ocorrer ao ordenar
-                                            movimentos = source["movimentos"]
-                                        
-                                        # Último movimento
-                                        if movimentos:
-                                            ultimo_mov = movimentos[0]
-                                            if isinstance(ultimo_mov, dict):
-                                                codigo = ultimo_mov.get("codigo", "N/A")
-                                                nome = ultimo_mov.get("nome", "Não informado")
-                                                data = ultimo_mov.get("dataHora", "Não informada")
-                                                self.update_resultado_text(f"Último Movimento: [{codigo}] {nome} ({data})\n")
-                                        
-                                        # Histórico Recente
-                                        self.update_resultado_text("\nHISTÓRICO RECENTE:\n")
-                                        self.update_resultado_text("-" * 30 + "\n")
-                                        
-                                        # Mostrar até 5 movimentos mais recentes
-                                        cont = 0
-                                        for mov in movimentos:
-                                            if isinstance(mov, dict):
-                                                cont += 1
-                                                codigo = mov.get("codigo", "N/A")
-                                                nome = mov.get("nome", "Não informado")
-                                                data = mov.get("dataHora", "Não informada")
-                                                self.update_resultado_text(f"{cont}. [{codigo}] {nome}\n   Data: {data}\n")
-                                                if cont >= 5:
-                                                    break
-                                    
-                                    # Após processar um hit, saímos do loop para evitar repetição
-                                    break
-                        else:
-                            # Tratamento específico para quando o processo não é encontrado
-                            self.update_resultado_text("=" * 50 + "\n")
-                            self.update_resultado_text(f"PROCESSO TRF {numero}\n")
-                            self.update_resultado_text("=" * 50 + "\n\n")
-                            self.update_resultado_text("PROCESSO NÃO ENCONTRADO\n")
-                            self.update_resultado_text("-" * 30 + "\n")
-                            self.update_resultado_text(f"A consulta foi realizada com sucesso, mas não há informações sobre o processo {numero} no TRF.\n")
-                            self.update_resultado_text("\nPossíveis motivos:\n")
-                            self.update_resultado_text("- O número do processo pode estar incorreto\n")
-                            self.update_resultado_text("- O processo pode estar em sigilo\n")
-                            self.update_resultado_text("- O processo pode não existir na base de dados\n")
-                    else:
-                        self.update_resultado_text("Formato de resposta inesperado.\n")
+                    # Tratamento específico para quando o processo não é encontrado
+                    self.update_resultado_text("PROCESSO NÃO ENCONTRADO\n")
+                    self.update_resultado_text("-" * 30 + "\n")
+                    self.update_resultado_text(f"A consulta foi realizada com sucesso, mas não há informações sobre o processo {numero} no {nome_tribunal}.\n")
+                    self.update_resultado_text("\nPossíveis motivos:\n")
+                    self.update_resultado_text("- O número do processo pode estar incorreto\n")
+                    self.update_resultado_text("- O processo pode estar em sigilo\n")
+                    self.update_resultado_text("- O processo pode não existir na base de dados\n")
             
             # Agora temos um resultado válido, habilitar o botão de PDF
             self.root.after(0, lambda: self.gerar_pdf_consulta_button.config(state="normal"))
@@ -722,84 +433,32 @@ class CompiladorJuridicoGUI:
         self.gerar_pdf_trf_button.config(state="disabled")
         
         # Usar thread para não bloquear a interface durante a consulta
-        threading.Thread(target=self._consultar_todos_tj_thread).start()
+        threading.Thread(target=self._consultar_todos_tj_thread,
+                         args=(self.incremental_var.get(), self.incluir_arquivados_var.get())).start()
     
-    def _consultar_todos_tj_thread(self):
+    def _consultar_todos_tj_thread(self, incremental=False, incluir_arquivados=False):
         """Thread para consulta de todos os processos TJ"""
+        import requests
         try:
-            from datetime import datetime
-            
+            from src.api.tjmg import consultar_todos_processos_tjmg
             # Manter a chamada da API original
-            resultados = consultar_todos_processos_tjmg()
+            resultados = consultar_todos_processos_tjmg(incremental=incremental, incluir_arquivados=incluir_arquivados)
             
-            # Criar um dicionário para armazenar os resultados formatados
+            # Resumo de cada processo encontrado (o mesmo usado na tela e no PDF)
             processos_formatados = {}
-            
-            # Para cada processo no resultado da API
             for numero_processo, dados in resultados.items():
-                if "hits" in dados and "hits" in dados["hits"] and len(dados["hits"]["hits"]) > 0:
-                    hits = dados["hits"]["hits"]
-                    
-                    # Vamos trabalhar com o primeiro hit (normalmente contém as informações mais relevantes)
-                    primeiro_hit = hits[0]
-                    
-                    if "_source" in primeiro_hit:
-                        source = primeiro_hit["_source"]
-                        
-                        # Extrair dados básicos
-                        tribunal = source.get("tribunal", "Não informado")
-                        
-                        # Formatar data de última atualização
-                        data_atualizacao = source.get("dataHoraUltimaAtualizacao", "")
-                        if data_atualizacao:
-                            try:
-                                data_obj = datetime.strptime(data_atualizacao.split("T")[0], "%Y-%m-%d")
-                                data_atualizacao = data_obj.strftime("%d/%m/%Y")
-                            except (ValueError, TypeError, IndexError):
-                                # Manter o valor original se houver erro de formatação
-                                pass
-                        
-                        # Determinar o status com base nos movimentos
-                        status = "Em andamento"
-                        if "movimentos" in source:
-                            movimentos = source["movimentos"]
-                            # Ordenar movimentos por data (mais recente primeiro)
-                            try:
-                                movimentos = sorted(movimentos, key=lambda x: x.get("dataHora", ""), reverse=True)
-                            except (KeyError, TypeError, AttributeError):
-                                # Em caso de erro na ordenação, manter a ordem original
-                                pass
-                            
-                            # Verificar os códigos de movimento mais importantes para determinar o status
-                            for mov in movimentos:
-                                codigo = mov.get("codigo", 0)
-                                if codigo == 22:  # Baixa Definitiva
-                                    status = "Arquivado definitivamente"
-                                    break
-                                elif codigo == 246:  # Definitivo
-                                    status = "Arquivado definitivamente"
-                                    break
-                                elif codigo == 848:  # Trânsito em julgado
-                                    status = "Transitado em julgado"
-                                    break
-                                elif codigo == 196:  # Extinção da execução
-                                    status = "Execução extinta"
-                                    break
-                                elif codigo == 893:  # Desarquivamento
-                                    status = "Desarquivado"
-                                    break
-                        
-                        # Armazenar os dados formatados
-                        processos_formatados[numero_processo] = {
-                            "numero": numero_processo,
-                            "tribunal": tribunal,
-                            "ultima_atualizacao": data_atualizacao,
-                            "status": status
-                        }
+                resumo = obter_resumo(numero_processo, dados)
+                if resumo.encontrado:
+                    processos_formatados[numero_processo] = resumo.linha_lote()
             
             # Ordenar os processos por número
             processos_ordenados = dict(sorted(processos_formatados.items()))
             
+            # Exibir primeiro o que mudou desde a consulta anterior
+            _, alteracoes = carregar_alteracoes("TJ")
+            self.update_resultado_text(f"\n=== O QUE MUDOU ({len(alteracoes)} processos) ===\n\n")
+            self.update_resultado_text("\n".join(linhas_alteracoes(alteracoes)) + "\n")
+            
             # Exibir os resultados
             self.update_resultado_text("\n=== RESULTADO DA CONSULTA DE PROCESSOS TJ ===\n\n")
             self.update_resultado_text(f"Total de processos consultados: {len(processos_ordenados)}\n\n")
@@ -814,6 +473,7 @@ class CompiladorJuridicoGUI:
             # Armazenar resultados para geração de PDF
             self.resultados_consulta_lote = processos_ordenados
             self.ultimo_tipo_consulta_lote = "TJ"
+            self.alteracoes_consulta_lote = alteracoes
             
             # Habilitar botão de PDF TJ
             self.root.after(0, lambda: self.gerar_pdf_tj_button.config(state="normal"))
@@ -847,87 +507,32 @@ class CompiladorJuridicoGUI:
         self.gerar_pdf_trf_button.config(state="disabled")
         
         # Usar thread para não bloquear a interface durante a consulta
-        threading.Thread(target=self._consultar_todos_trf_thread).start()
+        threading.Thread(target=self._consultar_todos_trf_thread,
+                         args=(self.incremental_var.get(), self.incluir_arquivados_var.get())).start()
     
-    def _consultar_todos_trf_thread(self):
+    def _consultar_todos_trf_thread(self, incremental=False, incluir_arquivados=False):
         """Thread para consulta de todos os processos TRF"""
+        import requests
         try:
-            from datetime import datetime
-            
+            from src.api.trf6 import consultar_todos_processos_trf6
             # Manter a chamada da API original
-            resultados = consultar_todos_processos_trf6()
+            resultados = consultar_todos_processos_trf6(incremental=incremental, incluir_arquivados=incluir_arquivados)
             
-            # Criar um dicionário para armazenar os resultados formatados
+            # Resumo de cada processo encontrado (o mesmo usado na tela e no PDF)
             processos_formatados = {}
-            
-            # Para cada processo no resultado da API
             for numero_processo, dados in resultados.items():
-                if "hits" in dados and "hits" in dados["hits"] and len(dados["hits"]["hits"]) > 0:
-                    hits = dados["hits"]["hits"]
-                    
-                    # Vamos trabalhar com o primeiro hit (normalmente contém as informações mais relevantes)
-                    primeiro_hit = hits[0]
-                    
-                    if "_source" in primeiro_hit:
-                        source = primeiro_hit["_source"]
-                        
-                        # Extrair dados básicos
-                        orgao_julgador = "Não informado"
-                        if "orgaoJulgador" in source:
-                            if isinstance(source["orgaoJulgador"], dict) and "nome" in source["orgaoJulgador"]:
-                                orgao_julgador = source["orgaoJulgador"]["nome"]
-                            elif isinstance(source["orgaoJulgador"], str):
-                                orgao_julgador = source["orgaoJulgador"]
-                        
-                        # Formatar data de última atualização
-                        data_atualizacao = source.get("dataHoraUltimaAtualizacao", "")
-                        if data_atualizacao:
-                            try:
-                                data_obj = datetime.strptime(data_atualizacao.split("T")[0], "%Y-%m-%d")
-                                data_atualizacao = data_obj.strftime("%d/%m/%Y")
-                            except (ValueError, TypeError, IndexError):
-                                # Manter o valor original se houver erro de formatação
-                                pass
-                        
-                        # Determinar o último movimento
-                        ultimo_movimento = "Não informado"
-                        if "movimentos" in source and len(source["movimentos"]) > 0:
-                            movimentos = source["movimentos"]
-                            # Ordenar movimentos por data (mais recente primeiro)
-                            try:
-                                movimentos = sorted(movimentos, key=lambda x: x.get("dataHora", ""), reverse=True)
-                                
-                                # Obter o movimento mais recente
-                                if movimentos:
-                                    mov = movimentos[0]
-                                    codigo = mov.get("codigo", "")
-                                    nome = mov.get("nome", "Não especificado")
-                                    data_hora = mov.get("dataHora", "")
-                                    
-                                    # Formatar data se existir
-                                    if data_hora:
-                                        try:
-                                            data_obj = datetime.strptime(data_hora.split("T")[0], "%Y-%m-%d")
-                                            data_hora = data_obj.strftime("%d/%m/%Y")
-                                        except (ValueError, TypeError, IndexError):
-                                            # Manter o valor original se houver erro de formatação
-                                            pass
-                                    
-                                    ultimo_movimento = f"[{codigo}] {nome} ({data_hora})"
-                            except (KeyError, TypeError, AttributeError):
-                                ultimo_movimento = "Erro ao processar movimentos: dados incompatíveis"
-                        
-                        # Armazenar os dados formatados
-                        processos_formatados[numero_processo] = {
-                            "numero": numero_processo,
-                            "orgao_julgador": orgao_julgador,
-                            "ultima_atualizacao": data_atualizacao,
-                            "ultimo_movimento": ultimo_movimento
-                        }
+                resumo = obter_resumo(numero_processo, dados)
+                if resumo.encontrado:
+                    processos_formatados[numero_processo] = resumo.linha_lote()
             
             # Ordenar os processos por número
             processos_ordenados = dict(sorted(processos_formatados.items()))
             
+            # Exibir primeiro o que mudou desde a consulta anterior
+            _, alteracoes = carregar_alteracoes("TRF")
+            self.update_resultado_text(f"\n=== O QUE MUDOU ({len(alteracoes)} processos) ===\n\n")
+            self.update_resultado_text("\n".join(linhas_alteracoes(alteracoes)) + "\n")
+            
             # Exibir os resultados
             self.update_resultado_text("\n=== RESULTADO DA CONSULTA DE PROCESSOS TRF ===\n\n")
             self.update_resultado_text(f"Total de processos consultados: {len(processos_ordenados)}\n\n")
@@ -942,6 +547,7 @@ class CompiladorJuridicoGUI:
             # Armazenar resultados para geração de PDF
             self.resultados_consulta_lote = processos_ordenados
             self.ultimo_tipo_consulta_lote = "TRF"
+            self.alteracoes_consulta_lote = alteracoes
             
             # Habilitar botão de PDF TRF
             self.root.after(0, lambda: self.gerar_pdf_trf_button.config(state="normal"))
@@ -964,8 +570,8 @@ class CompiladorJuridicoGUI:
     
     def exibir_estatisticas(self):
         """Exibir estatísticas sobre as listas de processos"""
-        processos_tj = carregar_arquivo_json(LISTA_TJ_FILE)
-        processos_trf = carregar_arquivo_json(LISTA_TRF_FILE)
+        processos_tj = obter_registro("TJ").numeros()
+        processos_trf = obter_registro("TRF").numeros()
         
         self.stats_text.config(state="normal")
         self.stats_text.delete(1.0, tk.END)
@@ -1043,8 +649,10 @@ class CompiladorJuridicoGUI:
     def gerar_pdf_estatisticas(self):
         """Gerar um PDF com as estatísticas atuais"""
         try:
-            processos_tj = carregar_arquivo_json(LISTA_TJ_FILE)
-            processos_trf = carregar_arquivo_json(LISTA_TRF_FILE)
+            # reportlab só é carregado ao gerar o primeiro PDF
+            from src.models.gerador_pdf_file import GeradorPDF
+            processos_tj = obter_registro("TJ").numeros()
+            processos_trf = obter_registro("TRF").numeros()
             
             arquivo = GeradorPDF.gerar_pdf_estatisticas(processos_tj, processos_trf)
             
@@ -1062,6 +670,7 @@ class CompiladorJuridicoGUI:
             return
         
         try:
+            from src.models.gerador_pdf_file import GeradorPDF
             # Obter o texto atual da área de resultados
             self.resultado_consulta_individual_texto = self.resultado_text.get(1.0, tk.END)
             
@@ -1085,7 +694,9 @@ class CompiladorJuridicoGUI:
             return
         
         try:
-            arquivo = GeradorPDF.gerar_pdf_consulta_lote(tipo, self.resultados_consulta_lote)
+            from src.models.gerador_pdf_file import GeradorPDF
+            arquivo = GeradorPDF.gerar_pdf_consulta_lote(tipo, self.resultados_consulta_lote,
+                                                       self.alteracoes_consulta_lote)
             
             if arquivo:
                 self.status_var.set(f"PDF de consulta em lote {tipo} gerado: {os.path.basename(arquivo)}")
@@ -1,10 +1,17 @@
+from collections import Counter
 from src.config import CACHE_DIR
-from src.utils.file_handler import garantir_diretorio_existe, carregar_arquivo_json, salvar_arquivo_json
+from src.utils.file_handler import garantir_diretorio_existe, abrir_armazenamento
+from src.utils.arquivamento import abrir_arquivados
+from src.utils.registro import obter_registro, descrever_operacao
+from src.utils.importacao import importar_processos
 from src.models.processo import Processo
+from src.models.resumo import obter_resumo, linhas_resumo
 # Importando as funções de consulta individual e em lote
 from src.api.tjmg import consultar_processo_tjmg, consultar_todos_processos_tjmg
 from src.api.trf6 import consultar_processo_trf6, consultar_todos_processos_trf6
-from src.config import LISTA_TJ_FILE, LISTA_TRF_FILE
+from src.config import RESULTADO_TJ_FILE, RESULTADO_TRF_FILE, ARMAZENAMENTO_MOTOR
+from src.utils.diario_lote import listar_lotes_interrompidos
+from src.utils.historico import obter_historico, importar_cache
 
 def adicionar_processo(numero, tipo):
     """Adiciona um processo à lista correspondente."""
@@ -12,41 +19,101 @@ def adicionar_processo(numero, tipo):
         # Criar objeto Processo para validação
         processo = Processo(numero, tipo)
         
-        # Determinar qual arquivo usar
-        arquivo = LISTA_TJ_FILE if processo.tipo == "TJ" else LISTA_TRF_FILE
-        
-        # Carregar lista atual
-        lista = carregar_arquivo_json(arquivo)
-        
-        # Verificar se já existe
-        if numero in lista:
+        # Incluir no registro do tribunal (verificação de duplicidade em O(1))
+        resumo = obter_registro(processo.tipo).adicionar([numero])
+        if "erro" in resumo:
+            print(f"Erro: {resumo['erro']}")
+            return False
+        if resumo["existentes"]:
             print(f"Processo {tipo} {numero} já existe na lista.")
             return False
-        
-        # Adicionar à lista
-        lista.append(numero)
-        
-        # Salvar lista atualizada
-        if salvar_arquivo_json(arquivo, lista):
-            print(f"Processo {tipo} {numero} adicionado com sucesso.")
-            return True
-        return False
+        print(f"Processo {tipo} {numero} adicionado com sucesso.")
+        return True
         
     except ValueError as e:
         print(f"Erro: {str(e)}")
         return False
 
+def adicionar_varios_processos(numeros, tipo):
+    """
+    Adiciona vários processos à lista correspondente com uma única gravação.
+
+    Args:
+        numeros (list): Números de processo
+        tipo (str): Tipo dos processos ('TJ' ou 'TRF')
+
+    Returns:
+        dict: Resumo da operação (adicionados, existentes e invalidos)
+    """
+    resumo = obter_registro(tipo).adicionar(numeros)
+    print(f"Processos {tipo.upper()}: {descrever_operacao(resumo)}.")
+    for numero in resumo["invalidos"][:10]:
+        print(f"- Número inválido: {numero}")
+    return resumo
+
+def importar_processos_arquivo(caminho):
+    """
+    Importa os processos de um arquivo TXT, CSV ou XLSX para as listas TJ e TRF.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        dict: Resumo da importação ou None em caso de erro
+    """
+    try:
+        resumo = importar_processos(caminho.strip().strip('"'))
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Erro ao importar o arquivo: {str(e)}")
+        return None
+    
+    for tipo in ("TJ", "TRF"):
+        print(f"Processos {tipo}: {descrever_operacao(resumo[tipo])}.")
+    if resumo["outros_tribunais"]:
+        print(f"Números de outros tribunais ignorados: {len(resumo['outros_tribunais'])}")
+    if resumo["invalidos"]:
+        print(f"Números em formato inválido ignorados: {resumo['invalidos']}")
+    return resumo
+
 def exibir_estatisticas():
     """Exibe estatísticas sobre as listas de processos."""
-    processos_tj = carregar_arquivo_json(LISTA_TJ_FILE)
-    processos_trf = carregar_arquivo_json(LISTA_TRF_FILE)
+    total_tj = len(obter_registro("TJ"))
+    total_trf = len(obter_registro("TRF"))
     
     print("\n----- Estatísticas -----")
-    print(f"Total de processos cadastrados: {len(processos_tj) + len(processos_trf)}")
-    print(f"Processos TJ: {len(processos_tj)}")
-    print(f"Processos TRF: {len(processos_trf)}")
+    print(f"Total de processos cadastrados: {total_tj + total_trf}")
+    print(f"Processos TJ: {total_tj}")
+    print(f"Processos TRF: {total_trf}")
+    
+    # Com o banco SQLite, a contagem por status usa o índice, sem ler os resultados;
+    # com o cache em arquivos, usa a camada de resumos (sem descomprimir as respostas).
+    # Os processos encerrados são contados na camada de arquivados
+    for tipo, arquivo in (("TJ", RESULTADO_TJ_FILE), ("TRF", RESULTADO_TRF_FILE)):
+        resultados = abrir_armazenamento(arquivo)
+        if ARMAZENAMENTO_MOTOR == "sqlite":
+            contagem = Counter(resultados.contar_por_status())
+        else:
+            contagem = Counter(resumo["status"] for resumo in resultados.resumos().values() if resumo.get("status"))
+        arquivados = abrir_arquivados(arquivo).resumos()
+        contagem.update(resumo["status"] for resumo in arquivados.values() if resumo.get("status"))
+        for status, quantidade in contagem.most_common():
+            print(f"{tipo} - {status}: {quantidade}")
+        if arquivados:
+            print(f"{tipo} - processos na camada de arquivados: {len(arquivados)}")
     print("-----------------------\n")
 
+def exibir_resumo_processo(numero, resultado):
+    """Exibe o resumo do processo (o mesmo apresentado na interface gráfica e no PDF)."""
+    if "hits" not in resultado:
+        print("Formato de resposta inesperado.")
+        return
+    resumo = obter_resumo(numero, resultado)
+    if not resumo.encontrado:
+        print(f"Nenhuma informação encontrada para o processo {numero}.")
+        return
+    print()
+    print("\n".join(linhas_resumo(resumo)))
+
 def consultar_unico_processo():
     """Menu para consultar um único processo."""
     print("\n===== CONSULTAR PROCESSO ÚNICO =====")
@@ -69,24 +136,9 @@ def consultar_unico_processo():
                     print(f"Erro na consulta: {resultado['erro']}")
                 else:
                     print("Consulta realizada com sucesso!")
-                    # Exibir informações básicas do resultado
-                    if "hits" in resultado and "total" in resultado["hits"]:
-                        total = resultado["hits"]["total"]["value"]
-                        print(f"Total de resultados encontrados: {total}")
-                        
-                        if total > 0 and "hits" in resultado["hits"]:
-                            for i, hit in enumerate(resultado["hits"]["hits"], 1):
-                                print(f"\nResultado {i}:")
-                                if "_source" in hit:
-                                    source = hit["_source"]
-                                    campos = ["numeroProcesso", "orgaoJulgador", "dataAjuizamento", "classeProcessual"]
-                                    for campo in campos:
-                                        if campo in source:
-                                            print(f"{campo}: {source[campo]}")
-                    else:
-                        print("Formato de resposta inesperado.")
+                    exibir_resumo_processo(numero, resultado)
             else:
-                print("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos.")
+                print("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos e dígito verificador válido.")
         except Exception as e:
             print(f"Erro ao processar a consulta: {str(e)}")
     
@@ -103,24 +155,9 @@ def consultar_unico_processo():
                     print(f"Erro na consulta: {resultado['erro']}")
                 else:
                     print("Consulta realizada com sucesso!")
-                    # Exibir informações básicas do resultado
-                    if "hits" in resultado and "total" in resultado["hits"]:
-                        total = resultado["hits"]["total"]["value"]
-                        print(f"Total de resultados encontrados: {total}")
-                        
-                        if total > 0 and "hits" in resultado["hits"]:
-                            for i, hit in enumerate(resultado["hits"]["hits"], 1):
-                                print(f"\nResultado {i}:")
-                                if "_source" in hit:
-                                    source = hit["_source"]
-                                    campos = ["numeroProcesso", "orgaoJulgador", "dataAjuizamento", "classeProcessual"]
-                                    for campo in campos:
-                                        if campo in source:
-                                            print(f"{campo}: {source[campo]}")
-                    else:
-                        print("Formato de resposta inesperado.")
+                    exibir_resumo_processo(numero, resultado)
             else:
-                print("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos.")
+                print("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos e dígito verificador válido.")
         except Exception as e:
             print(f"Erro ao processar a consulta: {str(e)}")
     
@@ -130,6 +167,81 @@ def consultar_unico_processo():
     else:
         print("Opção inválida.")
 
+def perguntar_incluir_arquivados(arquivo_resultados):
+    """Pergunta se os processos arquivados (encerrados) também devem ser consultados."""
+    quantidade = len(abrir_arquivados(arquivo_resultados))
+    if not quantidade:
+        return False
+    resposta = input(f"Incluir os {quantidade} processos arquivados (encerrados)? (s/n): ").strip().lower()
+    return resposta == "s"
+
+def retomar_consulta_em_lote():
+    """Lista as consultas em lote interrompidas e retoma a escolhida."""
+    lotes = listar_lotes_interrompidos()
+    if not lotes:
+        print("Nenhuma consulta em lote interrompida.")
+        return
+
+    print("\n===== CONSULTAS EM LOTE INTERROMPIDAS =====")
+    for lote in lotes:
+        print(f"{lote['id']} ({lote['tipo']}, iniciada em {lote['criado_em']}): "
+              f"{lote['concluidos']}/{lote['total']} processos consultados")
+
+    id_lote = input("\nDigite o identificador do lote a retomar: ").strip()
+    lote = next((lote for lote in lotes if lote["id"] == id_lote), None)
+    if lote is None:
+        print("Lote não encontrado.")
+    elif lote["tipo"] == "TJ":
+        consultar_todos_processos_tjmg(id_lote=id_lote)
+    else:
+        consultar_todos_processos_trf6(id_lote=id_lote)
+
+def consultar_historico():
+    """Menu de consultas ao histórico local (sem acessar a API)."""
+    print("\n===== HISTÓRICO DE PROCESSOS =====")
+    print("1. Situação de um processo em uma data")
+    print("2. Processos que mudaram de status em uma semana")
+    print("3. Importar para o histórico os resultados já em cache")
+    print("4. Voltar")
+    
+    opcao = input("\nEscolha uma opção: ")
+    
+    try:
+        if opcao == "1":
+            numero = input("Digite o número do processo (20 dígitos): ").strip()
+            data = input("Digite a data (AAAA-MM-DD): ").strip()
+            estado = obter_historico().estado_em(numero, data)
+            if estado is None:
+                print("Processo não encontrado no histórico.")
+                return
+            print(f"\nSituação do processo {numero} ({estado['tribunal']}) em {data}:")
+            print(f"Status: {estado['status']}" + (f" (desde {estado['desde']})" if estado["desde"] else ""))
+            if estado["ultimo_movimento"]:
+                movimento = estado["ultimo_movimento"]
+                print(f"Último movimento: [{movimento['codigo']}] {movimento['nome']} ({movimento['data_hora']})")
+            print(f"Movimentos até a data: {estado['movimentos']}")
+            if estado["orgao_julgador"]:
+                print(f"Órgão julgador: {estado['orgao_julgador']}")
+        
+        elif opcao == "2":
+            ano = int(input("Digite o ano: "))
+            semana = int(input("Digite o número da semana (1 a 53): "))
+            mudancas = obter_historico().mudancas_status_semana(ano, semana)
+            print(f"\n{len(mudancas)} mudanças de status na semana {semana}/{ano}:")
+            for mudanca in mudancas:
+                print(f"{mudanca['data_hora'][:10]} {mudanca['tribunal']} {mudanca['numero']}: "
+                      f"{mudanca['status_anterior']} -> {mudanca['status']}")
+        
+        elif opcao == "3":
+            for tipo, arquivo in (("TJ", RESULTADO_TJ_FILE), ("TRF", RESULTADO_TRF_FILE)):
+                novos = importar_cache(tipo, abrir_armazenamento(arquivo))
+                print(f"Processos {tipo}: {novos} movimentos incluídos no histórico.")
+        
+        elif opcao != "4":
+            print("Opção inválida.")
+    except ValueError as e:
+        print(f"Valor inválido: {str(e)}")
+
 def menu_principal():
     """Exibe o menu principal do programa."""
     garantir_diretorio_existe(CACHE_DIR)
@@ -140,7 +252,11 @@ def menu_principal():
         print("2. Consultar processo único")
         print("3. Consultar todos processos TJ")
         print("4. Consultar todos processos TRF")
-        print("5. Sair")
+        print("5. Sincronizar alterações TJ (incremental)")
+        print("6. Sincronizar alterações TRF (incremental)")
+        print("7. Retomar consulta em lote interrompida")
+        print("8. Histórico de processos")
+        print("9. Sair")
         
         opcao = input("\nEscolha uma opção: ")
         
@@ -149,10 +265,20 @@ def menu_principal():
         elif opcao == "2":
             consultar_unico_processo()
         elif opcao == "3":
-            consultar_todos_processos_tjmg()
+            consultar_todos_processos_tjmg(incluir_arquivados=perguntar_incluir_arquivados(RESULTADO_TJ_FILE))
         elif opcao == "4":
-            consultar_todos_processos_trf6()
+            consultar_todos_processos_trf6(incluir_arquivados=perguntar_incluir_arquivados(RESULTADO_TRF_FILE))
         elif opcao == "5":
+            consultar_todos_processos_tjmg(incremental=True,
+                                           incluir_arquivados=perguntar_incluir_arquivados(RESULTADO_TJ_FILE))
+        elif opcao == "6":
+            consultar_todos_processos_trf6(incremental=True,
+                                           incluir_arquivados=perguntar_incluir_arquivados(RESULTADO_TRF_FILE))
+        elif opcao == "7":
+            retomar_consulta_em_lote()
+        elif opcao == "8":
+            consultar_historico()
+        elif opcao == "9":
             print("Programa encerrado.")
             break
         else:
@@ -164,8 +290,10 @@ def menu_gerenciar_processos():
         print("\n===== GERENCIAR PROCESSOS =====")
         print("1. Adicionar processo TJ")
         print("2. Adicionar processo TRF")
-        print("3. Ver estatísticas")
-        print("4. Voltar ao menu principal")
+        print("3. Adicionar vários processos")
+        print("4. Importar processos de arquivo (TXT, CSV ou XLSX)")
+        print("5. Ver estatísticas")
+        print("6. Voltar ao menu principal")
         
         opcao = input("\nEscolha uma opção: ")
         
@@ -178,9 +306,21 @@ def menu_gerenciar_processos():
             adicionar_processo(numero, "TRF")
         
         elif opcao == "3":
-            exibir_estatisticas()
+            tipo = input("Digite o tipo dos processos (TJ ou TRF): ").strip().upper()
+            if tipo not in ("TJ", "TRF"):
+                print("Tipo de processo inválido. Use 'TJ' ou 'TRF'.")
+                continue
+            texto = input("Digite os números dos processos separados por vírgula ou espaço: ")
+            adicionar_varios_processos(texto.replace(",", " ").split(), tipo)
         
         elif opcao == "4":
+            caminho = input("Digite o caminho do arquivo: ")
+            importar_processos_arquivo(caminho)
+        
+        elif opcao == "5":
+            exibir_estatisticas()
+        
+        elif opcao == "6":
             break
         
         else:
@@ -0,0 +1,288 @@
+"""
+Cliente HTTP compartilhado para as APIs públicas do DataJud.
+Mantém uma única sessão com conexões persistentes (keep-alive), de modo que
+o handshake TCP/TLS seja feito uma vez por execução e não a cada processo.
+"""
+
+import json
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import (API_KEY, API_POOL_CONEXOES, API_POOL_MAX_CONEXOES,
+                      API_PARAMETROS_TRIBUNAL, API_PARAMETROS_PADRAO)
+from .resiliencia import (executar_com_hedge, executar_com_retentativas, ler_retry_after,
+                          obter_disjuntor, obter_monitor_latencia)
+
+_sessao = None
+_trava_sessao = threading.Lock()
+_observadores = {}
+
+
+def obter_sessao():
+    """Retorna a sessão HTTP compartilhada, criando-a na primeira chamada."""
+    global _sessao
+    if _sessao is None:
+        with _trava_sessao:
+            if _sessao is None:
+                sessao = requests.Session()
+                adaptador = HTTPAdapter(pool_connections=API_POOL_CONEXOES,
+                                        pool_maxsize=API_POOL_MAX_CONEXOES)
+                sessao.mount("https://", adaptador)
+                sessao.mount("http://", adaptador)
+                sessao.headers.update({
+                    'Authorization': API_KEY,
+                    'Content-Type': 'application/json'
+                })
+                _sessao = sessao
+    return _sessao
+
+
+def fechar_sessao():
+    """Fecha a sessão compartilhada e libera as conexões abertas."""
+    global _sessao
+    with _trava_sessao:
+        if _sessao is not None:
+            _sessao.close()
+            _sessao = None
+
+
+def registrar_observador(url, observador):
+    """
+    Registra uma função chamada a cada resposta recebida da URL com
+    `observador(status, latencia, retry_after)`; o status é None em falhas
+    de conexão ou timeout.
+    """
+    with _trava_sessao:
+        _observadores.setdefault(url, []).append(observador)
+
+
+def remover_observador(url, observador):
+    """Remove um observador registrado com `registrar_observador`."""
+    with _trava_sessao:
+        if observador in _observadores.get(url, []):
+            _observadores[url].remove(observador)
+
+
+def _notificar_observadores(url, status, latencia, retry_after=None):
+    """Repassa o resultado de uma requisição aos observadores da URL."""
+    for observador in list(_observadores.get(url, [])):
+        observador(status, latencia, retry_after)
+
+
+def consultar_api(url, consulta):
+    """
+    Envia uma consulta ao endpoint `_search` do DataJud.
+
+    Falhas de conexão e status temporários são repetidos com espera
+    exponencial; com o circuito do endpoint aberto, falha imediatamente.
+    Tempos limite e hedging seguem API_PARAMETROS_TRIBUNAL.
+
+    Args:
+        url: URL do endpoint do tribunal
+        consulta: Corpo da consulta Elasticsearch (dict)
+
+    Returns:
+        dict: Resposta da API ou dicionário com a chave "erro"
+
+    Raises:
+        CircuitoAberto: Se o endpoint estiver indisponível
+    """
+    parametros = API_PARAMETROS_TRIBUNAL.get(url, API_PARAMETROS_PADRAO)
+    timeout = (parametros["timeout_conexao"], parametros["timeout_leitura"])
+    monitor = obter_monitor_latencia(url)
+    corpo = json.dumps(consulta)
+
+    def enviar():
+        inicio = time.monotonic()
+        try:
+            response = obter_sessao().post(url, data=corpo, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            _notificar_observadores(url, None, time.monotonic() - inicio)
+            raise
+        latencia = time.monotonic() - inicio
+        monitor.registrar(latencia)
+        _notificar_observadores(url, response.status_code, latencia, ler_retry_after(response))
+        return response
+
+    def requisitar():
+        if not parametros["hedge"]:
+            return enviar()
+        limiar = monitor.percentil(parametros["hedge_percentil"])
+        if limiar is not None:
+            limiar = max(limiar, parametros["hedge_minimo"])
+        return executar_com_hedge(enviar, limiar)
+
+    response = executar_com_retentativas(
+        requisitar,
+        obter_disjuntor(url),
+        (requests.ConnectionError, requests.Timeout)
+    )
+
+    if response.status_code == 200:
+        return response.json()
+    return {"erro": f"Código de status: {response.status_code}", "mensagem": response.text}
+
+
+def aplicar_projecao(consulta, campos):
+    """
+    Restringe os campos de `_source` retornados pela consulta.
+
+    Args:
+        consulta: Corpo da consulta Elasticsearch (dict)
+        campos: Lista de campos a incluir, ou None para o documento completo
+
+    Returns:
+        dict: A própria consulta, com `_source` ajustado quando houver campos
+    """
+    if campos:
+        consulta["_source"] = {"includes": list(campos)}
+    return consulta
+
+
+def marcar_projecao(resultado, campos):
+    """Registra no resultado os campos projetados (documento parcial)."""
+    if campos and "erro" not in resultado:
+        resultado["_campos"] = list(campos)
+    return resultado
+
+
+def consultar_processo(url, numero_processo, campos=None):
+    """
+    Consulta um único processo pelo número com uma consulta `match`.
+
+    Args:
+        url: URL do endpoint do tribunal
+        numero_processo: Número do processo a ser consultado
+        campos: Campos de `_source` a trazer (None para o documento completo)
+
+    Returns:
+        dict: Resposta da API ou dicionário com a chave "erro"
+    """
+    consulta = aplicar_projecao({
+        "query": {
+            "match": {
+                "numeroProcesso": numero_processo
+            }
+        }
+    }, campos)
+    return marcar_projecao(consultar_api(url, consulta), campos)
+
+
+def consultar_processos_agrupados(url, numeros, tamanho_pagina, campos=None):
+    """
+    Consulta vários processos com uma única consulta `terms` ao DataJud.
+
+    Os resultados são paginados com `from`/`size` e separados por número de
+    processo, no mesmo formato de resposta da consulta individual.
+
+    Args:
+        url: URL do endpoint do tribunal
+        numeros: Lista de números de processo
+        tamanho_pagina: Quantidade máxima de documentos por página
+        campos: Campos de `_source` a trazer (None para o documento completo);
+            `numeroProcesso` é sempre incluído para separar os resultados
+
+    Returns:
+        dict: {numero: resposta} para cada número solicitado
+    """
+    hits_por_processo = {numero: [] for numero in numeros}
+    took = 0
+    inicio = 0
+    if campos and "numeroProcesso" not in campos:
+        campos = ["numeroProcesso"] + list(campos)
+
+    while True:
+        resposta = consultar_api(url, aplicar_projecao({
+            "query": {
+                "terms": {
+                    "numeroProcesso": list(numeros)
+                }
+            },
+            "size": tamanho_pagina,
+            "from": inicio,
+            "track_total_hits": True
+        }, campos))
+
+        if "erro" in resposta:
+            return {numero: resposta for numero in numeros}
+
+        took += resposta.get("took", 0)
+        hits = resposta.get("hits", {}).get("hits", [])
+        for hit in hits:
+            numero = hit.get("_source", {}).get("numeroProcesso")
+            if numero in hits_por_processo:
+                hits_por_processo[numero].append(hit)
+
+        inicio += len(hits)
+        total = resposta.get("hits", {}).get("total", {}).get("value", 0)
+        if not hits or inicio >= total:
+            break
+
+    return {
+        numero: marcar_projecao({
+            "took": took,
+            "timed_out": False,
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "max_score": None,
+                "hits": hits
+            }
+        }, campos)
+        for numero, hits in hits_por_processo.items()
+    }
+
+
+def listar_processos_atualizados(url, numeros, desde, tamanho_pagina):
+    """
+    Identifica quais processos têm documentos atualizados após uma data.
+
+    Combina o filtro `terms` dos números com um filtro `range` sobre
+    `dataHoraUltimaAtualizacao` e traz apenas o campo `numeroProcesso`.
+
+    Args:
+        url: URL do endpoint do tribunal
+        numeros: Lista de números de processo
+        desde: Data/hora ISO 8601 (UTC) da última sincronização
+        tamanho_pagina: Quantidade máxima de documentos por página
+
+    Returns:
+        set: Números com alguma atualização posterior a `desde`
+
+    Raises:
+        RuntimeError: Se a API retornar erro
+    """
+    atualizados = set()
+    inicio = 0
+
+    while True:
+        resposta = consultar_api(url, {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"terms": {"numeroProcesso": list(numeros)}},
+                        {"range": {"dataHoraUltimaAtualizacao": {"gt": desde}}}
+                    ]
+                }
+            },
+            "_source": ["numeroProcesso"],
+            "size": tamanho_pagina,
+            "from": inicio,
+            "track_total_hits": True
+        })
+
+        if "erro" in resposta:
+            raise RuntimeError(resposta["erro"])
+
+        hits = resposta.get("hits", {}).get("hits", [])
+        for hit in hits:
+            numero = hit.get("_source", {}).get("numeroProcesso")
+            if numero:
+                atualizados.add(numero)
+
+        inicio += len(hits)
+        total = resposta.get("hits", {}).get("total", {}).get("value", 0)
+        if not hits or inicio >= total:
+            break
+
+    return atualizados
@@ -0,0 +1,539 @@
+"""
+Motor de consultas em lote do Compilador Jurídico.
+Executa várias consultas à API ao mesmo tempo, com um número máximo de
+requisições simultâneas, limitadas por um balde de fichas (token bucket).
+A taxa do balde pode ser ajustada durante a execução por um controlador
+adaptativo (AIMD) que reage a respostas 429/5xx, à latência e ao Retry-After.
+Também reúne a consulta individual, comum a todos os tribunais.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..config import (API_MAX_CONCORRENCIA, API_REQUISICOES_POR_SEGUNDO, API_RAJADA_MAXIMA,
+                      API_MODO_LOTE, API_TAMANHO_GRUPO, API_TAMANHO_PAGINA, API_PRAZO_LOTE,
+                      API_TAXA_ADAPTATIVA, API_TAXA_MINIMA, API_TAXA_MAXIMA, API_TAXA_INCREMENTO,
+                      API_FATOR_REDUCAO, API_LATENCIA_FATOR_ALERTA, API_LATENCIA_MINIMA_ALERTA,
+                      API_PROJECAO_LOTE, API_CAMPOS_LOTE)
+from ..utils.alteracoes import comparar_lote, linhas_alteracoes, registrar_alteracoes
+from ..utils.arquivamento import abrir_arquivados, arquivar_encerrados, gravar_resultados
+from ..utils.cache import marcar_consulta, resultado_em_cache_valido
+from ..utils.cnj import validar_numero, validar_numeros
+from ..utils.diario_lote import DiarioLote
+from ..utils.historico import registrar_no_historico
+from ..utils.file_handler import abrir_armazenamento, carregar_lista_processos
+from ..utils.sincronizacao import momento_atual_utc, obter_ultima_sincronizacao, registrar_sincronizacao
+from .cliente import (consultar_processo, consultar_processos_agrupados, listar_processos_atualizados,
+                      registrar_observador, remover_observador)
+
+
+class LimitadorTaxa:
+    """Balde de fichas que limita o número de requisições por segundo."""
+
+    def __init__(self, taxa, capacidade=None):
+        """
+        Args:
+            taxa: Requisições permitidas por segundo (reposição do balde)
+            capacidade: Máximo de fichas acumuladas (rajada). Padrão: taxa
+        """
+        if taxa <= 0:
+            raise ValueError("A taxa de requisições deve ser maior que zero.")
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade if capacidade else max(1.0, taxa))
+        self._fichas = self.capacidade
+        self._ultima_reposicao = time.monotonic()
+        self._pausado_ate = 0.0
+        self._trava = threading.Lock()
+
+    def _repor(self, agora):
+        """Repõe as fichas proporcionalmente ao tempo decorrido."""
+        decorrido = agora - self._ultima_reposicao
+        if decorrido > 0:
+            self._fichas = min(self.capacidade, self._fichas + decorrido * self.taxa)
+            self._ultima_reposicao = agora
+
+    def adquirir(self):
+        """Bloqueia até que uma ficha esteja disponível e a consome."""
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                if agora < self._pausado_ate:
+                    espera = self._pausado_ate - agora
+                else:
+                    self._repor(agora)
+                    if self._fichas >= 1:
+                        self._fichas -= 1
+                        return
+                    espera = (1 - self._fichas) / self.taxa
+            time.sleep(espera)
+
+
+class ControladorTaxaAdaptativo(LimitadorTaxa):
+    """
+    Limitador cuja taxa segue a regra AIMD: aumenta aos poucos enquanto as
+    respostas são rápidas e bem-sucedidas e cai pela metade (API_FATOR_REDUCAO)
+    com 429, 5xx, falhas de conexão ou latência acima do normal.
+    """
+
+    def __init__(self, taxa, capacidade=None, nome="", taxa_minima=API_TAXA_MINIMA,
+                 taxa_maxima=API_TAXA_MAXIMA):
+        """
+        Args:
+            taxa: Taxa inicial em requisições por segundo
+            capacidade: Máximo de fichas acumuladas (rajada)
+            nome: Identificação usada nos logs (ex.: "TJ")
+            taxa_minima: Menor taxa permitida
+            taxa_maxima: Maior taxa permitida (teto)
+        """
+        super().__init__(min(max(taxa, taxa_minima), taxa_maxima), capacidade)
+        self.nome = nome
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self._latencia_media = None
+        self._ultima_reducao = 0.0
+        self._taxa_registrada = self.taxa
+
+    def registrar_resposta(self, status, latencia, retry_after=None):
+        """
+        Ajusta a taxa a partir do resultado de uma requisição.
+
+        Args:
+            status: Código de status HTTP (None em falha de conexão/timeout)
+            latencia: Duração da requisição em segundos
+            retry_after: Segundos indicados no cabeçalho Retry-After, se houver
+        """
+        with self._trava:
+            agora = time.monotonic()
+            self._repor(agora)
+
+            if retry_after:
+                self._pausado_ate = max(self._pausado_ate, agora + retry_after)
+
+            lenta = (self._latencia_media is not None
+                     and latencia > max(self._latencia_media * API_LATENCIA_FATOR_ALERTA,
+                                        API_LATENCIA_MINIMA_ALERTA))
+            if status is None or status == 429 or status >= 500:
+                motivo = f"status {status}" if status else "falha de conexão"
+            elif lenta:
+                motivo = f"latência de {latencia:.2f}s"
+            else:
+                motivo = None
+
+            if motivo is None:
+                # Aumento aditivo: cerca de API_TAXA_INCREMENTO req/s a cada segundo de respostas boas
+                self.taxa = min(self.taxa_maxima, self.taxa + API_TAXA_INCREMENTO / self.taxa)
+            elif agora - self._ultima_reducao >= 1.0 / self.taxa:
+                # Redução multiplicativa, no máximo uma por intervalo entre requisições
+                self.taxa = max(self.taxa_minima, self.taxa * API_FATOR_REDUCAO)
+                self._fichas = min(self._fichas, 0.0)
+                self._ultima_reducao = agora
+
+            if status is not None and not lenta:
+                self._latencia_media = (latencia if self._latencia_media is None
+                                        else 0.8 * self._latencia_media + 0.2 * latencia)
+
+            if abs(self.taxa - self._taxa_registrada) >= 0.1 * self._taxa_registrada:
+                print(f"Taxa de requisições {self.nome} ajustada para {self.taxa:.2f} req/s"
+                      + (f" ({motivo})." if motivo else "."))
+                self._taxa_registrada = self.taxa
+
+
+def criar_limitador(url, nome=""):
+    """
+    Cria o limitador de uma consulta em lote. Com API_TAXA_ADAPTATIVA, retorna
+    um controlador adaptativo já registrado para receber as respostas da URL;
+    chame `encerrar_limitador` ao final.
+    """
+    if not API_TAXA_ADAPTATIVA:
+        return LimitadorTaxa(API_REQUISICOES_POR_SEGUNDO, API_RAJADA_MAXIMA)
+    nome = nome or url.rstrip("/").split("/")[-2]
+    controlador = ControladorTaxaAdaptativo(API_REQUISICOES_POR_SEGUNDO, API_RAJADA_MAXIMA, nome)
+    registrar_observador(url, controlador.registrar_resposta)
+    return controlador
+
+
+def encerrar_limitador(url, limitador):
+    """Desfaz o registro do limitador criado por `criar_limitador`."""
+    if isinstance(limitador, ControladorTaxaAdaptativo):
+        remover_observador(url, limitador.registrar_resposta)
+        print(f"Taxa final de requisições {limitador.nome}: {limitador.taxa:.2f} req/s.")
+
+
+def calcular_prazo_final(prazo=API_PRAZO_LOTE):
+    """Converte um prazo em segundos no instante limite (time.monotonic), ou None."""
+    return time.monotonic() + prazo if prazo else None
+
+
+def executar_em_lote(itens, funcao, max_concorrencia, limitador=None, prazo_final=None, ao_concluir=None):
+    """
+    Executa `funcao(item)` para cada item usando um pool de threads.
+
+    Itens que ainda não começaram quando o prazo final é atingido não são
+    executados e recebem um resultado de erro.
+
+    Args:
+        itens: Itens a processar (ex.: números de processo)
+        funcao: Função chamada para cada item; deve retornar o resultado
+        max_concorrencia: Número máximo de chamadas simultâneas
+        limitador: LimitadorTaxa consultado antes de cada chamada (opcional)
+        prazo_final: Instante limite (time.monotonic) para iniciar novas chamadas
+        ao_concluir: Função `ao_concluir(item, resultado)` chamada, na thread
+            que executa o lote, assim que cada item termina (opcional)
+
+    Returns:
+        dict: {item: resultado} na mesma ordem dos itens recebidos
+    """
+    itens = list(itens)
+    if not itens:
+        return {}
+
+    def prazo_excedido():
+        return prazo_final is not None and time.monotonic() >= prazo_final
+
+    def tarefa(item):
+        if prazo_excedido():
+            return {"erro": "Prazo da consulta em lote excedido."}
+        if limitador is not None:
+            limitador.adquirir()
+            if prazo_excedido():
+                return {"erro": "Prazo da consulta em lote excedido."}
+        return funcao(item)
+
+    concluidos = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concorrencia, len(itens)))) as executor:
+        futuros = {executor.submit(tarefa, item): item for item in itens}
+        for futuro in as_completed(futuros):
+            item = futuros[futuro]
+            try:
+                concluidos[item] = futuro.result()
+            except Exception as e:
+                concluidos[item] = {"erro": str(e)}
+            if ao_concluir is not None:
+                ao_concluir(item, concluidos[item])
+
+    # Preservar a ordem original da lista de processos
+    return {item: concluidos[item] for item in itens}
+
+
+def _executar_com_limitador(url, itens, funcao, prazo_final, ao_concluir=None):
+    """Executa o lote com um limitador de taxa criado para a URL."""
+    limitador = criar_limitador(url)
+    try:
+        return executar_em_lote(itens, funcao, API_MAX_CONCORRENCIA, limitador, prazo_final, ao_concluir)
+    finally:
+        encerrar_limitador(url, limitador)
+
+
+def dividir_em_grupos(itens, tamanho):
+    """Divide a lista de itens em tuplas de até `tamanho` elementos."""
+    return [tuple(itens[i:i + tamanho]) for i in range(0, len(itens), tamanho)]
+
+
+def consultar_processos_em_lote(url, numeros, prazo_final=None, campos=None, ao_concluir=None):
+    """
+    Consulta uma lista de processos no endpoint informado.
+
+    No modo "agrupado" (API_MODO_LOTE), os números são reunidos em grupos de
+    API_TAMANHO_GRUPO e cada grupo é buscado com uma única consulta `terms`.
+    No modo "individual", cada processo gera uma requisição `match`.
+
+    Args:
+        url: URL do endpoint do tribunal
+        numeros: Lista de números de processo
+        prazo_final: Instante limite (time.monotonic) da consulta em lote
+        campos: Campos de `_source` a trazer (None para o documento completo)
+        ao_concluir: Função chamada com {numero: resultado} a cada consulta
+            ou grupo concluído (ex.: gravação no diário do lote)
+
+    Returns:
+        dict: {numero: resultado} na ordem da lista recebida
+    """
+    numeros = list(numeros)
+    total = len(numeros)
+    contador = {"concluidos": 0}
+    trava = threading.Lock()
+
+    def registrar_progresso(quantidade, descricao):
+        with trava:
+            contador["concluidos"] += quantidade
+            print(f"Processos consultados {contador['concluidos']}/{total}: {descricao}")
+
+    if API_MODO_LOTE == "agrupado":
+        def consultar_grupo(grupo):
+            try:
+                resultados_grupo = consultar_processos_agrupados(url, grupo, API_TAMANHO_PAGINA, campos)
+            except Exception as e:
+                # Uma falha no grupo é registrada para cada processo dele
+                print(f"Exceção ao consultar grupo de {len(grupo)} processos: {str(e)}")
+                resultados_grupo = {numero: {"erro": str(e)} for numero in grupo}
+            registrar_progresso(len(grupo), f"grupo iniciado em {grupo[0]}")
+            return resultados_grupo
+
+        def separar_grupo(grupo, resultados_grupo):
+            if "erro" in resultados_grupo:
+                return {numero: resultados_grupo for numero in grupo}
+            return resultados_grupo
+
+        def grupo_concluido(grupo, resultados_grupo):
+            if ao_concluir is not None:
+                ao_concluir(separar_grupo(grupo, resultados_grupo))
+
+        grupos = dividir_em_grupos(numeros, API_TAMANHO_GRUPO)
+        resultados = {}
+        for grupo, resultados_grupo in _executar_com_limitador(url, grupos, consultar_grupo, prazo_final,
+                                                               grupo_concluido).items():
+            resultados.update(separar_grupo(grupo, resultados_grupo))
+        return {numero: resultados[numero] for numero in numeros}
+
+    def consultar(numero):
+        try:
+            resultado = consultar_processo(url, numero, campos)
+            if "erro" in resultado:
+                print(f"Erro ao consultar o processo {numero}: {resultado['erro']}")
+        except Exception as e:
+            # Capturar qualquer erro durante a consulta
+            resultado = {"erro": str(e)}
+            print(f"Exceção ao consultar o processo {numero}: {str(e)}")
+        registrar_progresso(1, numero)
+        return resultado
+
+    def processo_concluido(numero, resultado):
+        if ao_concluir is not None:
+            ao_concluir({numero: resultado})
+
+    return _executar_com_limitador(url, numeros, consultar, prazo_final, processo_concluido)
+
+
+def filtrar_processos_atualizados(url, numeros, desde, prazo_final=None):
+    """
+    Retorna, na ordem original, os processos atualizados no DataJud após `desde`.
+
+    Grupos cuja verificação falhar são mantidos integralmente no retorno, para
+    que sejam consultados por completo em vez de serem ignorados.
+
+    Args:
+        url: URL do endpoint do tribunal
+        numeros: Lista de números de processo
+        desde: Data/hora ISO 8601 (UTC) da última sincronização
+        prazo_final: Instante limite (time.monotonic) da consulta em lote
+
+    Returns:
+        list: Números que devem ser consultados novamente
+    """
+    numeros = list(numeros)
+
+    def verificar_grupo(grupo):
+        try:
+            return listar_processos_atualizados(url, grupo, desde, API_TAMANHO_PAGINA)
+        except Exception as e:
+            print(f"Erro ao verificar atualizações de {len(grupo)} processos: {str(e)}")
+            return set(grupo)
+
+    grupos = dividir_em_grupos(numeros, API_TAMANHO_GRUPO)
+    atualizados = set()
+    for grupo, resultado_grupo in _executar_com_limitador(url, grupos, verificar_grupo, prazo_final).items():
+        atualizados.update(resultado_grupo if isinstance(resultado_grupo, set) else grupo)
+    return [numero for numero in numeros if numero in atualizados]
+
+
+def consultar_processo_tribunal(tipo, url, arquivo_resultados, numero_processo, forcar_atualizacao=False):
+    """
+    Consulta um único processo de um tribunal e atualiza o arquivo de resultados.
+
+    Se o arquivo de resultados já tiver uma resposta completa dentro do prazo
+    de validade do cache, ela é retornada sem acessar a API.
+
+    Args:
+        tipo (str): Tipo do tribunal ('TJ' ou 'TRF')
+        url: URL do endpoint do tribunal
+        arquivo_resultados: Caminho do arquivo de resultados
+        numero_processo: Número do processo a ser consultado
+        forcar_atualizacao (bool): Se True, ignora o cache e consulta a API
+
+    Returns:
+        dict: Resultado da consulta
+    """
+    # Números com formato ou dígito verificador inválido não são enviados à API
+    if not validar_numero(numero_processo):
+        return {"erro": f"Número de processo inválido (dígito verificador): {numero_processo}"}
+
+    try:
+        resultados = abrir_armazenamento(arquivo_resultados)
+        arquivados = abrir_arquivados(arquivo_resultados)
+        # A validade é verificada no resumo (na camada em uso e na de arquivados);
+        # a resposta completa só é lida se for usada
+        if not forcar_atualizacao:
+            for camada in (resultados, arquivados):
+                if resultado_em_cache_valido(camada.resumo(numero_processo)):
+                    print(f"Resultado do processo {numero_processo} obtido do cache local.")
+                    return camada[numero_processo]
+
+        resultado = marcar_consulta(consultar_processo(url, numero_processo))
+
+        # Gravar apenas o resultado deste processo (na camada de arquivados, se encerrado)
+        gravar_resultados(resultados, arquivados, {numero_processo: resultado})
+        registrar_no_historico(tipo, {numero_processo: resultado})
+        print(f"Resultado do processo {numero_processo} atualizado no arquivo {arquivo_resultados}")
+
+        return resultado
+
+    except Exception as e:
+        erro = marcar_consulta({"erro": str(e)})
+
+        # Mesmo em caso de erro, atualizar o arquivo com a informação do erro
+        try:
+            gravar_resultados(abrir_armazenamento(arquivo_resultados), abrir_arquivados(arquivo_resultados),
+                              {numero_processo: erro})
+        except Exception as e_gravacao:
+            print(f"Erro ao gravar o resultado do processo {numero_processo}: {str(e_gravacao)}")
+
+        print(f"Erro ao consultar o processo {numero_processo}: {str(e)}")
+        return erro
+
+
+def consultar_todos_processos(tipo, url, arquivo_lista, arquivo_resultados, incremental=False,
+                              resumido=API_PROJECAO_LOTE, id_lote=None, incluir_arquivados=False):
+    """
+    Consulta os processos cadastrados de um tribunal e atualiza o arquivo de resultados.
+
+    Cada resultado concluído é gravado no diário do lote, permitindo retomar
+    uma consulta interrompida com `id_lote`. Processos encerrados ficam na
+    camada de arquivados e não são consultados, salvo com `incluir_arquivados`.
+
+    Args:
+        tipo (str): Tipo do tribunal ('TJ' ou 'TRF')
+        url: URL do endpoint do tribunal
+        arquivo_lista: Caminho da lista de processos
+        arquivo_resultados: Caminho do arquivo de resultados
+        incremental (bool): Se True, consulta apenas os processos sem resultado
+            válido em cache ou atualizados no DataJud desde a última sincronização
+        resumido (bool): Se True, baixa apenas os campos de API_CAMPOS_LOTE
+        id_lote (str): Identificador de um lote interrompido a retomar
+        incluir_arquivados (bool): Se True, também consulta os processos arquivados
+
+    Returns:
+        dict: Resultados das consultas do lote
+    """
+    # Resultados existentes: lidos sob demanda, processo a processo
+    resultados_arquivo = abrir_armazenamento(arquivo_resultados)
+    arquivados = abrir_arquivados(arquivo_resultados)
+
+    prazo_final = calcular_prazo_final()
+
+    if id_lote:
+        diario = DiarioLote.abrir(id_lote)
+        if diario is None:
+            return {}
+        if diario.tipo != tipo:
+            print(f"O lote {id_lote} pertence aos processos {diario.tipo}, não {tipo}.")
+            return {}
+        parametros = diario.cabecalho.get("parametros", {})
+        resumido = parametros.get("resumido", resumido)
+        inicio_sincronizacao = parametros.get("inicio_sincronizacao")
+        numeros = diario.pendentes()
+        print(f"Retomando lote {diario.id}: {len(diario.numeros) - len(numeros)} de "
+              f"{len(diario.numeros)} processos já consultados.")
+    else:
+        # Carregar a lista de processos
+        lista_processos = carregar_lista_processos(arquivo_lista)
+
+        if not lista_processos:
+            print(f"Nenhum processo encontrado na lista {arquivo_lista}.")
+            return {}
+
+        print(f"Lista de processos {tipo} carregada: {len(lista_processos)} processos encontrados.")
+
+        # Números com dígito verificador inválido não chegam a ser consultados
+        lista_processos, invalidos = validar_numeros(lista_processos)
+        if invalidos:
+            print(f"{len(invalidos)} processos ignorados por número inválido (dígito verificador): "
+                  f"{', '.join(str(n) for n in invalidos[:5])}{'...' if len(invalidos) > 5 else ''}")
+            if not lista_processos:
+                return {}
+
+        if not incluir_arquivados:
+            ignorados = {n for n in lista_processos if n in arquivados}
+            if ignorados:
+                lista_processos = [n for n in lista_processos if n not in ignorados]
+                print(f"{len(ignorados)} processos arquivados (encerrados) ignorados; "
+                      "use a opção de incluir arquivados para consultá-los.")
+                if not lista_processos:
+                    return {}
+
+        inicio_sincronizacao = momento_atual_utc()
+        numeros = lista_processos
+        ultima_sincronizacao = obter_ultima_sincronizacao(tipo) if incremental else None
+
+        if ultima_sincronizacao:
+            # Processos sem resultado válido em cache sempre são consultados por completo
+            sem_cache = []
+            for n in lista_processos:
+                resumo = resultados_arquivo.resumo(n) or arquivados.resumo(n)
+                if resumo is None or "erro" in resumo:
+                    sem_cache.append(n)
+            pendentes = set(sem_cache)
+            em_cache = [n for n in lista_processos if n not in pendentes]
+            print(f"Sincronização incremental desde {ultima_sincronizacao}: verificando {len(em_cache)} processos em cache.")
+            atualizados = filtrar_processos_atualizados(url, em_cache, ultima_sincronizacao, prazo_final)
+            numeros = sem_cache + atualizados
+            print(f"Processos a consultar: {len(atualizados)} atualizados, {len(sem_cache)} sem resultado em cache.")
+        elif incremental:
+            print("Nenhuma sincronização anterior registrada. Realizando consulta completa.")
+
+        diario = DiarioLote.criar(tipo, numeros, resumido=resumido, inicio_sincronizacao=inicio_sincronizacao)
+        print(f"Lote {diario.id} iniciado com {len(numeros)} processos.")
+
+    def registrar_no_diario(resultados_concluidos):
+        diario.registrar({numero: marcar_consulta(resultado)
+                          for numero, resultado in resultados_concluidos.items()})
+
+    try:
+        if numeros:
+            consultar_processos_em_lote(url, numeros, prazo_final, API_CAMPOS_LOTE if resumido else None,
+                                        registrar_no_diario)
+    finally:
+        diario.fechar()
+
+    resultados = {numero: diario.resultados[numero] for numero in diario.numeros if numero in diario.resultados}
+    erros = sum(1 for resultado in resultados.values() if "erro" in resultado)
+    consultas_feitas = len(resultados) - erros
+
+    # Atualizar o arquivo de resultados
+    try:
+        # Gravar apenas os resultados alterados deste lote (o hash do conteúdo
+        # evita regravar processos sem mudança), com uma única sincronização em disco
+        a_gravar, alteracoes, inalterados = comparar_lote(resultados_arquivo, resultados, arquivados)
+        if a_gravar:
+            # Encerrados vão para a camada de arquivados; depois, o limite do cache é aplicado
+            gravar_resultados(resultados_arquivo, arquivados, a_gravar)
+            registrar_no_historico(tipo, a_gravar)
+        if inalterados:
+            # Sem mudança: apenas o momento da consulta (validade) e o acesso (limite do cache)
+            resultados_arquivo.renovar_consultas(inalterados)
+            arquivados.renovar_consultas(inalterados)
+        arquivar_encerrados(resultados_arquivo, arquivados)
+        resultados_arquivo.compactar_se_necessario()
+        arquivados.compactar_se_necessario()
+        print(f"Arquivo de resultados {arquivo_resultados} atualizado com sucesso "
+              f"({len(a_gravar)} gravados, {len(inalterados)} sem alteração).")
+
+        registrar_alteracoes(tipo, alteracoes)
+        print(f"\n--- Alterações desde a consulta anterior ({len(alteracoes)} processos) ---")
+        for linha in linhas_alteracoes(alteracoes):
+            print(linha)
+        print()
+
+        if erros:
+            # O diário é mantido para que apenas os processos com erro sejam repetidos
+            print(f"O lote {diario.id} pode ser retomado para repetir as consultas com erro.")
+        else:
+            diario.concluir()
+            if inicio_sincronizacao:
+                registrar_sincronizacao(tipo, inicio_sincronizacao)
+        print(f"Consultas realizadas: {consultas_feitas}, Erros: {erros}")
+    except Exception as e:
+        print(f"Erro ao salvar o arquivo de resultados: {str(e)}")
+        print(f"Os resultados continuam disponíveis no lote {diario.id} para retomada.")
+
+    # Retorna apenas os resultados das consultas realizadas nesta execução
+    return resultados
@@ -0,0 +1,245 @@
+"""
+Camada de resiliência das chamadas ao DataJud.
+Implementa novas tentativas com espera exponencial (com jitter) e um
+disjuntor (circuit breaker) por endpoint, que falha rapidamente enquanto o
+tribunal está fora do ar e volta a testá-lo depois de um intervalo.
+Também acompanha a latência de cada endpoint para disparar requisições
+duplicadas (hedging) quando a primeira demora mais que o percentil configurado.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from ..config import (API_MAX_TENTATIVAS, API_ESPERA_BASE, API_ESPERA_MAXIMA, API_STATUS_RETENTAVEIS,
+                      CIRCUITO_LIMITE_FALHAS, CIRCUITO_TEMPO_ABERTO, API_POOL_MAX_CONEXOES)
+
+# Quantidade mínima de amostras de latência antes de habilitar o hedging
+AMOSTRAS_MINIMAS_HEDGE = 20
+
+
+class CircuitoAberto(Exception):
+    """Erro lançado quando o disjuntor do endpoint está aberto."""
+
+
+class Disjuntor:
+    """Disjuntor de um endpoint: fechado, aberto ou meio-aberto (em teste)."""
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio-aberto"
+
+    def __init__(self, nome, limite_falhas=CIRCUITO_LIMITE_FALHAS, tempo_aberto=CIRCUITO_TEMPO_ABERTO):
+        """
+        Args:
+            nome: Identificação do endpoint (usada nas mensagens)
+            limite_falhas: Falhas consecutivas que abrem o circuito
+            tempo_aberto: Segundos até liberar uma requisição de teste
+        """
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._trava = threading.Lock()
+
+    def permitir(self):
+        """Indica se uma requisição pode ser feita agora."""
+        with self._trava:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                self.estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+            if self.estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                # Apenas uma requisição de teste por vez
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar_sucesso(self):
+        """Fecha o circuito após uma resposta bem-sucedida."""
+        with self._trava:
+            if self.estado != self.FECHADO:
+                print(f"Circuito {self.nome} fechado: endpoint respondendo novamente.")
+            self.estado = self.FECHADO
+            self._falhas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        """Contabiliza uma falha e abre o circuito se o limite for atingido."""
+        with self._trava:
+            self._falhas += 1
+            self._teste_em_andamento = False
+            if self.estado == self.MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                if self.estado != self.ABERTO:
+                    print(f"Circuito {self.nome} aberto após {self._falhas} falhas consecutivas.")
+                self.estado = self.ABERTO
+                self._aberto_em = time.monotonic()
+
+
+_disjuntores = {}
+_trava_disjuntores = threading.Lock()
+
+
+def obter_disjuntor(url):
+    """Retorna o disjuntor associado à URL, criando-o se necessário."""
+    with _trava_disjuntores:
+        if url not in _disjuntores:
+            _disjuntores[url] = Disjuntor(url)
+        return _disjuntores[url]
+
+
+class MonitorLatencia:
+    """Guarda as latências mais recentes de um endpoint para cálculo de percentis."""
+
+    def __init__(self, janela=200):
+        self._amostras = deque(maxlen=janela)
+        self._trava = threading.Lock()
+
+    def registrar(self, segundos):
+        """Registra a duração de uma requisição concluída."""
+        with self._trava:
+            self._amostras.append(segundos)
+
+    def percentil(self, fracao):
+        """
+        Retorna o percentil das latências registradas (ex.: 0.95 para p95).
+
+        Returns:
+            float: Latência em segundos ou None se houver poucas amostras
+        """
+        with self._trava:
+            if len(self._amostras) < AMOSTRAS_MINIMAS_HEDGE:
+                return None
+            ordenadas = sorted(self._amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(fracao * len(ordenadas)))]
+
+
+_monitores = {}
+_executor_hedge = None
+
+
+def obter_monitor_latencia(url):
+    """Retorna o monitor de latência associado à URL, criando-o se necessário."""
+    with _trava_disjuntores:
+        if url not in _monitores:
+            _monitores[url] = MonitorLatencia()
+        return _monitores[url]
+
+
+def executar_com_hedge(requisitar, limiar):
+    """
+    Executa a requisição e, se ela passar de `limiar` segundos sem resposta,
+    dispara uma cópia; retorna a primeira que terminar com sucesso.
+
+    Args:
+        requisitar: Função sem argumentos que faz a requisição e retorna a resposta
+        limiar: Segundos de espera antes da requisição duplicada (None desativa)
+
+    Returns:
+        Resposta da requisição mais rápida
+    """
+    global _executor_hedge
+    if limiar is None:
+        return requisitar()
+
+    with _trava_disjuntores:
+        if _executor_hedge is None:
+            _executor_hedge = ThreadPoolExecutor(max_workers=API_POOL_MAX_CONEXOES * 2)
+
+    pendentes = {_executor_hedge.submit(requisitar)}
+    concluidos, pendentes = wait(pendentes, timeout=limiar)
+    if not concluidos:
+        pendentes.add(_executor_hedge.submit(requisitar))
+
+    erro = None
+    while True:
+        for futuro in concluidos:
+            if futuro.exception() is None:
+                return futuro.result()
+            erro = futuro.exception()
+        if not pendentes:
+            raise erro
+        concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+
+
+def calcular_espera(tentativa, retry_after=None):
+    """
+    Calcula a espera antes da próxima tentativa (backoff exponencial com jitter).
+
+    Args:
+        tentativa: Número da tentativa que falhou (1, 2, ...)
+        retry_after: Valor do cabeçalho Retry-After, em segundos, se houver
+
+    Returns:
+        float: Segundos de espera
+    """
+    espera = random.uniform(0, min(API_ESPERA_MAXIMA, API_ESPERA_BASE * (2 ** (tentativa - 1))))
+    if retry_after is not None:
+        espera = max(espera, retry_after)
+    return espera
+
+
+def ler_retry_after(response):
+    """Lê o cabeçalho Retry-After (em segundos) de uma resposta, se existir."""
+    valor = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(valor)) if valor is not None else None
+    except ValueError:
+        return None
+
+
+def executar_com_retentativas(requisitar, disjuntor, excecoes_retentaveis=(),
+                              max_tentativas=API_MAX_TENTATIVAS):
+    """
+    Executa uma requisição com novas tentativas e proteção do disjuntor.
+
+    Respostas com status em API_STATUS_RETENTAVEIS e as exceções informadas
+    são repetidas; as demais respostas são devolvidas imediatamente.
+
+    Args:
+        requisitar: Função sem argumentos que faz a requisição e retorna a resposta
+        disjuntor: Disjuntor do endpoint
+        excecoes_retentaveis: Exceções que justificam nova tentativa
+        max_tentativas: Número máximo de tentativas
+
+    Returns:
+        Resposta da última tentativa
+
+    Raises:
+        CircuitoAberto: Se o endpoint estiver indisponível
+    """
+    for tentativa in range(1, max_tentativas + 1):
+        if not disjuntor.permitir():
+            raise CircuitoAberto(f"Circuito aberto para {disjuntor.nome}: requisição não enviada.")
+
+        try:
+            response = requisitar()
+        except excecoes_retentaveis as e:
+            disjuntor.registrar_falha()
+            if tentativa == max_tentativas:
+                raise
+            espera = calcular_espera(tentativa)
+            print(f"Falha na requisição ({str(e)}). Nova tentativa em {espera:.1f}s.")
+            time.sleep(espera)
+            continue
+        except Exception:
+            # Qualquer outra exceção também conta como falha: do contrário, uma
+            # requisição de teste deixaria o circuito meio-aberto para sempre
+            disjuntor.registrar_falha()
+            raise
+
+        if response.status_code not in API_STATUS_RETENTAVEIS:
+            disjuntor.registrar_sucesso()
+            return response
+
+        disjuntor.registrar_falha()
+        if tentativa == max_tentativas:
+            return response
+        espera = calcular_espera(tentativa, ler_retry_after(response))
+        print(f"Código de status {response.status_code}. Nova tentativa em {espera:.1f}s.")
+        time.sleep(espera)
@@ -1,151 +1,40 @@
-import requests
-import json
-import time
-from ..config import API_TRF6_URL, API_KEY, API_DELAY, LISTA_TRF_FILE, RESULTADO_TRF_FILE
-from ..utils.file_handler import carregar_arquivo_json, salvar_arquivo_json
+from ..config import API_TRF6_URL, API_PROJECAO_LOTE, LISTA_TRF_FILE, RESULTADO_TRF_FILE
+from .lote import consultar_processo_tribunal, consultar_todos_processos
 
-def consultar_processo_trf6(numero_processo):
+def consultar_processo_trf6(numero_processo, forcar_atualizacao=False):
     """
     Consulta um único processo no TRF6 e atualiza o arquivo de resultados.
-    
+
+    Se o arquivo de resultados já tiver uma resposta completa dentro do prazo
+    de validade do cache, ela é retornada sem acessar a API.
+
     Args:
         numero_processo: Número do processo a ser consultado
-        
+        forcar_atualizacao (bool): Se True, ignora o cache e consulta a API
+
     Returns:
         dict: Resultado da consulta
     """
-    headers = {
-        'Authorization': API_KEY,
-        'Content-Type': 'application/json'
-    }
-    
-    payload = json.dumps({
-        "query": {
-            "match": {
-                "numeroProcesso": numero_processo
-            }
-        }
-    })
-    
-    try:
-        # Fazer a requisição à API
-        response = requests.request("POST", API_TRF6_URL, headers=headers, data=payload)
-        
-        # Preparar o resultado da consulta
-        if response.status_code == 200:
-            resultado = response.json()
-        else:
-            resultado = {"erro": f"Código de status: {response.status_code}", "mensagem": response.text}
-        
-        # Carregar o dicionário atual de resultados
-        resultados = carregar_arquivo_json(RESULTADO_TRF_FILE)
-        if not resultados:
-            resultados = {}
-        
-        # Atualizar o dicionário com o novo resultado
-        resultados[numero_processo] = resultado
-        
-        # Salvar o dicionário atualizado
-        salvar_arquivo_json(RESULTADO_TRF_FILE, resultados)
-        print(f"Resultado do processo {numero_processo} atualizado no arquivo {RESULTADO_TRF_FILE}")
-        
-        return resultado
-        
-    except Exception as e:
-        erro = {"erro": str(e)}
-        
-        # Mesmo em caso de erro, atualizar o arquivo com a informação do erro
-        resultados = carregar_arquivo_json(RESULTADO_TRF_FILE)
-        if not resultados:
-            resultados = {}
-            
-        resultados[numero_processo] = erro
-        salvar_arquivo_json(RESULTADO_TRF_FILE, resultados)
-        
-        print(f"Erro ao consultar o processo {numero_processo}: {str(e)}")
-        return erro
+    return consultar_processo_tribunal("TRF", API_TRF6_URL, RESULTADO_TRF_FILE, numero_processo, forcar_atualizacao)
 
-def consultar_todos_processos_trf6():
+def consultar_todos_processos_trf6(incremental=False, resumido=API_PROJECAO_LOTE, id_lote=None,
+                                   incluir_arquivados=False):
     """
     Consulta todos os processos do TRF na lista e retorna um dicionário com os resultados.
     Garante que o arquivo de resultados seja atualizado com todos os processos da lista.
+
+    As consultas são feitas em paralelo e, no modo "agrupado" (API_MODO_LOTE),
+    vários processos são buscados em uma única requisição. Cada resultado é
+    gravado no diário do lote assim que concluído.
+
+    Args:
+        incremental (bool): Se True, consulta apenas os processos sem resultado
+            válido em cache ou atualizados no DataJud desde a última sincronização
+        resumido (bool): Se True, baixa apenas os campos de API_CAMPOS_LOTE,
+            suficientes para as listagens em lote
+        id_lote (str): Identificador de um lote interrompido a retomar
+        incluir_arquivados (bool): Se True, também consulta os processos da
+            camada de arquivados (encerrados)
     """
-    # Carregar a lista de processos TRF
-    lista_processos = carregar_arquivo_json(LISTA_TRF_FILE)
-    
-    if not lista_processos:
-        print(f"Nenhum processo encontrado na lista {LISTA_TRF_FILE}.")
-        return {}
-    
-    print(f"Lista de processos TRF carregada: {len(lista_processos)} processos encontrados.")
-    
-    # Dicionário para armazenar os resultados da execução atual
-    resultados = {}
-    
-    # Carregar resultados existentes para atualização do arquivo
-    arquivo_resultados = carregar_arquivo_json(RESULTADO_TRF_FILE)
-    if not arquivo_resultados:
-        arquivo_resultados = {}
-    
-    total = len(lista_processos)
-    consultas_feitas = 0
-    erros = 0
-    
-    for i, numero in enumerate(lista_processos, 1):
-        try:
-            print(f"Consultando processo {i}/{total}: {numero}")
-            
-            # Fazer a consulta do processo
-            headers = {
-                'Authorization': API_KEY,
-                'Content-Type': 'application/json'
-            }
-            
-            payload = json.dumps({
-                "query": {
-                    "match": {
-                        "numeroProcesso": numero
-                    }
-                }
-            })
-            
-            # Fazer a requisição à API
-            response = requests.request("POST", API_TRF6_URL, headers=headers, data=payload)
-            
-            # Processar o resultado
-            if response.status_code == 200:
-                resultado = response.json()
-                resultados[numero] = resultado
-                consultas_feitas += 1
-            else:
-                erro = {"erro": f"Código de status: {response.status_code}", "mensagem": response.text}
-                resultados[numero] = erro
-                erros += 1
-                print(f"Erro ao consultar o processo {numero}: Código {response.status_code}")
-            
-            # Aguardar entre as requisições para evitar sobrecarga na API
-            time.sleep(API_DELAY)
-            
-        except Exception as e:
-            # Capturar qualquer erro durante a consulta
-            erro = {"erro": str(e)}
-            resultados[numero] = erro
-            erros += 1
-            print(f"Exceção ao consultar o processo {numero}: {str(e)}")
-            time.sleep(API_DELAY)  # Mesmo com erro, aguardar antes da próxima requisição
-    
-    # Atualizar o arquivo de resultados
-    try:
-        # Atualizar o arquivo com os novos resultados
-        for numero, resultado in resultados.items():
-            arquivo_resultados[numero] = resultado
-            
-        # Salvar o arquivo atualizado
-        salvar_arquivo_json(RESULTADO_TRF_FILE, arquivo_resultados)
-        print(f"Arquivo de resultados {RESULTADO_TRF_FILE} atualizado com sucesso.")
-        print(f"Consultas realizadas: {consultas_feitas}, Erros: {erros}")
-    except Exception as e:
-        print(f"Erro ao salvar o arquivo de resultados: {str(e)}")
-    
-    # Retorna apenas os resultados das consultas realizadas nesta execução
-    return resultados
\ No newline at end of file
+    return consultar_todos_processos("TRF", API_TRF6_URL, LISTA_TRF_FILE, RESULTADO_TRF_FILE,
+                                     incremental, resumido, id_lote, incluir_arquivados)
@@ -1,45 +1,278 @@
+import json
 import os
 
 # Determina o diretório base automaticamente baseado na localização do arquivo config.py
 # Isso permite que o sistema seja executado de qualquer local sem modificações
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Caminho do diretório de cache
-CACHE_DIR = os.path.join(BASE_DIR, "assets", "cache")
+# Os valores abaixo são padrões: cada um pode ser substituído pela variável de
+# ambiente COMPILADOR_<NOME> ou pela chave <NOME> do arquivo de configuração
+# (JSON, em COMPILADOR_CONFIG ou config.json na pasta do programa). Importar
+# este módulo não cria diretórios nem arquivos; eles são criados na primeira gravação.
+PREFIXO_AMBIENTE = "COMPILADOR_"
+CONFIG_FILE = os.environ.get(PREFIXO_AMBIENTE + "CONFIG", os.path.join(BASE_DIR, "config.json"))
+
+
+def _carregar_arquivo_configuracao(caminho):
+    """Lê o arquivo de configuração; um arquivo ausente equivale a nenhuma substituição."""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            dados = json.load(arquivo)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Arquivo de configuração {caminho} ignorado: {str(e)}")
+        return {}
+    if not isinstance(dados, dict):
+        print(f"Arquivo de configuração {caminho} ignorado: o conteúdo deve ser um objeto JSON.")
+        return {}
+    return dados
+
+
+_configuracao_arquivo = _carregar_arquivo_configuracao(CONFIG_FILE)
+
+
+def configuracao(nome, padrao, mesclar=False):
+    """
+    Valor de uma configuração, na ordem: variável de ambiente, arquivo de
+    configuração e valor padrão.
+
+    Valores do ambiente que não são texto (números, booleanos, listas e
+    dicionários) são lidos em JSON, por exemplo COMPILADOR_API_TAXA_ADAPTATIVA=false.
+
+    Args:
+        nome (str): Nome da configuração (o mesmo da constante)
+        padrao: Valor usado quando não há substituição
+        mesclar (bool): Para dicionários, aplica as chaves informadas sobre o
+            padrão (e, nos valores que também são dicionários, as subchaves),
+            em vez de substituí-lo por inteiro
 
-# Assegura que o diretório cache existe
-os.makedirs(CACHE_DIR, exist_ok=True)
+    Returns:
+        O valor configurado, convertido para o tipo do padrão
+    """
+    texto = os.environ.get(PREFIXO_AMBIENTE + nome)
+    if texto is not None:
+        if isinstance(padrao, str):
+            return texto
+        try:
+            valor = json.loads(texto)
+        except ValueError:
+            print(f"Variável {PREFIXO_AMBIENTE}{nome} ignorada: valor inválido ({texto}).")
+            return padrao
+    elif nome in _configuracao_arquivo:
+        valor = _configuracao_arquivo[nome]
+    else:
+        return padrao
+
+    if valor is None or padrao is None:
+        return valor
+    try:
+        if isinstance(padrao, bool):
+            return bool(valor)
+        if isinstance(padrao, (int, float)):
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                raise ValueError(valor)
+            return float(valor) if isinstance(padrao, float) else valor
+        if isinstance(padrao, tuple):
+            return tuple(valor)
+        if isinstance(padrao, dict):
+            if not isinstance(valor, dict):
+                raise ValueError(valor)
+            if mesclar:
+                mesclado = dict(padrao)
+                for chave, item in valor.items():
+                    if isinstance(item, dict) and isinstance(padrao.get(chave), dict):
+                        item = dict(padrao[chave], **item)
+                    mesclado[chave] = item
+                return mesclado
+    except (TypeError, ValueError):
+        print(f"Configuração {nome} ignorada: valor inválido ({valor!r}).")
+        return padrao
+    return valor
+
+
+# Caminho do diretório de cache
+CACHE_DIR = configuracao("CACHE_DIR", os.path.join(BASE_DIR, "assets", "cache"))
 
 # Arquivos de listas
 LISTA_TJ_FILE = os.path.join(CACHE_DIR, "lista_processos_tj.json")
 LISTA_TRF_FILE = os.path.join(CACHE_DIR, "lista_processos_trf.json")
 
-# Arquivos de resultados
-RESULTADO_TJ_FILE = os.path.join(CACHE_DIR, "resultados_processos_tj.json")
-RESULTADO_TRF_FILE = os.path.join(CACHE_DIR, "resultados_processos_trf.json")
+# Arquivos de resultados (log de registros por processo; os antigos
+# resultados_processos_*.json são migrados na primeira abertura)
+RESULTADO_TJ_FILE = os.path.join(CACHE_DIR, "resultados_processos_tj.dat")
+RESULTADO_TRF_FILE = os.path.join(CACHE_DIR, "resultados_processos_trf.dat")
+
+# Camadas do cache de resultados: as respostas completas ficam comprimidas
+# (deflate, o mesmo algoritmo do gzip) e são lidas apenas para a exibição
+# detalhada e o PDF; listas e estatísticas usam o log de resumos
+# (resultados_processos_*.resumos.dat), pequeno e sem compressão
+ARMAZENAMENTO_COMPRIMIR = configuracao("ARMAZENAMENTO_COMPRIMIR", True)
+ARMAZENAMENTO_NIVEL_COMPRESSAO = configuracao("ARMAZENAMENTO_NIVEL_COMPRESSAO", 6)
+
+# Limite das respostas completas mantidas em cache (0 = sem limite). Acima dele,
+# as usadas há mais tempo são descartadas; os resumos permanecem e a resposta
+# volta a ser baixada da API quando necessária. Não se aplica ao motor SQLite,
+# que guarda todas as respostas
+CACHE_MAX_RESULTADOS = configuracao("CACHE_MAX_RESULTADOS", 0)
+CACHE_MAX_MB = configuracao("CACHE_MAX_MB", 256)
+
+# Processos com estes status vão para a camada de arquivados
+# (resultados_processos_*.arquivados.dat), que as consultas em lote ignoram,
+# salvo quando solicitado
+STATUS_ARQUIVAMENTO = configuracao("STATUS_ARQUIVAMENTO", ("Arquivado definitivamente", "Transitado em julgado"))
+
+# Motor de armazenamento das listas e resultados: "arquivo" (JSON e log de
+# resultados) ou "sqlite" (banco indexado; o cache em arquivos é migrado na
+# primeira abertura). A camada de arquivados continua em log nos dois motores
+ARMAZENAMENTO_MOTOR = configuracao("ARMAZENAMENTO_MOTOR", "arquivo")
+BANCO_DADOS_FILE = os.path.join(CACHE_DIR, "compilador_juridico.db")
+
+# Importação de processos: tribunal de destino pelos segmentos J (justiça)
+# e TR (tribunal) do número CNJ; números de outros tribunais são ignorados
+IMPORTACAO_TRIBUNAIS = {
+    ("8", "13"): "TJ",   # Justiça Estadual - TJMG
+    ("4", "06"): "TRF"   # Justiça Federal - TRF6
+}
+
+# Diários das consultas em lote, usados para retomar consultas interrompidas
+LOTES_DIR = os.path.join(CACHE_DIR, "lotes")
+
+# Registro da última sincronização bem-sucedida de cada tribunal
+SINCRONIZACAO_FILE = os.path.join(CACHE_DIR, "sincronizacao.json")
+
+# Alterações (movimentos novos e mudanças de status) da última consulta em
+# lote de cada tribunal, exibidas na tela, no terminal e no PDF
+ALTERACOES_FILE = os.path.join(CACHE_DIR, "alteracoes.json")
+
+# Histórico de movimentos e mudanças de status de cada processo (SQLite),
+# usado nas consultas por data sem acessar a API
+HISTORICO_FILE = os.path.join(CACHE_DIR, "historico_processos.db")
+
+# Validade (em segundos) dos resultados em cache: consultas com processo
+# encontrado e consultas negativas (erro ou processo não encontrado)
+CACHE_TTL_SEGUNDOS = configuracao("CACHE_TTL_SEGUNDOS", 6 * 60 * 60)
+CACHE_TTL_NEGATIVO_SEGUNDOS = configuracao("CACHE_TTL_NEGATIVO_SEGUNDOS", 15 * 60)
 
 # Configurações de API
-API_KEY = "ApiKey cDZHYzlZa0JadVREZDJCendQbXY6SkJlTzNjLV9TRENyQk1RdnFKZGRQdw=="
-API_TJMG_URL = "https://api-publica.datajud.cnj.jus.br/api_publica_tjmg/_search"
-API_TRF6_URL = "https://api-publica.datajud.cnj.jus.br/api_publica_trf6/_search"
+API_KEY = configuracao("API_KEY", "ApiKey cDZHYzlZa0JadVREZDJCendQbXY6SkJlTzNjLV9TRENyQk1RdnFKZGRQdw==")
+API_TJMG_URL = configuracao("API_TJMG_URL", "https://api-publica.datajud.cnj.jus.br/api_publica_tjmg/_search")
+API_TRF6_URL = configuracao("API_TRF6_URL", "https://api-publica.datajud.cnj.jus.br/api_publica_trf6/_search")
+
+# Consultas em lote: requisições simultâneas e limite de requisições por segundo
+# (com a taxa adaptativa, API_REQUISICOES_POR_SEGUNDO é apenas a taxa inicial)
+API_MAX_CONCORRENCIA = configuracao("API_MAX_CONCORRENCIA", 8)
+API_REQUISICOES_POR_SEGUNDO = configuracao("API_REQUISICOES_POR_SEGUNDO", 4.0)
+API_RAJADA_MAXIMA = configuracao("API_RAJADA_MAXIMA", 8)
+
+# Taxa adaptativa (AIMD): sobe cerca de API_TAXA_INCREMENTO req/s por segundo de
+# respostas rápidas e bem-sucedidas e é multiplicada por API_FATOR_REDUCAO em
+# respostas 429/5xx, falhas de conexão ou latência acima de
+# API_LATENCIA_FATOR_ALERTA vezes a média recente (e acima de API_LATENCIA_MINIMA_ALERTA)
+API_TAXA_ADAPTATIVA = configuracao("API_TAXA_ADAPTATIVA", True)
+API_TAXA_MINIMA = configuracao("API_TAXA_MINIMA", 0.5)
+API_TAXA_MAXIMA = configuracao("API_TAXA_MAXIMA", 20.0)
+API_TAXA_INCREMENTO = configuracao("API_TAXA_INCREMENTO", 0.5)
+API_FATOR_REDUCAO = configuracao("API_FATOR_REDUCAO", 0.5)
+API_LATENCIA_FATOR_ALERTA = configuracao("API_LATENCIA_FATOR_ALERTA", 3.0)
+API_LATENCIA_MINIMA_ALERTA = configuracao("API_LATENCIA_MINIMA_ALERTA", 1.0)
+
+# Modo das consultas em lote: "agrupado" (uma consulta `terms` por grupo de
+# processos) ou "individual" (uma consulta `match` por processo)
+API_MODO_LOTE = configuracao("API_MODO_LOTE", "agrupado")
+API_TAMANHO_GRUPO = configuracao("API_TAMANHO_GRUPO", 100)
+# Documentos por página nas consultas agrupadas (from + size deve ficar abaixo de 10.000)
+API_TAMANHO_PAGINA = configuracao("API_TAMANHO_PAGINA", 1000)
+
+# Sincronização incremental: margem subtraída da última sincronização (em segundos)
+# para compensar diferenças de relógio e atrasos na indexação do DataJud
+SINCRONIZACAO_MARGEM_SEGUNDOS = configuracao("SINCRONIZACAO_MARGEM_SEGUNDOS", 300)
 
-# Pausa entre consultas à API (em segundos)
-API_DELAY = 0.5
+# Novas tentativas: máximo de tentativas por requisição, espera exponencial
+# (base e teto em segundos, com jitter) e códigos de status que justificam repetir
+API_MAX_TENTATIVAS = configuracao("API_MAX_TENTATIVAS", 4)
+API_ESPERA_BASE = configuracao("API_ESPERA_BASE", 0.5)
+API_ESPERA_MAXIMA = configuracao("API_ESPERA_MAXIMA", 10.0)
+API_STATUS_RETENTAVEIS = configuracao("API_STATUS_RETENTAVEIS", (429, 500, 502, 503, 504))
+
+# Disjuntor por endpoint: falhas consecutivas que abrem o circuito e tempo
+# (em segundos) até uma nova requisição de teste
+CIRCUITO_LIMITE_FALHAS = configuracao("CIRCUITO_LIMITE_FALHAS", 5)
+CIRCUITO_TEMPO_ABERTO = configuracao("CIRCUITO_TEMPO_ABERTO", 30.0)
+
+# Projeção de campos nas consultas em lote: só os campos usados nas listagens
+# são baixados; a consulta individual continua trazendo o documento completo
+API_PROJECAO_LOTE = configuracao("API_PROJECAO_LOTE", True)
+API_CAMPOS_LOTE = configuracao("API_CAMPOS_LOTE", [
+    "numeroProcesso",
+    "tribunal",
+    "grau",
+    "orgaoJulgador",
+    "dataHoraUltimaAtualizacao",
+    "movimentos.codigo",
+    "movimentos.nome",
+    "movimentos.dataHora"
+])
+
+# Parâmetros por tribunal: tempos limite de conexão e de leitura (em segundos)
+# e hedging, que envia uma requisição duplicada quando a primeira passa do
+# percentil de latência indicado (com um piso mínimo em segundos). Uma
+# substituição pode trazer apenas os tribunais e parâmetros alterados
+API_PARAMETROS_TRIBUNAL = configuracao("API_PARAMETROS_TRIBUNAL", {
+    API_TJMG_URL: {
+        "timeout_conexao": 5.0,
+        "timeout_leitura": 30.0,
+        "hedge": False,
+        "hedge_percentil": 0.95,
+        "hedge_minimo": 1.0
+    },
+    API_TRF6_URL: {
+        "timeout_conexao": 5.0,
+        "timeout_leitura": 30.0,
+        "hedge": False,
+        "hedge_percentil": 0.95,
+        "hedge_minimo": 1.0
+    }
+}, mesclar=True)
+API_PARAMETROS_PADRAO = API_PARAMETROS_TRIBUNAL[API_TJMG_URL]
+
+# Prazo máximo (em segundos) de uma consulta em lote; None para não limitar
+API_PRAZO_LOTE = configuracao("API_PRAZO_LOTE", 3600)
+
+# Pool de conexões HTTP persistentes (keep-alive) compartilhado pelas consultas
+API_POOL_CONEXOES = configuracao("API_POOL_CONEXOES", 2)
+API_POOL_MAX_CONEXOES = configuracao("API_POOL_MAX_CONEXOES", 16)
+
+# Status do processo pelo código do movimento mais recente da tabela. Em caso
+# de movimentos na mesma data, vale o que aparece primeiro (maior precedência).
+# Novos códigos podem ser incluídos aqui; os resultados já gravados são
+# reclassificados automaticamente.
+STATUS_MOVIMENTOS = configuracao("STATUS_MOVIMENTOS", {
+    22: "Arquivado definitivamente",   # Baixa Definitiva
+    246: "Arquivado definitivamente",  # Arquivamento Definitivo
+    848: "Transitado em julgado",
+    196: "Execução extinta",
+    893: "Desarquivado"
+})
+STATUS_PADRAO = configuracao("STATUS_PADRAO", "Em andamento")
+
+# Resumos de processos (ProcessoResumo) mantidos em memória para reuso
+# entre a tela, o terminal e os relatórios PDF
+RESUMO_CACHE_TAMANHO = configuracao("RESUMO_CACHE_TAMANHO", 4096)
 
 # Função para inicializar os arquivos JSON se eles não existirem
 def inicializar_arquivos_json():
-    """Cria arquivos JSON vazios se não existirem"""
-    arquivos = [LISTA_TJ_FILE, LISTA_TRF_FILE, RESULTADO_TJ_FILE, RESULTADO_TRF_FILE]
+    """
+    Cria o diretório de cache e as listas vazias, se não existirem. Não é
+    necessária para o funcionamento (listas ausentes são lidas como vazias
+    e os arquivos são criados na primeira gravação).
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Os arquivos de resultados são criados pelo próprio armazenamento
+    arquivos = [LISTA_TJ_FILE, LISTA_TRF_FILE]
     for arquivo in arquivos:
         if not os.path.exists(arquivo):
             with open(arquivo, 'w', encoding='utf-8') as f:
-                if arquivo.startswith(LISTA_TJ_FILE) or arquivo.startswith(LISTA_TRF_FILE):
-                    # Listas são arrays vazios
-                    f.write('[]')
-                else:
-                    # Resultados são objetos vazios
-                    f.write('{}')
+                # Listas são arrays vazios
+                f.write('[]')
             print(f"Arquivo {os.path.basename(arquivo)} criado.")
-
-# Inicializa os arquivos JSON na primeira execução
-inicializar_arquivos_json()
\ No newline at end of file
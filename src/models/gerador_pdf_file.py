@@ -13,6 +13,8 @@ from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib.units import inch#, cm
 from reportlab.lib.enums import TA_CENTER##, TA_LEFT
 from datetime import datetime
+from xml.sax.saxutils import escape
+from ..utils.alteracoes import linhas_alteracoes
 
 class GeradorPDF:
     """Classe responsável por gerar relatórios PDF"""
@@ -200,8 +202,9 @@ class GeradorPDF:
         return GeradorPDF.salvar_arquivo_pdf(conteudo)
     
     @staticmethod
-    def gerar_pdf_consulta_lote(tipo, resultados):
-        """Gera um PDF com o resultado da consulta em lote de processos"""
+    def gerar_pdf_consulta_lote(tipo, resultados, alteracoes=None):
+        """Gera um PDF com o resultado da consulta em lote de processos e, se
+        informadas, as alterações desde a consulta anterior"""
         styles = getSampleStyleSheet()
 
         # Personalizar estilos
@@ -221,6 +224,14 @@ class GeradorPDF:
         conteudo.append(Paragraph(f"Total de processos consultados: {len(resultados)}", styles['Normal']))
         conteudo.append(Spacer(1, 0.3*inch))
         
+        # O que mudou desde a consulta anterior
+        if alteracoes is not None:
+            conteudo.append(Paragraph(f"O que mudou ({len(alteracoes)} processos)", styles['Subtitulo']))
+            for linha in linhas_alteracoes(alteracoes):
+                estilo = 'Item' if linha.startswith("  ") else 'Normal'
+                conteudo.append(Paragraph(escape(linha.strip()), styles[estilo]))
+            conteudo.append(Spacer(1, 0.3*inch))
+        
         # Criar tabela de resultados com cabeçalho específico para cada tipo
         if tipo == "TJ":
             dados_tabela = [["Número do Processo", "Tribunal", "Última Atualização", "Status"]]
@@ -1,34 +1,104 @@
-import re
+from enum import IntEnum
+from ..utils.cnj import PADRAO_NUMERO, compactar_numero, digito_valido, expandir_numero
+
+
+class Tribunal(IntEnum):
+    """Tribunais atendidos, armazenados como inteiros pequenos."""
+
+    TJ = 1
+    TRF = 2
+
+    @classmethod
+    def de_texto(cls, valor):
+        """Converte 'TJ'/'TRF' (ou um Tribunal) no membro correspondente."""
+        if isinstance(valor, cls):
+            return valor
+        try:
+            return cls[str(valor).upper()]
+        except KeyError:
+            raise ValueError("Tipo de processo inválido. Deve ser 'TJ' ou 'TRF'.")
+
 
 class Processo:
-    """Classe para representar e validar um processo judicial."""
-    
+    """
+    Classe para representar e validar um processo judicial.
+
+    O número é guardado como um inteiro de 18 dígitos (sem o dígito
+    verificador, que é recalculado) e o tribunal como um Tribunal, sem
+    dicionário de atributos por instância.
+    """
+
+    __slots__ = ("_chave", "_tribunal")
+
     def __init__(self, numero, tipo):
         self.numero = numero
-        self.tipo = tipo.upper()
-        
+        self.tipo = tipo
+
+    @classmethod
+    def de_chave(cls, chave, tribunal):
+        """Cria um processo a partir da chave compacta, sem revalidar o número."""
+        processo = cls.__new__(cls)
+        processo._chave = chave
+        processo._tribunal = Tribunal(tribunal)
+        return processo
+
+    @classmethod
+    def de_json(cls, dados, tipo=None):
+        """
+        Cria um processo a partir do formato JSON atual.
+
+        Args:
+            dados: Número de 20 dígitos (como nas listas) ou dicionário
+                {"numero": ..., "tipo": ...}
+            tipo (str): Tipo do processo, quando `dados` for apenas o número
+        """
+        if isinstance(dados, dict):
+            return cls(dados["numero"], dados.get("tipo", tipo))
+        return cls(dados, tipo)
+
+    def para_json(self):
+        """Dicionário {"numero", "tipo"} serializável em JSON."""
+        return {"numero": self.numero, "tipo": self.tipo}
+
+    @property
+    def chave(self):
+        return self._chave
+
     @property
     def numero(self):
-        return self._numero
-        
+        return expandir_numero(self._chave)
+
     @numero.setter
     def numero(self, value):
         if not self.validar_numero(value):
-            raise ValueError("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos.")
-        self._numero = value
-    
+            raise ValueError("Número de processo inválido. Deve conter exatamente 20 dígitos numéricos "
+                             "e dígito verificador válido.")
+        self._chave = compactar_numero(value)
+
+    @property
+    def tribunal(self):
+        return self._tribunal
+
     @property
     def tipo(self):
-        return self._tipo
-        
+        return self._tribunal.name
+
     @tipo.setter
     def tipo(self, value):
-        if value not in ["TJ", "TRF"]:
-            raise ValueError("Tipo de processo inválido. Deve ser 'TJ' ou 'TRF'.")
-        self._tipo = value
-    
+        self._tribunal = Tribunal.de_texto(value)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, Processo):
+            return NotImplemented
+        return self._chave == outro._chave and self._tribunal == outro._tribunal
+
+    def __hash__(self):
+        return hash((self._chave, self._tribunal))
+
+    def __repr__(self):
+        return f"Processo({self.numero!r}, {self.tipo!r})"
+
     @staticmethod
     def validar_numero(numero):
-        """Valida se o número do processo tem exatamente 20 dígitos numéricos."""
-        padrao = re.compile(r'^\d{20}$')
-        return bool(padrao.match(numero))
\ No newline at end of file
+        """Valida se o número do processo tem 20 dígitos numéricos e dígito verificador (CNJ) válido."""
+        return isinstance(numero, str) and bool(PADRAO_NUMERO.fullmatch(numero)) and digito_valido(numero)
@@ -0,0 +1,134 @@
+"""
+Registro compacto de processos para carteiras grandes.
+
+Cada número é guardado como um inteiro sem sinal de 64 bits (os 18 dígitos
+sem o dígito verificador), em dois arrays: um na ordem de cadastro e outro
+ordenado para buscas binárias. Um milhão de processos ocupa cerca de 16 MB,
+contra mais de 100 MB de uma lista de strings com um índice em dicionário.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from ..utils.cnj import compactar_numero, expandir_numero, validar_numeros
+from ..utils.file_handler import carregar_arquivo_json, salvar_arquivo_json
+from .processo import Processo, Tribunal
+
+
+class RegistroCompacto:
+    """Números de processo de um tribunal, em arrays de inteiros de 64 bits."""
+
+    __slots__ = ("tribunal", "_ordem", "_ordenados")
+
+    def __init__(self, tribunal, numeros=()):
+        self.tribunal = Tribunal.de_texto(tribunal)
+        self._ordem = array("Q")
+        self._ordenados = array("Q")
+        if numeros:
+            self.adicionar(numeros)
+
+    def _posicao(self, chave):
+        """Posição da chave no array ordenado, ou -1 se não estiver cadastrada."""
+        posicao = bisect_left(self._ordenados, chave)
+        if posicao < len(self._ordenados) and self._ordenados[posicao] == chave:
+            return posicao
+        return -1
+
+    def adicionar(self, numeros):
+        """
+        Cadastra vários números, ignorando os já existentes.
+
+        Args:
+            numeros (iterable): Números com 20 dígitos ou no formato CNJ
+
+        Returns:
+            tuple: (adicionados, invalidos) — números incluídos (20 dígitos, na
+                ordem recebida) e os recusados por formato ou dígito verificador
+        """
+        validos, invalidos = validar_numeros(numeros)
+        # Chave -> número, sem repetições e preservando a ordem da entrada
+        candidatos = {}
+        for numero in validos:
+            candidatos.setdefault(compactar_numero(numero), numero)
+        if self._ordenados:
+            posicao = self._posicao
+            candidatos = {chave: numero for chave, numero in candidatos.items() if posicao(chave) < 0}
+        novas = list(candidatos)
+
+        if len(novas) > 64:
+            # Em lote, reordenar tudo de uma vez é mais barato que inserir um a um
+            self._ordem.extend(novas)
+            self._ordenados = array("Q", sorted(self._ordem))
+        else:
+            for chave in novas:
+                self._ordem.append(chave)
+                insort(self._ordenados, chave)
+        return list(candidatos.values()), invalidos
+
+    def remover(self, numeros):
+        """
+        Remove vários números com uma única reconstrução dos arrays.
+
+        Returns:
+            list: Números removidos (20 dígitos)
+        """
+        validos, _ = validar_numeros(numeros)
+        chaves = {}
+        for numero in validos:
+            chave = compactar_numero(numero)
+            if self._posicao(chave) >= 0:
+                chaves.setdefault(chave, numero)
+        if chaves:
+            self._ordem = array("Q", (chave for chave in self._ordem if chave not in chaves))
+            self._ordenados = array("Q", (chave for chave in self._ordenados if chave not in chaves))
+        return list(chaves.values())
+
+    def __contains__(self, numero):
+        if isinstance(numero, Processo):
+            return numero.tribunal == self.tribunal and self._posicao(numero.chave) >= 0
+        validos, _ = validar_numeros([numero])
+        return bool(validos) and self._posicao(compactar_numero(validos[0])) >= 0
+
+    def __len__(self):
+        return len(self._ordem)
+
+    def __iter__(self):
+        """Percorre os números de 20 dígitos, na ordem de cadastro."""
+        for chave in self._ordem:
+            yield expandir_numero(chave)
+
+    def processos(self):
+        """Percorre os processos como objetos Processo, na ordem de cadastro."""
+        for chave in self._ordem:
+            yield Processo.de_chave(chave, self.tribunal)
+
+    def memoria_ocupada(self):
+        """Bytes ocupados pelos arrays de números."""
+        return self._ordem.buffer_info()[1] * self._ordem.itemsize * 2
+
+    # Conversão de e para o formato JSON das listas (lista de números de 20 dígitos)
+
+    @classmethod
+    def de_json(cls, lista, tribunal):
+        """Cria o registro a partir de uma lista JSON de números."""
+        return cls(tribunal, lista or [])
+
+    def para_json(self):
+        """Lista de números de 20 dígitos, na ordem de cadastro."""
+        return list(self)
+
+    @classmethod
+    def carregar(cls, caminho, tribunal):
+        """
+        Carrega um arquivo de lista no formato JSON atual.
+
+        Números com dígito verificador inválido são descartados e informados.
+        """
+        registro = cls(tribunal)
+        _, invalidos = registro.adicionar(carregar_arquivo_json(caminho) or [])
+        if invalidos:
+            print(f"{len(invalidos)} números inválidos ignorados ao carregar {caminho}.")
+        return registro
+
+    def salvar(self, caminho):
+        """Grava o registro no formato JSON atual das listas."""
+        return salvar_arquivo_json(caminho, self.para_json())
@@ -0,0 +1,381 @@
+"""
+Resumo normalizado de um processo a partir da resposta do DataJud.
+
+A resposta bruta é percorrida uma única vez (os movimentos também) e os fatos
+usados pela interface gráfica, pelo terminal e pelos relatórios PDF ficam em
+um ProcessoResumo imutável, guardado em memória para as próximas exibições.
+"""
+
+import heapq
+import threading
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from ..config import RESUMO_CACHE_TAMANHO, STATUS_PADRAO
+from .status import obter_classificador
+
+# Baixa, Trânsito em julgado, Desarquivamento, Conversão e Arquivamento Definitivo
+MOVIMENTOS_IMPORTANTES = (22, 848, 893, 14732, 246)
+CODIGO_TRANSITO_JULGADO = 848
+CODIGO_CONVERSAO_ELETRONICO = 14732
+MOVIMENTOS_RECENTES = 5
+
+Movimento = namedtuple("Movimento", ["codigo", "nome", "data_hora"])
+Instancia = namedtuple("Instancia", ["grau", "classe", "data_ajuizamento"])
+
+
+def formatar_data(valor):
+    """
+    Converte uma data do DataJud (ISO 8601 ou AAAAMMDDhhmmss) para DD/MM/AAAA.
+
+    Valores em outro formato são devolvidos sem alteração.
+    """
+    if not valor:
+        return ""
+    if len(valor) >= 10 and valor[4] == "-" and valor[7] == "-":
+        return f"{valor[8:10]}/{valor[5:7]}/{valor[:4]}"
+    if len(valor) >= 8 and valor[:8].isdigit():
+        return f"{valor[6:8]}/{valor[4:6]}/{valor[:4]}"
+    return valor
+
+
+def descrever_instancia(instancia):
+    """Descrição da instância/fase a partir do grau e da classe."""
+    if instancia.grau == "G1":
+        return "Primeira Instância (G1)"
+    if instancia.grau == "G2":
+        if "Recurso" in instancia.classe or "Agravo" in instancia.classe:
+            return "Recurso (G2)"
+        return "Segunda Instância (G2)"
+    return instancia.grau
+
+
+def _nome(valor):
+    """Nome de um campo que pode vir como {"nome": ...} ou como texto."""
+    if isinstance(valor, dict):
+        return valor.get("nome")
+    return valor if isinstance(valor, str) else None
+
+
+@dataclass(frozen=True)
+class ProcessoResumo:
+    """Fatos de um processo já extraídos da resposta do DataJud."""
+
+    numero: str
+    encontrado: bool = False
+    tribunal: str = None
+    classe: str = None
+    assuntos: tuple = ()
+    formato: str = None
+    sistema: str = None
+    orgao_julgador: str = None
+    data_ajuizamento: str = None
+    ultima_atualizacao: str = None
+    status: str = STATUS_PADRAO
+    movimento_status: Movimento = None
+    data_conversao: str = None
+    data_transito: str = None
+    ultimo_movimento: Movimento = None
+    movimentos_recentes: tuple = ()
+    movimentos_importantes: tuple = ()
+    instancias: tuple = ()
+
+    @property
+    def data_inicio(self):
+        """Data de ajuizamento da primeira instância (DD/MM/AAAA)."""
+        for instancia in self.instancias:
+            if instancia.grau == "G1" and instancia.data_ajuizamento:
+                return formatar_data(instancia.data_ajuizamento)
+        return ""
+
+    def descrever_ultimo_movimento(self):
+        """Texto "[codigo] nome (data)" do movimento mais recente."""
+        if self.ultimo_movimento is None:
+            return "Não informado"
+        codigo, nome, data_hora = self.ultimo_movimento
+        return f"[{codigo}] {nome or 'Não especificado'} ({formatar_data(data_hora)})"
+
+    def linha_lote(self):
+        """Campos exibidos nas listagens e no PDF das consultas em lote."""
+        return {
+            "numero": self.numero,
+            "tribunal": self.tribunal or "Não informado",
+            "orgao_julgador": self.orgao_julgador or "Não informado",
+            "ultima_atualizacao": formatar_data(self.ultima_atualizacao),
+            "status": self.status,
+            "ultimo_movimento": self.descrever_ultimo_movimento()
+        }
+
+
+def _resumir_movimentos(movimentos, classificador):
+    """
+    Percorre os movimentos uma única vez, sem ordenar a lista inteira.
+
+    O status segue as mesmas regras de ClassificadorStatus.classificar,
+    aplicadas nesta mesma passada.
+
+    Returns:
+        dict: Campos do ProcessoResumo derivados dos movimentos
+    """
+    regras = classificador.regras
+    movimento_status = None
+    chave_status = None
+    data_conversao = None
+    data_transito = None
+    ultimo = None
+    importantes = []
+    recentes = []
+
+    for indice, mov in enumerate(movimentos or ()):
+        if not isinstance(mov, dict):
+            continue
+        codigo = mov.get("codigo")
+        data_hora = mov.get("dataHora") or ""
+        movimento = Movimento(codigo, mov.get("nome"), data_hora)
+
+        if ultimo is None or data_hora > ultimo.data_hora:
+            ultimo = movimento
+        # Heap limitado aos mais recentes (o índice desempata datas iguais)
+        item = (data_hora, -indice, movimento)
+        if len(recentes) < MOVIMENTOS_RECENTES:
+            heapq.heappush(recentes, item)
+        elif item > recentes[0]:
+            heapq.heapreplace(recentes, item)
+
+        regra = regras.get(codigo)
+        if regra is not None and (chave_status is None or (data_hora, regra[1]) >= chave_status):
+            movimento_status = movimento
+            chave_status = (data_hora, regra[1])
+        if codigo in MOVIMENTOS_IMPORTANTES and data_hora:
+            importantes.append(movimento)
+        if codigo == CODIGO_CONVERSAO_ELETRONICO and data_conversao is None:
+            data_conversao = data_hora
+        if codigo == CODIGO_TRANSITO_JULGADO and data_transito is None:
+            data_transito = data_hora
+
+    importantes.sort(key=lambda movimento: movimento.data_hora)
+    return {
+        "status": regras[movimento_status.codigo][0] if movimento_status else classificador.padrao,
+        "movimento_status": movimento_status,
+        "data_conversao": data_conversao,
+        "data_transito": data_transito,
+        "ultimo_movimento": ultimo,
+        "movimentos_recentes": tuple(item[2] for item in sorted(recentes, reverse=True)),
+        "movimentos_importantes": tuple(importantes)
+    }
+
+
+def fontes_resultado(resultado):
+    """Documentos (_source) da resposta do DataJud."""
+    try:
+        hits = resultado["hits"]["hits"]
+    except (KeyError, TypeError):
+        return []
+    return [hit["_source"] for hit in hits or () if isinstance(hit, dict) and isinstance(hit.get("_source"), dict)]
+
+
+def fonte_principal(fontes):
+    """Primeira instância (grau G1) ou, na falta dela, o primeiro documento."""
+    return next((fonte for fonte in fontes if fonte.get("grau") == "G1"), fontes[0])
+
+
+def extrair_resumo(numero, resultado):
+    """
+    Monta o ProcessoResumo de uma resposta do DataJud.
+
+    Os dados principais vêm da primeira instância (grau G1) ou, na falta
+    dela, do primeiro documento retornado.
+
+    Args:
+        numero (str): Número do processo
+        resultado (dict): Resposta da API (sem a chave "erro")
+
+    Returns:
+        ProcessoResumo: Resumo do processo (encontrado=False se não houver documentos)
+    """
+    fontes = fontes_resultado(resultado)
+    if not fontes:
+        return ProcessoResumo(numero)
+
+    principal = fonte_principal(fontes)
+    instancias = tuple(
+        Instancia(fonte["grau"], _nome(fonte.get("classe")), fonte.get("dataAjuizamento"))
+        for fonte in fontes if fonte.get("grau") and _nome(fonte.get("classe"))
+    )
+    assuntos = tuple(nome for nome in (_nome(assunto) for assunto in principal.get("assuntos") or ()) if nome)
+
+    return ProcessoResumo(
+        numero=numero,
+        encontrado=True,
+        tribunal=principal.get("tribunal"),
+        classe=principal.get("classeProcessual") or _nome(principal.get("classe")),
+        assuntos=assuntos,
+        formato=_nome(principal.get("formato")),
+        sistema=_nome(principal.get("sistema")),
+        orgao_julgador=_nome(principal.get("orgaoJulgador")),
+        data_ajuizamento=principal.get("dataAjuizamento") or fontes[0].get("dataAjuizamento"),
+        ultima_atualizacao=principal.get("dataHoraUltimaAtualizacao"),
+        instancias=instancias,
+        **_resumir_movimentos(principal.get("movimentos"), obter_classificador())
+    )
+
+
+def classificar_resultado(resultado, classificador=None):
+    """
+    Status de um processo a partir da resposta gravada, sem montar o resumo.
+
+    Returns:
+        str: Status do processo ou None se a resposta não tiver documentos
+    """
+    fontes = fontes_resultado(resultado)
+    if not fontes:
+        return None
+    status, _ = (classificador or obter_classificador()).classificar(fonte_principal(fontes).get("movimentos"))
+    return status
+
+
+def reclassificar_status(resultados, classificador=None):
+    """
+    Reclassifica em lote o status de vários processos.
+
+    Args:
+        resultados: Iterável de pares (numero, resultado), como
+            `armazenamento.items()`
+        classificador (ClassificadorStatus): Regras a aplicar (padrão: as atuais)
+
+    Returns:
+        dict: Número -> status (None para respostas sem documentos)
+    """
+    classificador = classificador or obter_classificador()
+    return {numero: classificar_resultado(resultado, classificador) for numero, resultado in resultados}
+
+
+_resumos = OrderedDict()
+_trava_resumos = threading.Lock()
+
+
+def obter_resumo(numero, resultado):
+    """
+    Retorna o resumo do processo, reaproveitando o já calculado para a mesma
+    resposta (identificada pelo número, pelo instante da consulta e pelas
+    regras de status vigentes).
+
+    Args:
+        numero (str): Número do processo
+        resultado (dict): Resposta da API gravada no cache
+
+    Returns:
+        ProcessoResumo: Resumo do processo
+    """
+    consultado_em = resultado.get("_consultado_em") if isinstance(resultado, dict) else None
+    if consultado_em is None:
+        return extrair_resumo(numero, resultado)
+
+    # A assinatura das regras de status invalida os resumos após uma mudança na tabela
+    chave = (numero, consultado_em, obter_classificador().assinatura)
+    with _trava_resumos:
+        resumo = _resumos.get(chave)
+        if resumo is not None:
+            _resumos.move_to_end(chave)
+            return resumo
+
+    resumo = extrair_resumo(numero, resultado)
+    with _trava_resumos:
+        _resumos[chave] = resumo
+        if len(_resumos) > RESUMO_CACHE_TAMANHO:
+            _resumos.popitem(last=False)
+    return resumo
+
+
+# Marcas locais da resposta copiadas para a camada de resumos do cache
+MARCAS_CONSULTA = ("_consultado_em", "_hash", "_campos", "erro")
+
+
+def resumo_compacto(numero, resultado):
+    """
+    Campos de um processo guardados na camada de resumos do cache: o suficiente
+    para listas, estatísticas e a validade do cache, sem a resposta completa.
+
+    Args:
+        numero (str): Número do processo
+        resultado (dict): Resposta da API gravada no cache
+
+    Returns:
+        dict: Campos de `linha_lote` (sem o número), "encontrado", as marcas da
+            consulta (_consultado_em, _hash, _campos, erro) e a assinatura das
+            regras de status usadas ("_regras")
+    """
+    resumo = obter_resumo(numero, resultado)
+    dados = resumo.linha_lote() if resumo.encontrado else {"status": None}
+    dados.pop("numero", None)
+    dados["encontrado"] = resumo.encontrado
+    dados["_regras"] = obter_classificador().assinatura
+    if isinstance(resultado, dict):
+        for chave in MARCAS_CONSULTA:
+            if chave in resultado:
+                dados[chave] = resultado[chave]
+    return dados
+
+
+def linhas_resumo(resumo):
+    """
+    Texto da consulta individual, linha a linha, no formato usado pela tela,
+    pelo terminal e pelo PDF.
+
+    Args:
+        resumo (ProcessoResumo): Resumo do processo encontrado
+
+    Returns:
+        list: Linhas de texto (sem quebra de linha)
+    """
+    linhas = ["INFORMAÇÕES BÁSICAS", "-" * 30, f"* Número do Processo: {resumo.numero}"]
+    if resumo.tribunal:
+        linhas.append(f"* Tribunal: {resumo.tribunal}"
+                      + (" (Tribunal de Justiça de Minas Gerais)" if resumo.tribunal == "TJMG" else ""))
+    if resumo.data_ajuizamento:
+        linhas.append(f"* Data de Ajuizamento: {formatar_data(resumo.data_ajuizamento)}")
+    if resumo.classe:
+        linhas.append(f"* Classe Original: {resumo.classe}")
+    if resumo.data_conversao:
+        linhas.append(f"* Formato: Inicialmente Físico, convertido para Eletrônico em {formatar_data(resumo.data_conversao)}")
+    elif resumo.formato:
+        linhas.append(f"* Formato: {resumo.formato}")
+    if resumo.sistema:
+        linhas.append(f"* Sistema: {resumo.sistema}")
+    if resumo.assuntos:
+        linhas.append(f"* Assunto: {'; '.join(resumo.assuntos)}")
+
+    linhas += ["", "SITUAÇÃO ATUAL", "-" * 30]
+    if resumo.ultima_atualizacao:
+        linhas.append(f"* Última Atualização: {formatar_data(resumo.ultima_atualizacao)}")
+    if resumo.movimento_status:
+        linhas.append(f"* Status: {resumo.status} ({resumo.movimento_status.nome} em "
+                      f"{formatar_data(resumo.movimento_status.data_hora)})")
+    else:
+        linhas.append(f"* Status: {resumo.status}")
+    if resumo.orgao_julgador:
+        linhas.append(f"* Órgão Julgador Original: {resumo.orgao_julgador}")
+    if resumo.ultimo_movimento:
+        linhas.append(f"* Último Movimento: {resumo.descrever_ultimo_movimento()}")
+
+    if resumo.instancias:
+        linhas += ["", "HISTÓRICO PROCESSUAL", "-" * 30,
+                   f"O processo passou por {len(resumo.instancias)} instância(s)/fase(s):"]
+        for contador, instancia in enumerate(resumo.instancias, 1):
+            texto = f"{contador}. {descrever_instancia(instancia)}: {instancia.classe}"
+            if instancia.data_ajuizamento:
+                texto += f" (iniciada em {formatar_data(instancia.data_ajuizamento)})"
+            linhas.append(texto)
+
+    if resumo.movimentos_importantes or resumo.data_transito:
+        linhas += ["", "MOVIMENTAÇÕES IMPORTANTES", "-" * 30]
+        if resumo.data_inicio and resumo.data_transito:
+            linhas.append(f"* O processo tramitou de {resumo.data_inicio} a {formatar_data(resumo.data_transito)}")
+        for movimento in resumo.movimentos_importantes:
+            linhas.append(f"* {movimento.nome} em {formatar_data(movimento.data_hora)}")
+
+    if resumo.movimentos_recentes:
+        linhas += ["", "HISTÓRICO RECENTE", "-" * 30]
+        for contador, movimento in enumerate(resumo.movimentos_recentes, 1):
+            linhas.append(f"{contador}. [{movimento.codigo}] {movimento.nome or 'Não informado'} "
+                          f"({formatar_data(movimento.data_hora)})")
+    return linhas
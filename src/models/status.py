@@ -0,0 +1,87 @@
+"""
+Classificação do status de um processo pelos códigos de movimento.
+
+A tabela de precedência (STATUS_MOVIMENTOS, em config) associa cada código
+a um status; o status do processo é o do movimento da tabela com a data mais
+recente, encontrado em uma única passada, sem ordenar os movimentos.
+"""
+
+import hashlib
+import json
+import threading
+from ..config import STATUS_MOVIMENTOS, STATUS_PADRAO
+
+
+class ClassificadorStatus:
+    """Tabela código de movimento -> status, com precedência para empates de data."""
+
+    __slots__ = ("regras", "padrao", "assinatura")
+
+    def __init__(self, tabela=None, padrao=None):
+        """
+        Args:
+            tabela (dict): Código -> status, em ordem de precedência
+                (padrão: STATUS_MOVIMENTOS)
+            padrao (str): Status sem movimento da tabela (padrão: STATUS_PADRAO)
+        """
+        tabela = STATUS_MOVIMENTOS if tabela is None else tabela
+        self.padrao = padrao or STATUS_PADRAO
+        # Código -> (status, precedência); a precedência negativa faz com que,
+        # na mesma data, o código listado primeiro na tabela vença a comparação
+        self.regras = {int(codigo): (status, -posicao) for posicao, (codigo, status) in enumerate(tabela.items())}
+        conteudo = json.dumps([[int(codigo), status] for codigo, status in tabela.items()] + [self.padrao],
+                              ensure_ascii=False)
+        self.assinatura = hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+    def classificar(self, movimentos):
+        """
+        Determina o status a partir dos movimentos de um processo.
+
+        Args:
+            movimentos (list): Movimentos do DataJud (codigo, nome, dataHora)
+
+        Returns:
+            tuple: (status, movimento) — o movimento que definiu o status ou None
+        """
+        regras = self.regras
+        melhor = None
+        chave_melhor = None
+        for mov in movimentos or ():
+            if not isinstance(mov, dict):
+                continue
+            regra = regras.get(mov.get("codigo"))
+            if regra is None:
+                continue
+            chave = (mov.get("dataHora") or "", regra[1])
+            if chave_melhor is None or chave >= chave_melhor:
+                melhor = mov
+                chave_melhor = chave
+        if melhor is None:
+            return self.padrao, None
+        return regras[melhor["codigo"]][0], melhor
+
+
+_classificador = None
+_trava_classificador = threading.Lock()
+
+
+def obter_classificador():
+    """Classificador compartilhado, montado a partir de STATUS_MOVIMENTOS."""
+    global _classificador
+    with _trava_classificador:
+        if _classificador is None:
+            _classificador = ClassificadorStatus()
+        return _classificador
+
+
+def recarregar_classificador(tabela=None, padrao=None):
+    """
+    Substitui o classificador compartilhado após uma mudança nas regras.
+
+    Returns:
+        ClassificadorStatus: O novo classificador
+    """
+    global _classificador
+    with _trava_classificador:
+        _classificador = ClassificadorStatus(tabela, padrao)
+        return _classificador
@@ -0,0 +1,223 @@
+"""
+Detecção de alterações entre a resposta gravada de um processo e a nova.
+
+Cada resposta recebe um hash do conteúdo ("_hash"); quando ele não muda, o
+processo não é reprocessado nem gravado de novo. Nos demais, os movimentos
+são comparados por grau, código e data/hora, e a data de última atualização
+e o status indicam o que mudou desde a consulta anterior.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from ..config import ALTERACOES_FILE
+from ..models.resumo import Movimento, classificar_resultado, fontes_resultado, formatar_data
+from .file_handler import atualizar_arquivo_json, carregar_arquivo_json
+from .sincronizacao import momento_atual_utc
+
+
+@dataclass(frozen=True)
+class Alteracao:
+    """O que mudou em um processo desde a última consulta."""
+
+    numero: str
+    novo: bool = False
+    status_anterior: str = None
+    status_atual: str = None
+    atualizacao_anterior: str = None
+    atualizacao_atual: str = None
+    movimentos_novos: tuple = ()
+
+    @property
+    def mudou_status(self):
+        return not self.novo and self.status_anterior != self.status_atual
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Recria a alteração a partir do formato gravado em ALTERACOES_FILE."""
+        dados = dict(dados)
+        dados["movimentos_novos"] = tuple(Movimento(*movimento) for movimento in dados.get("movimentos_novos", ()))
+        return cls(**dados)
+
+
+def hash_conteudo(resultado):
+    """
+    Hash do conteúdo de uma resposta, sem as marcas locais (_consultado_em etc.).
+
+    Returns:
+        str: Hash SHA-1 ou None para respostas com erro
+    """
+    if not isinstance(resultado, dict) or "erro" in resultado:
+        return None
+    conteudo = {"hits": resultado.get("hits"), "_campos": resultado.get("_campos")}
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True, ensure_ascii=False,
+                                   separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _chaves_movimentos(fontes):
+    """Conjunto (grau, código, data/hora) dos movimentos de todas as instâncias."""
+    return {(fonte.get("grau"), mov.get("codigo"), mov.get("dataHora"))
+            for fonte in fontes for mov in fonte.get("movimentos") or () if isinstance(mov, dict)}
+
+
+def _ultima_atualizacao(fontes):
+    return max((fonte.get("dataHoraUltimaAtualizacao") or "" for fonte in fontes), default="") or None
+
+
+def detectar_alteracoes(numero, anterior, atual):
+    """
+    Compara a resposta gravada de um processo com a nova.
+
+    Args:
+        numero (str): Número do processo
+        anterior (dict): Resposta gravada (ou None)
+        atual (dict): Nova resposta da API
+
+    Returns:
+        Alteracao: O que mudou, ou None se nada mudou (ou se a nova resposta é um erro)
+    """
+    fontes_atuais = fontes_resultado(atual)
+    if not fontes_atuais or "erro" in atual:
+        return None
+
+    atualizacao_atual = _ultima_atualizacao(fontes_atuais)
+    status_atual = classificar_resultado(atual)
+    fontes_anteriores = fontes_resultado(anterior) if isinstance(anterior, dict) else []
+    if not fontes_anteriores:
+        return Alteracao(numero, novo=True, status_atual=status_atual, atualizacao_atual=atualizacao_atual)
+
+    atualizacao_anterior = _ultima_atualizacao(fontes_anteriores)
+    conhecidos = _chaves_movimentos(fontes_anteriores)
+    novos = []
+    for fonte in fontes_atuais:
+        for mov in fonte.get("movimentos") or ():
+            if isinstance(mov, dict) and (fonte.get("grau"), mov.get("codigo"), mov.get("dataHora")) not in conhecidos:
+                novos.append(Movimento(mov.get("codigo"), mov.get("nome"), mov.get("dataHora") or ""))
+    status_anterior = classificar_resultado(anterior)
+
+    if not novos and status_anterior == status_atual and atualizacao_anterior == atualizacao_atual:
+        return None
+    novos.sort(key=lambda movimento: movimento.data_hora)
+    return Alteracao(numero, False, status_anterior, status_atual, atualizacao_anterior,
+                     atualizacao_atual, tuple(novos))
+
+
+def comparar_lote(armazenamento, resultados, arquivados=None):
+    """
+    Separa, em um lote de novas respostas, as que precisam ser gravadas e as
+    alterações em relação ao que já está no armazenamento.
+
+    Respostas com o mesmo hash de conteúdo da gravada não são regravadas nem
+    comparadas; elas são devolvidas em `inalterados`, para que a nova consulta
+    seja registrada com `renovar_consultas`. Erros vão para `a_gravar` sem
+    comparação (`gravar_resultados` não os grava sobre uma resposta válida), e
+    a resposta de um processo descartado pelo limite do cache é sempre
+    gravada, para voltar ao cache.
+
+    Args:
+        armazenamento: Resultados gravados (ArmazenamentoResultados ou ResultadosSQLite)
+        resultados (dict): Número -> nova resposta
+        arquivados: Camada de arquivados, consultada para os processos que
+            não estão em `armazenamento`
+
+    Returns:
+        tuple: (a_gravar, alteracoes, inalterados) — dicionário de respostas a
+            gravar, lista de Alteracao e dicionário número -> momento da
+            consulta dos processos sem mudança
+    """
+    a_gravar = {}
+    alteracoes = []
+    inalterados = {}
+    for numero, resultado in resultados.items():
+        hash_atual = hash_conteudo(resultado)
+        if hash_atual is None:
+            a_gravar[numero] = resultado
+            continue
+
+        resultado["_hash"] = hash_atual
+        # O hash gravado vem da camada de resumos; a resposta anterior só é
+        # descomprimida quando o conteúdo mudou
+        origem = armazenamento
+        resumo_anterior = armazenamento.resumo(numero)
+        if resumo_anterior is None and arquivados is not None:
+            origem = arquivados
+            resumo_anterior = arquivados.resumo(numero)
+        descartado = resumo_anterior is not None and resumo_anterior.get("_descartado")
+        if not descartado and resumo_anterior is not None and resumo_anterior.get("_hash") == hash_atual:
+            inalterados[numero] = resultado.get("_consultado_em")
+            continue
+
+        a_gravar[numero] = resultado
+        if descartado:
+            # Resposta anterior descartada pelo limite do cache: compara apenas o status do resumo
+            status_atual = classificar_resultado(resultado)
+            if status_atual is not None and status_atual != resumo_anterior.get("status"):
+                alteracoes.append(Alteracao(numero, status_anterior=resumo_anterior.get("status"),
+                                            status_atual=status_atual))
+            continue
+        anterior = origem.get(numero) if resumo_anterior is not None else None
+        alteracao = detectar_alteracoes(numero, anterior, resultado)
+        if alteracao is not None:
+            alteracoes.append(alteracao)
+    return a_gravar, alteracoes, inalterados
+
+
+def registrar_alteracoes(tipo, alteracoes):
+    """
+    Grava as alterações da última consulta em lote do tribunal.
+
+    Returns:
+        bool: True se o registro foi salvo com sucesso
+    """
+    def registrar(registros):
+        registros[tipo] = {
+            "registrado_em": momento_atual_utc(),
+            "alteracoes": [asdict(alteracao) for alteracao in alteracoes]
+        }
+        return True
+
+    return atualizar_arquivo_json(ALTERACOES_FILE, registrar, padrao=dict) is True
+
+
+def carregar_alteracoes(tipo):
+    """
+    Alterações registradas na última consulta em lote do tribunal.
+
+    Returns:
+        tuple: (registrado_em, lista de Alteracao); (None, []) se não houver registro
+    """
+    registros = carregar_arquivo_json(ALTERACOES_FILE)
+    if not isinstance(registros, dict) or not isinstance(registros.get(tipo), dict):
+        return None, []
+    registro = registros[tipo]
+    return registro.get("registrado_em"), [Alteracao.de_dict(dados) for dados in registro.get("alteracoes", [])]
+
+
+def linhas_alteracoes(alteracoes):
+    """
+    Texto das alterações, linha a linha, para a tela, o terminal e o PDF.
+
+    Args:
+        alteracoes (list): Lista de Alteracao
+
+    Returns:
+        list: Linhas de texto (sem quebra de linha)
+    """
+    if not alteracoes:
+        return ["Nenhuma alteração desde a consulta anterior."]
+
+    linhas = []
+    for alteracao in alteracoes:
+        if alteracao.novo:
+            linhas.append(f"{alteracao.numero}: primeira consulta (status: {alteracao.status_atual})")
+            continue
+        linhas.append(f"{alteracao.numero}:")
+        if alteracao.mudou_status:
+            linhas.append(f"  - Status: {alteracao.status_anterior} -> {alteracao.status_atual}")
+        if alteracao.atualizacao_atual != alteracao.atualizacao_anterior:
+            linhas.append(f"  - Última atualização: {formatar_data(alteracao.atualizacao_anterior) or '-'} -> "
+                          f"{formatar_data(alteracao.atualizacao_atual) or '-'}")
+        for movimento in alteracao.movimentos_novos:
+            linhas.append(f"  - Novo movimento: [{movimento.codigo}] {movimento.nome or 'Não informado'} "
+                          f"({formatar_data(movimento.data_hora)})")
+    return linhas
@@ -0,0 +1,111 @@
+"""
+Camada de arquivados do cache de resultados.
+
+Processos encerrados (status em STATUS_ARQUIVAMENTO) saem do log de resultados
+em uso e passam para um log próprio, ao lado dele, que as consultas em lote
+ignoram salvo quando solicitado. Assim, o conjunto de trabalho e a duração
+dos lotes não crescem com os processos que já não mudam.
+"""
+
+import os
+from ..config import STATUS_ARQUIVAMENTO
+from ..models.resumo import classificar_resultado
+from .file_handler import abrir_armazenamento
+
+# Processos movidos por gravação ao arquivar os encerrados
+TAMANHO_LOTE_ARQUIVAMENTO = 500
+
+
+def caminho_arquivados(caminho_resultados):
+    """Caminho do log de arquivados que acompanha um arquivo de resultados."""
+    return os.path.splitext(caminho_resultados)[0] + ".arquivados.dat"
+
+
+def abrir_arquivados(caminho_resultados):
+    """
+    Retorna a camada de arquivados do arquivo de resultados (sempre um log
+    comprimido, mesmo com o motor SQLite).
+
+    Args:
+        caminho_resultados (str): RESULTADO_TJ_FILE ou RESULTADO_TRF_FILE
+
+    Returns:
+        ArmazenamentoResultados: Armazenamento dos processos arquivados
+    """
+    return abrir_armazenamento(caminho_arquivados(caminho_resultados))
+
+
+def processo_encerrado(resultado):
+    """Indica se a resposta é de um processo com status de arquivamento."""
+    return classificar_resultado(resultado) in STATUS_ARQUIVAMENTO
+
+
+def _resposta_valida(camada, numero):
+    """Indica se a camada tem uma resposta (ou resumo) do processo que não é um erro."""
+    resumo = camada.resumo(numero)
+    return resumo is not None and "erro" not in resumo
+
+
+def gravar_resultados(resultados_em_uso, arquivados, resultados):
+    """
+    Grava novas respostas na camada correta e aplica o limite do cache.
+
+    Respostas de processos encerrados vão para os arquivados; as demais, para
+    a camada em uso. A versão anterior na outra camada é removida. Um erro não
+    substitui uma resposta válida já gravada (em qualquer das camadas): a
+    falha é apenas registrada no resumo com `registrar_erros`, e a próxima
+    resposta igual à gravada não aparece como alteração.
+
+    Args:
+        resultados_em_uso: Armazenamento principal do tribunal
+        arquivados: Camada de arquivados do tribunal
+        resultados (dict): Número -> resposta
+
+    Returns:
+        int: Quantidade de respostas gravadas nos arquivados
+    """
+    ativos = {}
+    encerrados = {}
+    falhas = {}
+    for numero, resultado in resultados.items():
+        if "erro" in resultado and (_resposta_valida(resultados_em_uso, numero)
+                                    or _resposta_valida(arquivados, numero)):
+            falhas[numero] = resultado
+        elif processo_encerrado(resultado):
+            encerrados[numero] = resultado
+        else:
+            ativos[numero] = resultado
+
+    if falhas:
+        resultados_em_uso.registrar_erros(falhas)
+        arquivados.registrar_erros(falhas)
+    if ativos:
+        resultados_em_uso.atualizar(ativos)
+        arquivados.remover_varios(list(ativos))
+    if encerrados:
+        arquivados.atualizar(encerrados)
+        resultados_em_uso.remover_varios(list(encerrados))
+    resultados_em_uso.limitar()
+    return len(encerrados)
+
+
+def arquivar_encerrados(resultados_em_uso, arquivados):
+    """
+    Move para os arquivados os processos encerrados que ainda estão na camada
+    em uso (por exemplo, gravados antes da camada de arquivados existir).
+
+    Processos com a resposta descartada pelo limite do cache são arquivados
+    na próxima vez em que forem consultados.
+
+    Returns:
+        int: Quantidade de processos arquivados
+    """
+    encerrados = [numero for numero, resumo in resultados_em_uso.resumos().items()
+                  if resumo.get("status") in STATUS_ARQUIVAMENTO and numero in resultados_em_uso]
+    for inicio in range(0, len(encerrados), TAMANHO_LOTE_ARQUIVAMENTO):
+        grupo = encerrados[inicio:inicio + TAMANHO_LOTE_ARQUIVAMENTO]
+        arquivados.atualizar({numero: resultados_em_uso[numero] for numero in grupo})
+        resultados_em_uso.remover_varios(grupo)
+    if encerrados:
+        print(f"{len(encerrados)} processos encerrados movidos para {os.path.basename(arquivados.caminho)}.")
+    return len(encerrados)
@@ -0,0 +1,519 @@
+"""
+Armazenamento opcional em SQLite das listas de processos e dos resultados.
+Ativado com ARMAZENAMENTO_MOTOR = "sqlite" em src/config.py. Os resultados
+ficam indexados por número, tribunal, status, órgão julgador e data da última
+atualização, de modo que consultas e estatísticas não exigem ler todo o cache.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from ..config import BANCO_DADOS_FILE, LISTA_TJ_FILE, LISTA_TRF_FILE, RESULTADO_TJ_FILE, RESULTADO_TRF_FILE
+from ..models.resumo import extrair_resumo, reclassificar_status, resumo_compacto
+from ..models.status import obter_classificador
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS processos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tribunal TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    UNIQUE (tribunal, numero)
+);
+CREATE INDEX IF NOT EXISTS idx_processos_numero ON processos (numero);
+CREATE TABLE IF NOT EXISTS resultados (
+    tribunal TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    conteudo TEXT NOT NULL,
+    status TEXT,
+    orgao_julgador TEXT,
+    data_ultima_atualizacao TEXT,
+    consultado_em REAL,
+    resumo TEXT,
+    ultimo_erro TEXT,
+    ultimo_erro_em REAL,
+    PRIMARY KEY (tribunal, numero)
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_numero ON resultados (numero);
+CREATE INDEX IF NOT EXISTS idx_resultados_status ON resultados (tribunal, status);
+CREATE INDEX IF NOT EXISTS idx_resultados_orgao ON resultados (tribunal, orgao_julgador);
+CREATE INDEX IF NOT EXISTS idx_resultados_atualizacao ON resultados (tribunal, data_ultima_atualizacao);
+"""
+
+# Tribunal associado a cada arquivo de lista ou de resultados
+TRIBUNAL_POR_ARQUIVO = {
+    os.path.abspath(LISTA_TJ_FILE): "TJ",
+    os.path.abspath(LISTA_TRF_FILE): "TRF",
+    os.path.abspath(RESULTADO_TJ_FILE): "TJ",
+    os.path.abspath(RESULTADO_TRF_FILE): "TRF"
+}
+
+_conexao = None
+_trava = threading.RLock()
+
+
+def tribunal_do_arquivo(caminho_arquivo):
+    """Retorna o tribunal ('TJ' ou 'TRF') do arquivo de lista/resultados, ou None."""
+    return TRIBUNAL_POR_ARQUIVO.get(os.path.abspath(caminho_arquivo))
+
+
+def obter_conexao(caminho=BANCO_DADOS_FILE):
+    """
+    Retorna a conexão compartilhada com o banco, criando o esquema e migrando
+    o cache em arquivos na primeira abertura.
+    """
+    global _conexao
+    with _trava:
+        if _conexao is None:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.executescript(ESQUEMA)
+            colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(resultados)")}
+            if "resumo" not in colunas:
+                # Bancos criados antes da coluna de resumos: preenchida sob demanda
+                conexao.execute("ALTER TABLE resultados ADD COLUMN resumo TEXT")
+            if "ultimo_erro" not in colunas:
+                conexao.execute("ALTER TABLE resultados ADD COLUMN ultimo_erro TEXT")
+                conexao.execute("ALTER TABLE resultados ADD COLUMN ultimo_erro_em REAL")
+            _conexao = conexao
+            if _obter_metadado("migrado_em") is None:
+                migrar_cache_para_sqlite()
+            if _obter_metadado("regras_status") != obter_classificador().assinatura:
+                reclassificar_resultados()
+        return _conexao
+
+
+def fechar_conexao():
+    """Fecha a conexão compartilhada com o banco."""
+    global _conexao
+    with _trava:
+        if _conexao is not None:
+            _conexao.close()
+            _conexao = None
+
+
+def _obter_metadado(chave):
+    linha = _conexao.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else None
+
+
+def extrair_campos_indexados(resultado):
+    """
+    Extrai do resultado da API os campos indexados no banco.
+
+    Args:
+        resultado (dict): Resultado da consulta à API
+
+    Returns:
+        tuple: (status, orgao_julgador, data_ultima_atualizacao)
+    """
+    resumo = extrair_resumo(None, resultado)
+    if not resumo.encontrado:
+        return None, None, None
+    return resumo.status, resumo.orgao_julgador, resumo.ultima_atualizacao
+
+
+def _transacao(conexao, operacao):
+    """Executa `operacao(conexao)` dentro de uma transação."""
+    with _trava:
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            retorno = operacao(conexao)
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+        return retorno
+
+
+# ---- Listas de processos ----
+
+def carregar_lista(tribunal):
+    """Retorna os números cadastrados do tribunal, na ordem de cadastro."""
+    conexao = obter_conexao()
+    with _trava:
+        linhas = conexao.execute("SELECT numero FROM processos WHERE tribunal = ? ORDER BY id",
+                                 (tribunal,)).fetchall()
+    return [linha[0] for linha in linhas]
+
+
+def salvar_lista(tribunal, numeros):
+    """Substitui a lista de processos do tribunal, mantendo a ordem recebida."""
+    def substituir(conexao):
+        conexao.execute("DELETE FROM processos WHERE tribunal = ?", (tribunal,))
+        conexao.executemany("INSERT OR IGNORE INTO processos (tribunal, numero) VALUES (?, ?)",
+                            ((tribunal, numero) for numero in numeros))
+    _transacao(obter_conexao(), substituir)
+
+
+def adicionar_numeros(tribunal, numeros):
+    """
+    Cadastra vários números em uma única transação.
+
+    Returns:
+        list: Números efetivamente incluídos (os já cadastrados são ignorados)
+    """
+    def incluir(conexao):
+        adicionados = []
+        for numero in numeros:
+            cursor = conexao.execute("INSERT OR IGNORE INTO processos (tribunal, numero) VALUES (?, ?)",
+                                     (tribunal, numero))
+            if cursor.rowcount:
+                adicionados.append(numero)
+        return adicionados
+    return _transacao(obter_conexao(), incluir)
+
+
+def remover_numeros(tribunal, numeros):
+    """
+    Remove vários números em uma única transação.
+
+    Returns:
+        list: Números efetivamente removidos
+    """
+    def excluir(conexao):
+        removidos = []
+        for numero in numeros:
+            cursor = conexao.execute("DELETE FROM processos WHERE tribunal = ? AND numero = ?",
+                                     (tribunal, numero))
+            if cursor.rowcount:
+                removidos.append(numero)
+        return removidos
+    return _transacao(obter_conexao(), excluir)
+
+
+def processo_cadastrado(tribunal, numero):
+    """Indica se o número está cadastrado no tribunal."""
+    conexao = obter_conexao()
+    with _trava:
+        return conexao.execute("SELECT 1 FROM processos WHERE tribunal = ? AND numero = ?",
+                               (tribunal, numero)).fetchone() is not None
+
+
+def contar_processos(tribunal):
+    """Quantidade de processos cadastrados do tribunal."""
+    conexao = obter_conexao()
+    with _trava:
+        return conexao.execute("SELECT COUNT(*) FROM processos WHERE tribunal = ?", (tribunal,)).fetchone()[0]
+
+
+# ---- Resultados ----
+
+class ResultadosSQLite(MutableMapping):
+    """
+    Resultados de um tribunal no banco, com a mesma interface de ArmazenamentoResultados.
+
+    O resumo de cada resultado (ver `resumo_compacto`) fica em uma coluna
+    própria, de modo que listas e estatísticas não leem as respostas completas.
+    """
+
+    def __init__(self, tribunal):
+        self.tribunal = tribunal
+        self.caminho = BANCO_DADOS_FILE
+        self._conexao = obter_conexao()
+
+    def _linhas(self, resultados):
+        for numero, resultado in resultados.items():
+            status, orgao_julgador, data_atualizacao = extrair_campos_indexados(resultado)
+            consultado_em = resultado.get("_consultado_em") if isinstance(resultado, dict) else None
+            resumo = json.dumps(resumo_compacto(numero, resultado), ensure_ascii=False)
+            yield (self.tribunal, numero, json.dumps(resultado, ensure_ascii=False),
+                   status, orgao_julgador, data_atualizacao, consultado_em, resumo)
+
+    def __getitem__(self, numero):
+        with _trava:
+            linha = self._conexao.execute("SELECT conteudo FROM resultados WHERE tribunal = ? AND numero = ?",
+                                          (self.tribunal, numero)).fetchone()
+        if linha is None:
+            raise KeyError(numero)
+        return json.loads(linha[0])
+
+    def __setitem__(self, numero, resultado):
+        self.atualizar({numero: resultado})
+
+    def __delitem__(self, numero):
+        with _trava:
+            cursor = self._conexao.execute("DELETE FROM resultados WHERE tribunal = ? AND numero = ?",
+                                           (self.tribunal, numero))
+        if cursor.rowcount == 0:
+            raise KeyError(numero)
+
+    def __contains__(self, numero):
+        with _trava:
+            return self._conexao.execute("SELECT 1 FROM resultados WHERE tribunal = ? AND numero = ?",
+                                         (self.tribunal, numero)).fetchone() is not None
+
+    def __iter__(self):
+        with _trava:
+            linhas = self._conexao.execute("SELECT numero FROM resultados WHERE tribunal = ?",
+                                           (self.tribunal,)).fetchall()
+        return iter([linha[0] for linha in linhas])
+
+    def __len__(self):
+        with _trava:
+            return self._conexao.execute("SELECT COUNT(*) FROM resultados WHERE tribunal = ?",
+                                         (self.tribunal,)).fetchone()[0]
+
+    def atualizar(self, resultados):
+        """Grava vários resultados em uma única transação."""
+        linhas = list(self._linhas(resultados))
+        _transacao(self._conexao, lambda conexao: conexao.executemany(
+            "INSERT OR REPLACE INTO resultados (tribunal, numero, conteudo, status, orgao_julgador, "
+            "data_ultima_atualizacao, consultado_em, resumo) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", linhas))
+
+    def remover_varios(self, numeros):
+        """Remove vários resultados em uma única transação e retorna quantos foram removidos."""
+        def excluir(conexao):
+            return sum(conexao.execute("DELETE FROM resultados WHERE tribunal = ? AND numero = ?",
+                                       (self.tribunal, numero)).rowcount for numero in numeros)
+        return _transacao(self._conexao, excluir)
+
+    def limpar(self):
+        """Remove todos os resultados do tribunal."""
+        with _trava:
+            self._conexao.execute("DELETE FROM resultados WHERE tribunal = ?", (self.tribunal,))
+
+    def compactar_se_necessario(self):
+        """O SQLite reaproveita o espaço livre sozinho; mantido por compatibilidade."""
+        return False
+
+    def limitar(self, max_resultados=None, max_mb=None):
+        """
+        CACHE_MAX_RESULTADOS e CACHE_MAX_MB não se aplicam ao motor SQLite: o
+        banco guarda todas as respostas completas (as consultas usam os índices
+        e a coluna de resumos, sem carregá-las). Mantido por compatibilidade.
+
+        Returns:
+            int: Sempre 0 (nenhuma resposta descartada)
+        """
+        return 0
+
+    def fechar(self):
+        """A conexão é compartilhada e fechada com `fechar_conexao`."""
+
+    def renovar_consultas(self, consultas):
+        """
+        Atualiza o momento da consulta de processos cuja resposta não mudou,
+        sem regravar o conteúdo.
+
+        Args:
+            consultas (dict): Número -> momento da consulta (_consultado_em; None = agora)
+
+        Returns:
+            int: Quantidade de processos renovados
+        """
+        agora = time.time()
+
+        def renovar(conexao):
+            return sum(conexao.execute(
+                "UPDATE resultados SET consultado_em = ?, ultimo_erro = NULL, ultimo_erro_em = NULL "
+                "WHERE tribunal = ? AND numero = ?",
+                (agora if momento is None else momento, self.tribunal, numero)).rowcount
+                for numero, momento in consultas.items())
+        return _transacao(self._conexao, renovar)
+
+    def registrar_erros(self, erros):
+        """
+        Registra a falha da consulta de processos já gravados, sem substituir a
+        resposta (ver `ArmazenamentoResultados.registrar_erros`).
+
+        Args:
+            erros (dict): Número -> resposta com a chave "erro"
+
+        Returns:
+            int: Quantidade de processos com o erro registrado
+        """
+        def registrar(conexao):
+            return sum(conexao.execute(
+                "UPDATE resultados SET ultimo_erro = ?, ultimo_erro_em = ? WHERE tribunal = ? AND numero = ?",
+                (erro.get("erro"), erro.get("_consultado_em"), self.tribunal, numero)).rowcount
+                for numero, erro in erros.items())
+        return _transacao(self._conexao, registrar)
+
+    def _refazer_resumos(self, numeros):
+        """Recalcula e grava os resumos a partir das respostas completas."""
+        resumos = {}
+        with _trava:
+            for numero in numeros:
+                linha = self._conexao.execute("SELECT conteudo FROM resultados WHERE tribunal = ? AND numero = ?",
+                                              (self.tribunal, numero)).fetchone()
+                if linha is not None:
+                    resumos[numero] = resumo_compacto(numero, json.loads(linha[0]))
+        if resumos:
+            _transacao(self._conexao, lambda conexao: conexao.executemany(
+                "UPDATE resultados SET resumo = ? WHERE tribunal = ? AND numero = ?",
+                [(json.dumps(resumo, ensure_ascii=False), self.tribunal, numero)
+                 for numero, resumo in resumos.items()]))
+        return resumos
+
+    def _ler_resumos(self, linhas):
+        """
+        Converte linhas (numero, resumo, consultado_em, ultimo_erro, ultimo_erro_em)
+        em resumos, refazendo os
+        ausentes (bancos anteriores à coluna) e os calculados com outras regras de status.
+        """
+        assinatura = obter_classificador().assinatura
+        resumos = {}
+        desatualizados = []
+        for numero, resumo, _, _, _ in linhas:
+            dados = json.loads(resumo) if resumo else None
+            if dados is None or dados.get("_regras") != assinatura:
+                desatualizados.append(numero)
+            else:
+                resumos[numero] = dados
+        if desatualizados:
+            resumos.update(self._refazer_resumos(desatualizados))
+        # As colunas da consulta são a referência: são renovadas sem regravar o resumo
+        for numero, _, consultado_em, ultimo_erro, ultimo_erro_em in linhas:
+            if numero not in resumos:
+                continue
+            if consultado_em is not None:
+                resumos[numero]["_consultado_em"] = consultado_em
+            if ultimo_erro is not None:
+                resumos[numero]["_ultimo_erro"] = ultimo_erro
+                resumos[numero]["_ultimo_erro_em"] = ultimo_erro_em
+        return resumos, len(desatualizados)
+
+    def resumo(self, numero):
+        """Campos resumidos do processo (ver `resumo_compacto`), ou None se não estiver gravado."""
+        with _trava:
+            linha = self._conexao.execute(
+                "SELECT numero, resumo, consultado_em, ultimo_erro, ultimo_erro_em FROM resultados "
+                "WHERE tribunal = ? AND numero = ?",
+                (self.tribunal, numero)).fetchone()
+        if linha is None:
+            return None
+        resumos, _ = self._ler_resumos([linha])
+        return resumos.get(numero)
+
+    def resumos(self):
+        """Número -> resumo de todos os resultados do tribunal, lidos da coluna de resumos."""
+        with _trava:
+            linhas = self._conexao.execute(
+                "SELECT numero, resumo, consultado_em, ultimo_erro, ultimo_erro_em FROM resultados "
+                "WHERE tribunal = ?",
+                (self.tribunal,)).fetchall()
+        resumos, refeitos = self._ler_resumos(linhas)
+        if refeitos:
+            print(f"{refeitos} resumos refeitos com as regras de status atuais.")
+        return resumos
+
+    def contar_por_status(self):
+        """Retorna {status: quantidade} dos resultados do tribunal."""
+        with _trava:
+            linhas = self._conexao.execute(
+                "SELECT status, COUNT(*) FROM resultados WHERE tribunal = ? AND status IS NOT NULL "
+                "GROUP BY status ORDER BY COUNT(*) DESC", (self.tribunal,)).fetchall()
+        return dict(linhas)
+
+    def buscar(self, status=None, orgao_julgador=None, atualizado_desde=None):
+        """
+        Lista os números dos processos que atendem aos filtros, usando os índices.
+
+        Args:
+            status (str): Status do processo
+            orgao_julgador (str): Nome do órgão julgador
+            atualizado_desde (str): Data/hora ISO 8601 mínima da última atualização
+
+        Returns:
+            list: Números dos processos encontrados
+        """
+        condicoes = ["tribunal = ?"]
+        parametros = [self.tribunal]
+        if status is not None:
+            condicoes.append("status = ?")
+            parametros.append(status)
+        if orgao_julgador is not None:
+            condicoes.append("orgao_julgador = ?")
+            parametros.append(orgao_julgador)
+        if atualizado_desde is not None:
+            condicoes.append("data_ultima_atualizacao >= ?")
+            parametros.append(atualizado_desde)
+        with _trava:
+            linhas = self._conexao.execute(
+                f"SELECT numero FROM resultados WHERE {' AND '.join(condicoes)}", parametros).fetchall()
+        return [linha[0] for linha in linhas]
+
+
+def reclassificar_resultados():
+    """
+    Recalcula a coluna de status de todos os resultados com as regras atuais
+    (STATUS_MOVIMENTOS) e grava a assinatura das regras aplicadas.
+
+    Returns:
+        int: Quantidade de status alterados
+    """
+    classificador = obter_classificador()
+    with _trava:
+        linhas = _conexao.execute("SELECT tribunal, numero, conteudo, status FROM resultados").fetchall()
+
+    atuais = {(tribunal, numero): status for tribunal, numero, _, status in linhas}
+    novos = reclassificar_status((((tribunal, numero), json.loads(conteudo))
+                                  for tribunal, numero, conteudo, _ in linhas), classificador)
+    alterados = [(status, tribunal, numero) for (tribunal, numero), status in novos.items()
+                 if status != atuais[(tribunal, numero)]]
+
+    def gravar(conexao):
+        conexao.executemany("UPDATE resultados SET status = ? WHERE tribunal = ? AND numero = ?", alterados)
+        conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('regras_status', ?)",
+                        (classificador.assinatura,))
+    _transacao(_conexao, gravar)
+    if alterados:
+        print(f"Status de {len(alterados)} processos reclassificados com as novas regras.")
+    return len(alterados)
+
+
+# ---- Migração ----
+
+def migrar_cache_para_sqlite():
+    """
+    Importa para o banco as listas (JSON) e os resultados (log ou JSON antigo)
+    do cache em arquivos. Executada uma única vez, na criação do banco.
+
+    A camada de arquivados não é importada: ela continua no log
+    `*.arquivados.dat` (ver `abrir_arquivados`), usado por ambos os motores.
+    """
+    from .file_handler import ArmazenamentoResultados, carregar_arquivo_json
+
+    inicio = time.time()
+    total_processos = 0
+    total_resultados = 0
+
+    for arquivo, tribunal in ((LISTA_TJ_FILE, "TJ"), (LISTA_TRF_FILE, "TRF")):
+        lista = carregar_arquivo_json(arquivo) if os.path.exists(arquivo) else []
+        if isinstance(lista, list) and lista:
+            salvar_lista(tribunal, lista)
+            total_processos += len(lista)
+
+    for arquivo, tribunal in ((RESULTADO_TJ_FILE, "TJ"), (RESULTADO_TRF_FILE, "TRF")):
+        legado = os.path.splitext(arquivo)[0] + ".json"
+        if not os.path.exists(arquivo) and not os.path.exists(legado):
+            continue
+        armazenamento = ArmazenamentoResultados(arquivo, camada_resumos=False)
+        try:
+            destino = ResultadosSQLite(tribunal)
+            lote = {}
+            for numero in armazenamento:
+                lote[numero] = armazenamento[numero]
+                if len(lote) >= 500:
+                    destino.atualizar(lote)
+                    lote = {}
+            destino.atualizar(lote)
+            total_resultados += len(armazenamento)
+        finally:
+            armazenamento.fechar()
+
+    with _trava:
+        _conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('migrado_em', ?)",
+                         (time.strftime("%Y-%m-%dT%H:%M:%S"),))
+    if total_processos or total_resultados:
+        print(f"Migração para SQLite concluída em {time.time() - inicio:.1f}s: "
+              f"{total_processos} processos e {total_resultados} resultados importados.")
@@ -0,0 +1,59 @@
+import time
+from ..config import CACHE_TTL_SEGUNDOS, CACHE_TTL_NEGATIVO_SEGUNDOS
+
+def marcar_consulta(resultado, momento=None):
+    """
+    Registra no resultado o momento em que a consulta foi feita.
+
+    Args:
+        resultado (dict): Resultado da consulta à API
+        momento (float): Timestamp da consulta (padrão: agora)
+
+    Returns:
+        dict: O próprio resultado, com a chave "_consultado_em"
+    """
+    if isinstance(resultado, dict):
+        resultado["_consultado_em"] = time.time() if momento is None else momento
+    return resultado
+
+def resultado_negativo(resultado):
+    """
+    Indica se o resultado é um erro ou uma consulta sem processos encontrados.
+    Aceita também o resumo do resultado (camada de resumos do cache).
+    """
+    if "erro" in resultado:
+        return True
+    if "encontrado" in resultado:
+        return not resultado["encontrado"]
+    try:
+        return resultado["hits"]["total"]["value"] == 0
+    except (KeyError, TypeError):
+        return True
+
+def resultado_em_cache_valido(resultado, agora=None, exigir_completo=True):
+    """
+    Verifica se um resultado armazenado ainda pode ser usado sem nova consulta.
+
+    Resultados positivos valem por CACHE_TTL_SEGUNDOS; erros e processos não
+    encontrados valem por CACHE_TTL_NEGATIVO_SEGUNDOS.
+
+    Args:
+        resultado: Resultado armazenado ou seu resumo (ou None)
+        agora (float): Timestamp de referência (padrão: agora)
+        exigir_completo (bool): Se True, resultados com campos projetados
+            (consultas em lote resumidas) não são aceitos
+
+    Returns:
+        bool: True se o resultado está dentro do prazo de validade
+    """
+    if not isinstance(resultado, dict) or "_consultado_em" not in resultado:
+        return False
+    # Resumo de uma resposta descartada pelo limite do cache: é preciso consultar de novo
+    if resultado.get("_descartado"):
+        return False
+    if exigir_completo and "_campos" in resultado:
+        return False
+
+    agora = time.time() if agora is None else agora
+    ttl = CACHE_TTL_NEGATIVO_SEGUNDOS if resultado_negativo(resultado) else CACHE_TTL_SEGUNDOS
+    return agora - resultado["_consultado_em"] < ttl
@@ -0,0 +1,166 @@
+"""
+Validação e decodificação de números de processo no padrão CNJ
+(Resolução CNJ nº 65/2008): NNNNNNN-DD.AAAA.J.TR.OOOO.
+
+O dígito verificador DD é calculado pelo módulo 97 (ISO 7064), de modo que
+números digitados com erro são recusados antes de qualquer consulta à API.
+"""
+
+import re
+from collections import namedtuple
+
+# 20 dígitos sem separadores ou o número formatado (somente dígitos ASCII;
+# usar com fullmatch, pois "$" aceitaria uma quebra de linha no final)
+PADRAO_NUMERO = re.compile(r"[0-9]{20}")
+PADRAO_NUMERO_FORMATADO = re.compile(r"([0-9]{7})-([0-9]{2})\.([0-9]{4})\.([0-9])\.([0-9]{2})\.([0-9]{4})")
+PADRAO_NAO_DIGITO = re.compile(r"[^0-9]")
+
+SEGMENTOS_JUSTICA = {
+    "1": "Supremo Tribunal Federal",
+    "2": "Conselho Nacional de Justiça",
+    "3": "Superior Tribunal de Justiça",
+    "4": "Justiça Federal",
+    "5": "Justiça do Trabalho",
+    "6": "Justiça Eleitoral",
+    "7": "Justiça Militar da União",
+    "8": "Justiça dos Estados e do Distrito Federal",
+    "9": "Justiça Militar Estadual"
+}
+
+NumeroCNJ = namedtuple("NumeroCNJ", ["sequencial", "digito", "ano", "segmento", "tribunal", "origem"])
+
+
+def normalizar_numero(numero):
+    """
+    Converte o número para 20 dígitos, aceitando também o formato CNJ.
+
+    Returns:
+        str: Número de 20 dígitos ou None se o formato for inválido
+    """
+    if not isinstance(numero, str):
+        return None
+    numero = numero.strip()
+    if PADRAO_NUMERO.fullmatch(numero):
+        return numero
+    if PADRAO_NUMERO_FORMATADO.fullmatch(numero):
+        return PADRAO_NAO_DIGITO.sub("", numero)
+    return None
+
+
+def formatar_numero(numero):
+    """Formata um número de 20 dígitos como NNNNNNN-DD.AAAA.J.TR.OOOO."""
+    return f"{numero[:7]}-{numero[7:9]}.{numero[9:13]}.{numero[13]}.{numero[14:16]}.{numero[16:]}"
+
+
+def calcular_digito(sequencial, ano, segmento, tribunal, origem):
+    """
+    Calcula o dígito verificador (módulo 97) de um número CNJ.
+
+    Returns:
+        str: Dígito verificador com 2 posições
+    """
+    resto = int(f"{sequencial}{ano}{segmento}{tribunal}{origem}") * 100 % 97
+    return f"{98 - resto:02d}"
+
+
+def digito_valido(numero):
+    """
+    Verifica o dígito verificador de um número de 20 dígitos já normalizado.
+
+    O número reorganizado como NNNNNNN AAAA J TR OOOO DD deve ter resto 1
+    na divisão por 97.
+    """
+    return int(numero[:7] + numero[9:] + numero[7:9]) % 97 == 1
+
+
+def validar_numero(numero):
+    """
+    Valida o formato e o dígito verificador de um número de processo.
+
+    Args:
+        numero (str): Número com 20 dígitos ou no formato CNJ
+
+    Returns:
+        bool: True se o número for válido
+    """
+    normalizado = normalizar_numero(numero)
+    return normalizado is not None and digito_valido(normalizado)
+
+
+def decodificar_numero(numero):
+    """
+    Separa os campos de um número de processo válido.
+
+    Args:
+        numero (str): Número com 20 dígitos ou no formato CNJ
+
+    Returns:
+        NumeroCNJ: Campos do número (ano, segmento J, tribunal TR, origem etc.)
+
+    Raises:
+        ValueError: Se o formato ou o dígito verificador forem inválidos
+    """
+    normalizado = normalizar_numero(numero)
+    if normalizado is None:
+        raise ValueError(f"Número de processo com formato inválido: {numero}")
+    if not digito_valido(normalizado):
+        raise ValueError(f"Dígito verificador inválido no número de processo: {numero}")
+    return NumeroCNJ(normalizado[:7], normalizado[7:9], normalizado[9:13],
+                     normalizado[13], normalizado[14:16], normalizado[16:])
+
+
+def validar_numeros(numeros):
+    """
+    Valida uma sequência de números em uma única passada.
+
+    Os números são normalizados e verificados sem exceções nem objetos
+    intermediários por número, o que permite validar centenas de milhares de
+    números em poucos décimos de segundo.
+
+    Args:
+        numeros (iterable): Números com 20 dígitos ou no formato CNJ
+
+    Returns:
+        tuple: (validos, invalidos) — os válidos já normalizados para 20 dígitos,
+            na ordem recebida; os inválidos como foram recebidos
+    """
+    validos = []
+    invalidos = []
+    casa_numero = PADRAO_NUMERO.fullmatch
+    for numero in numeros:
+        if isinstance(numero, str):
+            limpo = numero.strip()
+            normalizado = limpo if casa_numero(limpo) else normalizar_numero(limpo)
+            if normalizado is not None and int(normalizado[:7] + normalizado[9:] + normalizado[7:9]) % 97 == 1:
+                validos.append(normalizado)
+                continue
+        invalidos.append(numero)
+    return validos, invalidos
+
+
+def compactar_numero(numero):
+    """
+    Converte um número válido de 20 dígitos em um inteiro de 18 dígitos
+    (sem o dígito verificador, que é recalculado na expansão).
+
+    Args:
+        numero (str): Número de 20 dígitos já validado
+
+    Returns:
+        int: Chave compacta (cabe em um inteiro sem sinal de 64 bits)
+    """
+    return int(numero[:7] + numero[9:])
+
+
+def expandir_numero(chave):
+    """
+    Reconstrói o número de 20 dígitos a partir da chave compacta.
+
+    Args:
+        chave (int): Chave gerada por compactar_numero
+
+    Returns:
+        str: Número de 20 dígitos com o dígito verificador
+    """
+    texto = f"{chave:018d}"
+    return f"{texto[:7]}{98 - chave * 100 % 97:02d}{texto[7:]}"
@@ -0,0 +1,179 @@
+"""
+Diário (journal) das consultas em lote.
+Cada resultado concluído é gravado imediatamente em um arquivo JSON Lines,
+de modo que uma consulta interrompida possa ser retomada do ponto em que parou.
+"""
+
+import json
+import os
+import random
+import threading
+from datetime import datetime
+from ..config import LOTES_DIR
+
+EXTENSAO_DIARIO = ".jsonl"
+
+
+class DiarioLote:
+    """Diário de uma consulta em lote identificada por `id`."""
+
+    def __init__(self, caminho, cabecalho, resultados):
+        self.caminho = caminho
+        self.cabecalho = cabecalho
+        self.resultados = resultados
+        self._arquivo = None
+        self._trava = threading.Lock()
+
+    @property
+    def id(self):
+        return self.cabecalho["id"]
+
+    @property
+    def tipo(self):
+        return self.cabecalho["tipo"]
+
+    @property
+    def numeros(self):
+        return self.cabecalho["numeros"]
+
+    @staticmethod
+    def _caminho(id_lote):
+        return os.path.join(LOTES_DIR, id_lote + EXTENSAO_DIARIO)
+
+    @classmethod
+    def criar(cls, tipo, numeros, **parametros):
+        """
+        Cria o diário de uma nova consulta em lote.
+
+        Args:
+            tipo (str): Tipo do tribunal ('TJ' ou 'TRF')
+            numeros (list): Números de processo a consultar
+            **parametros: Opções da consulta, guardadas para a retomada
+
+        Returns:
+            DiarioLote: Diário aberto para gravação
+        """
+        os.makedirs(LOTES_DIR, exist_ok=True)
+        id_lote = f"{tipo}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{random.randint(0, 0xffff):04x}"
+        cabecalho = {
+            "id": id_lote,
+            "tipo": tipo,
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "numeros": list(numeros),
+            "parametros": parametros
+        }
+        diario = cls(cls._caminho(id_lote), cabecalho, {})
+        diario._gravar_linhas([cabecalho])
+        return diario
+
+    @classmethod
+    def abrir(cls, id_lote):
+        """
+        Abre o diário de uma consulta interrompida, relendo os resultados já gravados.
+
+        Args:
+            id_lote (str): Identificador do lote
+
+        Returns:
+            DiarioLote: Diário aberto, ou None se não existir
+        """
+        caminho = cls._caminho(id_lote)
+        if not os.path.exists(caminho):
+            print(f"Lote {id_lote} não encontrado.")
+            return None
+
+        cabecalho = None
+        resultados = {}
+        fim_valido = 0
+        with open(caminho, 'r+b') as arquivo:
+            for linha in arquivo:
+                if not linha.endswith(b"\n"):
+                    # Última linha incompleta (gravação interrompida): é descartada
+                    break
+                fim_valido += len(linha)
+                try:
+                    registro = json.loads(linha.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if cabecalho is None:
+                    cabecalho = registro
+                elif "numero" in registro:
+                    resultados[registro["numero"]] = registro["resultado"]
+            if arquivo.tell() > fim_valido:
+                # Remove a linha incompleta, para que o próximo registro não seja
+                # acrescentado a ela ao retomar o lote
+                arquivo.truncate(fim_valido)
+
+        if cabecalho is None:
+            print(f"Diário do lote {id_lote} está vazio ou corrompido.")
+            return None
+        return cls(caminho, cabecalho, resultados)
+
+    def pendentes(self):
+        """Números ainda sem resultado válido no diário, na ordem original."""
+        return [numero for numero in self.numeros
+                if numero not in self.resultados or "erro" in self.resultados[numero]]
+
+    def _gravar_linhas(self, registros):
+        """Acrescenta registros ao diário e força a gravação em disco."""
+        with self._trava:
+            if self._arquivo is None:
+                self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+            for registro in registros:
+                self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def registrar(self, resultados):
+        """
+        Grava no diário os resultados concluídos.
+
+        Args:
+            resultados (dict): {numero: resultado}
+        """
+        self.resultados.update(resultados)
+        self._gravar_linhas([{"numero": numero, "resultado": resultado}
+                             for numero, resultado in resultados.items()])
+
+    def fechar(self):
+        """Fecha o arquivo do diário, mantendo-o para uma futura retomada."""
+        with self._trava:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+    def concluir(self):
+        """Remove o diário após os resultados serem gravados no arquivo definitivo."""
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+def listar_lotes_interrompidos(tipo=None):
+    """
+    Lista as consultas em lote que não foram concluídas.
+
+    Args:
+        tipo (str): Filtra pelo tipo do tribunal ('TJ' ou 'TRF'), se informado
+
+    Returns:
+        list: Dicionários com id, tipo, criado_em, total e concluidos
+    """
+    if not os.path.isdir(LOTES_DIR):
+        return []
+
+    lotes = []
+    for nome in sorted(os.listdir(LOTES_DIR)):
+        if not nome.endswith(EXTENSAO_DIARIO):
+            continue
+        diario = DiarioLote.abrir(nome[:-len(EXTENSAO_DIARIO)])
+        if diario is None or (tipo and diario.tipo != tipo):
+            continue
+        lotes.append({
+            "id": diario.id,
+            "tipo": diario.tipo,
+            "criado_em": diario.cabecalho.get("criado_em", ""),
+            "total": len(diario.numeros),
+            "concluidos": len(diario.numeros) - len(diario.pendentes())
+        })
+    return lotes
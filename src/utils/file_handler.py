@@ -1,6 +1,100 @@
+import atexit
 import os
 import json
-from ..config import CACHE_DIR
+import mmap
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from ..config import (CACHE_DIR, ARMAZENAMENTO_MOTOR, ARMAZENAMENTO_COMPRIMIR, ARMAZENAMENTO_NIVEL_COMPRESSAO,
+                      CACHE_MAX_RESULTADOS, CACHE_MAX_MB)
+from ..models.resumo import resumo_compacto
+from ..models.status import obter_classificador
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Arquivos que falharam ao carregar: não são sobrescritos até serem recuperados
+_arquivos_corrompidos = set()
+_travas_arquivos = {}
+_trava_travas = threading.Lock()
+
+
+class _TravaArquivo:
+    """Trava reentrante de um arquivo, válida entre threads e entre processos."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho + ".lock"
+        self._trava = threading.RLock()
+        self._profundidade = 0
+        self._arquivo = None
+
+    def adquirir(self):
+        self._trava.acquire()
+        if self._profundidade == 0:
+            try:
+                try:
+                    self._arquivo = open(self.caminho, 'a+b')
+                except FileNotFoundError:
+                    # O diretório do cache só é criado na primeira gravação
+                    os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+                    self._arquivo = open(self.caminho, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            self._arquivo.seek(0)
+                            msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            time.sleep(0.05)
+            except Exception:
+                if self._arquivo is not None:
+                    self._arquivo.close()
+                    self._arquivo = None
+                self._trava.release()
+                raise
+        self._profundidade += 1
+
+    def liberar(self):
+        self._profundidade -= 1
+        if self._profundidade == 0:
+            if fcntl is not None:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._arquivo.seek(0)
+                msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+            self._arquivo.close()
+            self._arquivo = None
+        self._trava.release()
+
+
+@contextmanager
+def bloquear_arquivo(caminho_arquivo):
+    """
+    Bloqueia o arquivo para leitura-modificação-gravação, impedindo que outras
+    threads ou outros processos do programa o alterem ao mesmo tempo.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo protegido
+    """
+    caminho_arquivo = os.path.abspath(caminho_arquivo)
+    with _trava_travas:
+        if caminho_arquivo not in _travas_arquivos:
+            _travas_arquivos[caminho_arquivo] = _TravaArquivo(caminho_arquivo)
+        trava = _travas_arquivos[caminho_arquivo]
+    trava.adquirir()
+    try:
+        yield
+    finally:
+        trava.liberar()
 
 def garantir_diretorio_existe(diretorio=CACHE_DIR):
     """Garante que o diretório especificado existe."""
@@ -9,25 +103,821 @@ def garantir_diretorio_existe(diretorio=CACHE_DIR):
         print(f"Diretório '{diretorio}' criado com sucesso.")
 
 def carregar_arquivo_json(caminho_arquivo):
-    """Carrega dados de um arquivo JSON."""
+    """
+    Carrega dados de um arquivo JSON.
+
+    Se o arquivo existir mas não puder ser lido, ele é marcado como corrompido
+    e `salvar_arquivo_json` se recusa a sobrescrevê-lo até que seja
+    recuperado com `recuperar_arquivo_json`.
+    """
+    caminho_absoluto = os.path.abspath(caminho_arquivo)
     try:
         if os.path.exists(caminho_arquivo):
             with open(caminho_arquivo, 'r') as arquivo:
-                return json.load(arquivo)
+                dados = json.load(arquivo)
+            _arquivos_corrompidos.discard(caminho_absoluto)
+            return dados
         return []
     except json.JSONDecodeError:
-        print(f"Erro ao carregar o arquivo {caminho_arquivo}. Formato JSON inválido.")
+        _arquivos_corrompidos.add(caminho_absoluto)
+        print(f"Erro ao carregar o arquivo {caminho_arquivo}. Formato JSON inválido. "
+              "O arquivo não será sobrescrito até ser recuperado.")
         return []
     except Exception as e:
+        _arquivos_corrompidos.add(caminho_absoluto)
         print(f"Erro ao abrir o arquivo {caminho_arquivo}: {str(e)}")
         return []
 
+def arquivo_corrompido(caminho_arquivo):
+    """Indica se o último carregamento do arquivo falhou."""
+    return os.path.abspath(caminho_arquivo) in _arquivos_corrompidos
+
+def recuperar_arquivo_json(caminho_arquivo):
+    """
+    Move um arquivo corrompido para uma cópia de segurança, liberando o caminho
+    para ser gravado novamente.
+
+    Returns:
+        str: Caminho da cópia de segurança, ou None se não havia o que recuperar
+    """
+    with bloquear_arquivo(caminho_arquivo):
+        _arquivos_corrompidos.discard(os.path.abspath(caminho_arquivo))
+        if not os.path.exists(caminho_arquivo):
+            return None
+        copia = f"{caminho_arquivo}.corrompido-{time.strftime('%Y%m%d-%H%M%S')}"
+        os.replace(caminho_arquivo, copia)
+        print(f"Arquivo {caminho_arquivo} movido para {copia}.")
+        return copia
+
 def salvar_arquivo_json(caminho_arquivo, dados, indentacao=2):
-    """Salva dados em um arquivo JSON."""
+    """
+    Salva dados em um arquivo JSON de forma atômica: grava em um arquivo
+    temporário, força a gravação em disco e o renomeia sobre o original.
+    """
+    if arquivo_corrompido(caminho_arquivo):
+        print(f"O arquivo {caminho_arquivo} não pôde ser lido e não será sobrescrito. "
+              "Corrija-o ou use recuperar_arquivo_json para movê-lo.")
+        return False
+
+    temporario = None
     try:
-        with open(caminho_arquivo, 'w') as arquivo:
-            json.dump(dados, arquivo, indent=indentacao)
+        diretorio = os.path.dirname(os.path.abspath(caminho_arquivo))
+        with bloquear_arquivo(caminho_arquivo):
+            descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp-",
+                                                     suffix=os.path.basename(caminho_arquivo))
+            with os.fdopen(descritor, 'w') as arquivo:
+                json.dump(dados, arquivo, indent=indentacao)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, caminho_arquivo)
+            temporario = None
         return True
     except Exception as e:
         print(f"Erro ao salvar o arquivo {caminho_arquivo}: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
+
+def atualizar_arquivo_json(caminho_arquivo, atualizar, padrao=list):
+    """
+    Lê, modifica e grava um arquivo JSON com o arquivo bloqueado, para que
+    alterações simultâneas (threads da GUI ou outro processo) não se percam.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo JSON
+        atualizar: Função que recebe os dados, altera-os no próprio objeto e
+            retorna um valor verdadeiro quando houver algo a gravar
+        padrao: Fábrica dos dados quando o arquivo não existe ou está vazio
+
+    Returns:
+        O retorno de `atualizar`, ou None se o arquivo não pôde ser lido ou gravado
+    """
+    with bloquear_arquivo(caminho_arquivo):
+        dados = carregar_arquivo_json(caminho_arquivo)
+        if arquivo_corrompido(caminho_arquivo):
+            return None
+        if not dados:
+            dados = padrao()
+        retorno = atualizar(dados)
+        if retorno and not salvar_arquivo_json(caminho_arquivo, dados):
+            return None
+        return retorno
+
+
+# Armazenamento de resultados em log binário somente de acréscimo (append-only).
+# Cada registro tem um cabeçalho fixo (número do processo, flags e tamanho do
+# conteúdo) seguido do resultado em JSON, comprimido quando FLAG_COMPRIMIDO
+# está ligada. Gravar um processo custa apenas o tamanho do seu resultado;
+# versões antigas são descartadas na compactação.
+MAGICO_ARMAZENAMENTO = b"CJRLOG1\n"
+CABECALHO_REGISTRO = struct.Struct(">20sBI")
+FLAG_REMOVIDO = 0x01
+FLAG_COMPRIMIDO = 0x02
+# Compacta quando os registros obsoletos passam desta fração do arquivo
+FRACAO_OBSOLETA_COMPACTACAO = 0.5
+TAMANHO_MINIMO_COMPACTACAO = 1024 * 1024
+
+# Índice de posições gravado ao lado do log (arquivo .idx): cabeçalho com o fim
+# do log coberto, os bytes obsoletos, a posição e o cabeçalho do último
+# registro (para conferir que o log é o mesmo) e uma entrada por processo,
+# com o instante do último acesso (usado no descarte por limite do cache).
+# Com ele, abrir o log lê apenas os registros acrescentados depois.
+MAGICO_INDICE = b"CJRIDX2\n"
+CABECALHO_INDICE = struct.Struct(">QQQI")
+ENTRADA_INDICE = struct.Struct(">20sQIBd")
+# Regrava o índice na abertura se tantos registros tiverem sido lidos do log
+REGISTROS_REGRAVAR_INDICE = 256
+# Ao exceder o limite do cache, descarta respostas até ocupar esta fração dele
+FRACAO_ALVO_LIMITE = 0.9
+
+
+def caminho_resumos(caminho_arquivo):
+    """Caminho do log de resumos que acompanha um log de resultados."""
+    return os.path.splitext(caminho_arquivo)[0] + ".resumos.dat"
+
+
+def caminho_indice(caminho_arquivo):
+    """Caminho do índice de posições de um log de resultados."""
+    return caminho_arquivo + ".idx"
+
+
+class ArmazenamentoResultados(MutableMapping):
+    """
+    Resultados de consultas indexados por número de processo, gravados em log.
+
+    O índice em memória guarda apenas a posição de cada registro e é salvo
+    em disco (ver `salvar_indice`), de modo que abrir o log não exige
+    percorrê-lo. O conteúdo de um registro é lido sob demanda do arquivo
+    mapeado em memória (mmap), tocando apenas os seus bytes. Na primeira
+    abertura, o arquivo JSON antigo de mesmo nome (extensão .json) é migrado
+    automaticamente.
+
+    O cache tem duas camadas: as respostas completas, comprimidas, e um log
+    de resumos (ver `resumo_compacto`) mantido junto a cada gravação, usado
+    por listas, estatísticas e pela verificação de validade do cache.
+    """
+
+    def __init__(self, caminho, comprimir=None, camada_resumos=True):
+        """
+        Args:
+            caminho (str): Caminho do log de resultados
+            comprimir (bool): Se True, grava os resultados comprimidos
+                (padrão: ARMAZENAMENTO_COMPRIMIR)
+            camada_resumos (bool): Se True, mantém o log de resumos ao lado do log
+        """
+        self.caminho = caminho
+        self.comprimir = ARMAZENAMENTO_COMPRIMIR if comprimir is None else comprimir
+        self._indice = {}
+        self._acessos = {}
+        self._bytes_obsoletos = 0
+        # Soma dos tamanhos das versões atuais, mantida a cada registro indexado
+        self._bytes_atuais = 0
+        self._fim = 0
+        self._ultimo = 0
+        self._trava = threading.RLock()
+        self._arquivo = None
+        self._mapa = None
+        self._resumos = None
+        self._abrir()
+        if camada_resumos:
+            self._resumos = ArmazenamentoResultados(caminho_resumos(caminho), comprimir=False,
+                                                    camada_resumos=False)
+            self._conferir_resumos()
+
+    def _abrir(self):
+        """Abre o log, criando-o (e migrando o JSON antigo) se necessário."""
+        legado = os.path.splitext(self.caminho)[0] + ".json"
+        garantir_diretorio_existe(os.path.dirname(self.caminho))
+        with bloquear_arquivo(self.caminho):
+            novo = not os.path.exists(self.caminho)
+            if novo:
+                with open(self.caminho, 'wb') as arquivo:
+                    arquivo.write(MAGICO_ARMAZENAMENTO)
+
+            self._arquivo = open(self.caminho, 'r+b')
+            indice_salvo = not novo and self._ler_indice_salvo()
+            lidos = self._carregar_indice(continuar=indice_salvo)
+            if lidos >= REGISTROS_REGRAVAR_INDICE or (lidos and not indice_salvo):
+                self.salvar_indice()
+
+            if novo and os.path.exists(legado):
+                self._migrar_json(legado)
+
+    def _mapear(self):
+        """Retorna o log mapeado em memória, refazendo o mapa se o arquivo mudou de tamanho."""
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        if self._mapa is None or len(self._mapa) != tamanho:
+            self._fechar_mapa()
+            self._mapa = mmap.mmap(self._arquivo.fileno(), tamanho, access=mmap.ACCESS_READ)
+        return self._mapa
+
+    def _fechar_mapa(self):
+        """Desfaz o mapa (necessário antes de truncar ou substituir o arquivo no Windows)."""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+
+    def _carregar_indice(self, continuar=False):
+        """
+        Percorre apenas os cabeçalhos dos registros para montar o índice.
+
+        Args:
+            continuar (bool): Se True, lê apenas os registros acrescentados
+                após a última leitura (por exemplo, por outro processo)
+
+        Returns:
+            int: Quantidade de registros lidos
+        """
+        mapa = self._mapear()
+        if not continuar:
+            self._indice = {}
+            self._acessos = {}
+            self._bytes_obsoletos = 0
+            self._bytes_atuais = 0
+            self._ultimo = 0
+            if mapa[:len(MAGICO_ARMAZENAMENTO)] != MAGICO_ARMAZENAMENTO:
+                raise ValueError(f"Arquivo {self.caminho} não é um armazenamento de resultados válido.")
+            self._fim = len(MAGICO_ARMAZENAMENTO)
+
+        posicao = self._fim
+        tamanho_arquivo = len(mapa)
+        lidos = 0
+        while posicao + CABECALHO_REGISTRO.size <= tamanho_arquivo:
+            chave, flags, tamanho = CABECALHO_REGISTRO.unpack_from(mapa, posicao)
+            fim = posicao + CABECALHO_REGISTRO.size + tamanho
+            if fim > tamanho_arquivo:
+                break
+            self._indexar(chave.rstrip(b"\0").decode("ascii"), flags, posicao, tamanho)
+            posicao = fim
+            lidos += 1
+        # Um registro incompleto no final (gravação interrompida ou em andamento
+        # em outro processo) fica fora do índice
+        self._fim = posicao
+        return lidos
+
+    def _ler_indice_salvo(self):
+        """
+        Carrega o índice salvo, se ele ainda corresponder ao log.
+
+        Returns:
+            bool: True se o índice foi carregado (falta apenas ler os registros
+                acrescentados depois dele)
+        """
+        try:
+            with open(caminho_indice(self.caminho), 'rb') as arquivo:
+                dados = arquivo.read()
+        except OSError:
+            return False
+
+        inicio = len(MAGICO_INDICE) + CABECALHO_INDICE.size + CABECALHO_REGISTRO.size
+        if not dados.startswith(MAGICO_INDICE) or len(dados) < inicio:
+            return False
+        fim, obsoletos, ultimo, quantidade = CABECALHO_INDICE.unpack_from(dados, len(MAGICO_INDICE))
+        cabecalho_ultimo = dados[inicio - CABECALHO_REGISTRO.size:inicio]
+        if len(dados) != inicio + quantidade * ENTRADA_INDICE.size:
+            return False
+
+        # O log precisa conter o último registro indexado na mesma posição;
+        # caso contrário (log compactado ou substituído), o índice é descartado
+        mapa = self._mapear()
+        if fim > len(mapa) or mapa[:len(MAGICO_ARMAZENAMENTO)] != MAGICO_ARMAZENAMENTO:
+            return False
+        if ultimo:
+            _, _, tamanho = CABECALHO_REGISTRO.unpack(cabecalho_ultimo)
+            if (mapa[ultimo:ultimo + CABECALHO_REGISTRO.size] != cabecalho_ultimo
+                    or ultimo + CABECALHO_REGISTRO.size + tamanho != fim):
+                return False
+        elif fim != len(MAGICO_ARMAZENAMENTO):
+            return False
+
+        self._indice = {}
+        self._acessos = {}
+        self._bytes_atuais = 0
+        for chave, posicao, tamanho, flags, acesso in ENTRADA_INDICE.iter_unpack(dados[inicio:]):
+            numero = chave.rstrip(b"\0").decode("ascii")
+            self._indice[numero] = (posicao, tamanho, flags)
+            self._acessos[numero] = acesso
+            self._bytes_atuais += tamanho
+        self._bytes_obsoletos = obsoletos
+        self._fim = fim
+        self._ultimo = ultimo
+        return True
+
+    def salvar_indice(self):
+        """Grava o índice de posições ao lado do log, para a próxima abertura não percorrê-lo."""
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            mapa = self._mapear()
+            cabecalho_ultimo = (mapa[self._ultimo:self._ultimo + CABECALHO_REGISTRO.size] if self._ultimo
+                                else bytes(CABECALHO_REGISTRO.size))
+            partes = [MAGICO_INDICE,
+                      CABECALHO_INDICE.pack(self._fim, self._bytes_obsoletos, self._ultimo, len(self._indice)),
+                      cabecalho_ultimo]
+            partes.extend(ENTRADA_INDICE.pack(numero.encode("ascii"), posicao, tamanho, flags,
+                                              self._acessos.get(numero, 0))
+                          for numero, (posicao, tamanho, flags) in self._indice.items())
+            # O índice é apenas um atalho: basta a troca atômica, sem fsync
+            temporario = caminho_indice(self.caminho) + ".tmp"
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(b"".join(partes))
+            os.replace(temporario, caminho_indice(self.caminho))
+
+    def _sincronizar(self):
+        """Atualiza o índice se outro processo alterou o log desde a última leitura."""
+        try:
+            trocado = os.stat(self.caminho).st_ino != os.fstat(self._arquivo.fileno()).st_ino
+        except FileNotFoundError:
+            trocado = False
+        if trocado:
+            # Log compactado por outro processo: reabrir o novo arquivo
+            self._fechar_mapa()
+            self._arquivo.close()
+            self._arquivo = open(self.caminho, 'r+b')
+            self._carregar_indice()
+            return
+
+        tamanho_arquivo = os.fstat(self._arquivo.fileno()).st_size
+        if tamanho_arquivo < self._fim:
+            self._carregar_indice()
+        elif tamanho_arquivo >= self._fim + CABECALHO_REGISTRO.size:
+            self._carregar_indice(continuar=True)
+
+    def _indexar(self, numero, flags, posicao, tamanho):
+        """Atualiza o índice com o registro gravado em `posicao` (mantendo a ordem de inserção)."""
+        self._ultimo = posicao
+        anterior = self._indice.get(numero)
+        if anterior is not None:
+            self._bytes_obsoletos += CABECALHO_REGISTRO.size + anterior[1]
+            self._bytes_atuais -= anterior[1]
+        if flags & FLAG_REMOVIDO:
+            self._indice.pop(numero, None)
+            self._acessos.pop(numero, None)
+            self._bytes_obsoletos += CABECALHO_REGISTRO.size
+        else:
+            self._indice[numero] = (posicao + CABECALHO_REGISTRO.size, tamanho, flags)
+            self._acessos[numero] = time.time()
+            self._bytes_atuais += tamanho
+
+    def _migrar_json(self, legado):
+        """Importa os resultados do arquivo JSON usado pelas versões anteriores."""
+        resultados = carregar_arquivo_json(legado)
+        if isinstance(resultados, dict) and resultados:
+            self.atualizar(resultados)
+            print(f"{len(resultados)} resultados migrados de {os.path.basename(legado)}.")
+        os.replace(legado, legado + ".migrado")
+
+    def _codificar(self, resultado):
+        """Serializa um resultado, retornando (flags, conteudo)."""
+        conteudo = json.dumps(resultado, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self.comprimir:
+            return FLAG_COMPRIMIDO, zlib.compress(conteudo, ARMAZENAMENTO_NIVEL_COMPRESSAO)
+        return 0, conteudo
+
+    @staticmethod
+    def _decodificar(flags, conteudo):
+        if flags & FLAG_COMPRIMIDO:
+            conteudo = zlib.decompress(conteudo)
+        return json.loads(conteudo.decode("utf-8"))
+
+    def _gravar(self, registros, sincronizar=True):
+        """Acrescenta registros (numero, flags, conteudo) ao final do log."""
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            arquivo = self._arquivo
+            if os.fstat(arquivo.fileno()).st_size > self._fim:
+                # Descarta o registro incompleto de uma gravação interrompida
+                print(f"Registro incompleto descartado no final de {self.caminho}.")
+                arquivo.truncate(self._fim)
+            arquivo.seek(self._fim)
+            for numero, flags, conteudo in registros:
+                chave = numero.encode("ascii")
+                if len(chave) > 20:
+                    raise ValueError(f"Número de processo inválido para armazenamento: {numero}")
+                arquivo.write(CABECALHO_REGISTRO.pack(chave, flags, len(conteudo)) + conteudo)
+                self._indexar(numero, flags, self._fim, len(conteudo))
+                self._fim += CABECALHO_REGISTRO.size + len(conteudo)
+            arquivo.flush()
+            if sincronizar:
+                os.fsync(arquivo.fileno())
+
+    def _conferir_resumos(self):
+        """Refaz os resumos ausentes (log de resumos novo ou gravação interrompida) e descarta os órfãos."""
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            self._resumos._sincronizar()
+            indice_resumos = self._resumos._indice
+            ausentes = [numero for numero in self._indice if numero not in indice_resumos]
+            # Resumos de respostas descartadas pelo limite do cache continuam válidos
+            orfaos = [numero for numero in indice_resumos
+                      if numero not in self._indice and not self._resumos[numero].get("_descartado")]
+            if ausentes:
+                self._resumos.atualizar({numero: resumo_compacto(numero, self._ler(numero)) for numero in ausentes})
+                print(f"{len(ausentes)} resumos gerados em {os.path.basename(self._resumos.caminho)}.")
+            if orfaos:
+                self._resumos.remover_varios(orfaos)
+
+    def _ler(self, numero):
+        """Lê um resultado sem registrar o acesso (usado na manutenção do cache)."""
+        with self._trava:
+            self._sincronizar()
+            posicao, tamanho, flags = self._indice[numero]
+            conteudo = self._mapear()[posicao:posicao + tamanho]
+        return self._decodificar(flags, conteudo)
+
+    def __getitem__(self, numero):
+        # O acesso é registrado sob a trava: `limitar` e a compactação percorrem
+        # e substituem `_acessos` em outras threads
+        with self._trava:
+            resultado = self._ler(numero)
+            self._acessos[numero] = time.time()
+            return resultado
+
+    def __setitem__(self, numero, resultado):
+        self.atualizar({numero: resultado})
+
+    def __delitem__(self, numero):
+        with self._trava:
+            self._sincronizar()
+            if numero not in self._indice:
+                raise KeyError(numero)
+            self.remover_varios([numero])
+
+    def __contains__(self, numero):
+        with self._trava:
+            self._sincronizar()
+            return numero in self._indice
+
+    def __iter__(self):
+        with self._trava:
+            self._sincronizar()
+            return iter(list(self._indice))
+
+    def __len__(self):
+        with self._trava:
+            self._sincronizar()
+            return len(self._indice)
+
+    def atualizar(self, resultados):
+        """
+        Grava vários resultados de uma vez, com uma única sincronização em disco,
+        e os resumos correspondentes.
+
+        Args:
+            resultados (dict): {numero: resultado}
+        """
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._gravar([(numero,) + self._codificar(resultado) for numero, resultado in resultados.items()])
+            if self._resumos is not None:
+                self._resumos.atualizar({numero: resumo_compacto(numero, resultado)
+                                         for numero, resultado in resultados.items()})
+
+    def remover_varios(self, numeros):
+        """
+        Remove vários resultados de uma vez, com uma única sincronização em disco.
+
+        Returns:
+            int: Quantidade de resultados removidos
+        """
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            numeros = list(dict.fromkeys(numeros))
+            existentes = [numero for numero in numeros if numero in self._indice]
+            if existentes:
+                self._gravar([(numero, FLAG_REMOVIDO, b"") for numero in existentes])
+            if self._resumos is None:
+                return len(existentes)
+            # Processos cuja resposta já foi descartada pelo limite do cache têm apenas o resumo
+            descartados = [numero for numero in numeros if numero not in self._indice and numero in self._resumos]
+            self._resumos.remover_varios(numeros)
+            return len(existentes) + len(descartados)
+
+    def renovar_consultas(self, consultas):
+        """
+        Registra uma nova consulta de processos cuja resposta não mudou, sem
+        regravar a resposta completa: o momento da consulta é atualizado no
+        resumo (usado na validade do cache) e o acesso, no índice (usado no
+        limite do cache). Processos que não estão gravados são ignorados.
+
+        Args:
+            consultas (dict): Número -> momento da consulta (_consultado_em; None = agora)
+
+        Returns:
+            int: Quantidade de processos renovados
+        """
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            agora = time.time()
+            renovados = {}
+            for numero, momento in consultas.items():
+                if numero not in self._indice:
+                    continue
+                self._acessos[numero] = agora
+                resumo = self._resumos.get(numero) if self._resumos is not None else None
+                if resumo is not None:
+                    resumo["_consultado_em"] = agora if momento is None else momento
+                    resumo.pop("_ultimo_erro", None)
+                    resumo.pop("_ultimo_erro_em", None)
+                    renovados[numero] = resumo
+            if renovados:
+                self._resumos.atualizar(renovados)
+            return len(renovados)
+
+    def registrar_erros(self, erros):
+        """
+        Registra a falha da consulta de processos que já têm uma resposta válida
+        gravada, sem substituí-la: a mensagem e o momento do erro ficam no resumo
+        ("_ultimo_erro" e "_ultimo_erro_em") até a próxima resposta válida. O
+        momento da consulta não muda, então o processo continua vencido no cache.
+
+        Args:
+            erros (dict): Número -> resposta com a chave "erro"
+
+        Returns:
+            int: Quantidade de processos com o erro registrado
+        """
+        if self._resumos is None:
+            return 0
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            registrados = {}
+            for numero, erro in erros.items():
+                resumo = self._resumos.get(numero)
+                if resumo is None or "erro" in resumo:
+                    continue
+                resumo["_ultimo_erro"] = erro.get("erro")
+                resumo["_ultimo_erro_em"] = erro.get("_consultado_em")
+                registrados[numero] = resumo
+            if registrados:
+                self._resumos.atualizar(registrados)
+            return len(registrados)
+
+    def resumo(self, numero):
+        """
+        Campos resumidos de um processo, lidos da camada de resumos sem
+        descomprimir a resposta completa.
+
+        Returns:
+            dict: Resumo (ver `resumo_compacto`) ou None se o processo não estiver gravado;
+                "_descartado" indica que a resposta completa saiu do cache
+        """
+        with self._trava:
+            dados = self._resumos.get(numero)
+            if dados is not None and dados.get("_regras") == obter_classificador().assinatura:
+                return dados
+            # Resumo ausente ou calculado com outras regras de status: refazer a partir da resposta
+            if numero not in self:
+                return dados
+            dados = resumo_compacto(numero, self._ler(numero))
+            self._resumos[numero] = dados
+            return dados
+
+    def resumos(self):
+        """
+        Resumos de todos os processos gravados, lidos do log de resumos de uma vez.
+
+        Os resumos calculados com regras de status anteriores são refeitos e regravados.
+
+        Returns:
+            dict: Número -> resumo (ver `resumo_compacto`)
+        """
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._conferir_resumos()
+            dados = self._resumos.ler_todos()
+            assinatura = obter_classificador().assinatura
+            desatualizados = {numero: resumo_compacto(numero, self._ler(numero)) for numero, resumo in dados.items()
+                              if resumo.get("_regras") != assinatura and numero in self._indice}
+            if desatualizados:
+                self._resumos.atualizar(desatualizados)
+                dados.update(desatualizados)
+                print(f"{len(desatualizados)} resumos refeitos com as regras de status atuais.")
+            return dados
+
+    def limitar(self, max_resultados=None, max_mb=None):
+        """
+        Descarta as respostas completas usadas há mais tempo quando o cache
+        excede o limite, até ocupar FRACAO_ALVO_LIMITE dele (a folga evita
+        refazer a ordenação a cada gravação). Os resumos permanecem (marcados
+        com "_descartado"), de modo que listas e estatísticas continuam
+        completas; a resposta volta a ser baixada da API quando for necessária.
+
+        A verificação usa os totais mantidos no índice e não percorre o
+        cache, podendo ser feita a cada gravação.
+
+        Args:
+            max_resultados (int): Máximo de respostas completas (padrão:
+                CACHE_MAX_RESULTADOS; 0 = sem limite)
+            max_mb (float): Máximo de megabytes das respostas gravadas (padrão:
+                CACHE_MAX_MB; 0 = sem limite)
+
+        Returns:
+            int: Quantidade de respostas descartadas
+        """
+        max_resultados = CACHE_MAX_RESULTADOS if max_resultados is None else max_resultados
+        max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            quantidade = len(self._indice)
+            tamanho = self._bytes_atuais
+
+            def excedido(fracao=1):
+                return ((max_resultados and quantidade > max_resultados * fracao)
+                        or (max_bytes and tamanho > max_bytes * fracao))
+
+            if not excedido():
+                return 0
+            # Menos recentemente usadas primeiro; no empate, as gravadas antes
+            ordem = sorted(self._indice, key=lambda numero: (self._acessos.get(numero, 0), self._indice[numero][0]))
+            descartar = []
+            for numero in ordem:
+                if not excedido(FRACAO_ALVO_LIMITE):
+                    break
+                descartar.append(numero)
+                quantidade -= 1
+                tamanho -= self._indice[numero][1]
+
+            if self._resumos is not None:
+                marcados = {}
+                for numero in descartar:
+                    resumo = self._resumos.get(numero) or resumo_compacto(numero, self._ler(numero))
+                    resumo["_descartado"] = True
+                    marcados[numero] = resumo
+                self._resumos.atualizar(marcados)
+            self._gravar([(numero, FLAG_REMOVIDO, b"") for numero in descartar])
+            print(f"{len(descartar)} respostas usadas há mais tempo descartadas de "
+                  f"{os.path.basename(self.caminho)} (limite do cache).")
+            self.compactar_se_necessario()
+            return len(descartar)
+
+    def ler_todos(self):
+        """
+        Lê todos os registros em sequência (adequado a logs pequenos, como o de resumos).
+
+        Returns:
+            dict: Número -> conteúdo
+        """
+        with self._trava:
+            self._sincronizar()
+            mapa = self._mapear()
+            return {numero: self._decodificar(flags, mapa[posicao:posicao + tamanho])
+                    for numero, (posicao, tamanho, flags) in self._indice.items()}
+
+    def limpar(self):
+        """Remove todos os resultados armazenados."""
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            self._fechar_mapa()
+            self._arquivo.truncate(len(MAGICO_ARMAZENAMENTO))
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._indice = {}
+            self._acessos = {}
+            self._bytes_obsoletos = 0
+            self._bytes_atuais = 0
+            self._fim = len(MAGICO_ARMAZENAMENTO)
+            self._ultimo = 0
+            self.salvar_indice()
+            if self._resumos is not None:
+                self._resumos.limpar()
+
+    def compactar(self):
+        """
+        Reescreve o log apenas com a versão atual de cada resultado. Registros
+        gravados sem compressão são comprimidos se `comprimir` estiver ativo.
+        """
+        with self._trava, bloquear_arquivo(self.caminho):
+            self._sincronizar()
+            temporario = self.caminho + ".tmp"
+            with open(temporario, 'wb') as destino:
+                destino.write(MAGICO_ARMAZENAMENTO)
+                mapa = self._mapear()
+                for numero, (posicao, tamanho, flags) in self._indice.items():
+                    conteudo = mapa[posicao:posicao + tamanho]
+                    if self.comprimir and not flags & FLAG_COMPRIMIDO:
+                        flags, conteudo = self._codificar(self._decodificar(flags, conteudo))
+                    destino.write(CABECALHO_REGISTRO.pack(numero.encode("ascii"), flags, len(conteudo)))
+                    destino.write(conteudo)
+                destino.flush()
+                os.fsync(destino.fileno())
+            acessos = self._acessos
+            self._fechar_mapa()
+            self._arquivo.close()
+            os.replace(temporario, self.caminho)
+            self._arquivo = open(self.caminho, 'r+b')
+            self._carregar_indice()
+            self._acessos.update((numero, acesso) for numero, acesso in acessos.items() if numero in self._indice)
+            self.salvar_indice()
+
+    def compactar_se_necessario(self):
+        """Compacta o log (e o de resumos) se os registros obsoletos ocuparem boa parte do arquivo."""
+        with self._trava:
+            self._sincronizar()
+            tamanho = os.fstat(self._arquivo.fileno()).st_size
+            compactado = False
+            if (tamanho >= TAMANHO_MINIMO_COMPACTACAO
+                    and self._bytes_obsoletos >= tamanho * FRACAO_OBSOLETA_COMPACTACAO):
+                self.compactar()
+                compactado = True
+            if self._resumos is not None:
+                self._resumos.compactar_se_necessario()
+            return compactado
+
+    def fechar(self):
+        """Salva o índice e fecha o arquivo do log (e o de resumos)."""
+        with self._trava:
+            if self._arquivo is not None:
+                self.salvar_indice()
+                self._fechar_mapa()
+                self._arquivo.close()
+                self._arquivo = None
+            if self._resumos is not None:
+                self._resumos.fechar()
+
+_armazenamentos = {}
+_trava_armazenamentos = threading.Lock()
+
+
+def _tribunal_sqlite(caminho_arquivo):
+    """Tribunal do arquivo quando o motor SQLite está ativo, ou None."""
+    if ARMAZENAMENTO_MOTOR != "sqlite":
+        return None
+    from .banco_dados import tribunal_do_arquivo
+    return tribunal_do_arquivo(caminho_arquivo)
+
+
+def abrir_armazenamento(caminho_arquivo):
+    """
+    Retorna o armazenamento de resultados do arquivo, compartilhado entre as
+    threads do programa. Com ARMAZENAMENTO_MOTOR = "sqlite", os resultados do
+    tribunal correspondente são lidos do banco.
+
+    Args:
+        caminho_arquivo (str): Caminho do log de resultados
+
+    Returns:
+        ArmazenamentoResultados ou ResultadosSQLite: Armazenamento aberto
+    """
+    caminho_arquivo = os.path.abspath(caminho_arquivo)
+    with _trava_armazenamentos:
+        if caminho_arquivo not in _armazenamentos:
+            tribunal = _tribunal_sqlite(caminho_arquivo)
+            if tribunal:
+                from .banco_dados import ResultadosSQLite
+                _armazenamentos[caminho_arquivo] = ResultadosSQLite(tribunal)
+            else:
+                _armazenamentos[caminho_arquivo] = ArmazenamentoResultados(caminho_arquivo)
+        return _armazenamentos[caminho_arquivo]
+
+
+def fechar_armazenamentos():
+    """Fecha os armazenamentos abertos, salvando os índices (chamada ao encerrar o programa)."""
+    with _trava_armazenamentos:
+        for armazenamento in _armazenamentos.values():
+            try:
+                armazenamento.fechar()
+            except Exception as e:
+                print(f"Erro ao fechar o armazenamento {armazenamento.caminho}: {str(e)}")
+        _armazenamentos.clear()
+
+
+atexit.register(fechar_armazenamentos)
+
+
+def carregar_lista_processos(caminho_arquivo):
+    """
+    Carrega uma lista de processos do arquivo JSON ou, com o motor SQLite, do banco.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo da lista (LISTA_TJ_FILE ou LISTA_TRF_FILE)
+
+    Returns:
+        list: Números de processo na ordem de cadastro
+    """
+    tribunal = _tribunal_sqlite(caminho_arquivo)
+    if tribunal:
+        from .banco_dados import carregar_lista
+        return carregar_lista(tribunal)
+    return carregar_arquivo_json(caminho_arquivo)
+
+
+def salvar_lista_processos(caminho_arquivo, lista):
+    """
+    Salva uma lista de processos no arquivo JSON ou, com o motor SQLite, no banco.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo da lista
+        lista (list): Números de processo
+
+    Returns:
+        bool: True se a lista foi salva com sucesso
+    """
+    tribunal = _tribunal_sqlite(caminho_arquivo)
+    if not tribunal:
+        return salvar_arquivo_json(caminho_arquivo, lista)
+    try:
+        from .banco_dados import salvar_lista
+        salvar_lista(tribunal, lista)
+        return True
+    except Exception as e:
+        print(f"Erro ao salvar a lista de processos {tribunal} no banco: {str(e)}")
+        return False
@@ -0,0 +1,368 @@
+"""
+Histórico de movimentos e de mudanças de status dos processos (SQLite).
+
+A cada consulta, apenas os movimentos ainda não conhecidos são gravados (o
+nome de cada código é guardado uma única vez) e os dados gerais do processo
+só geram um novo registro quando mudam. As mudanças de status são derivadas
+dos movimentos, o que permite responder sem acessar a API:
+  - qual era a situação do processo X na data D;
+  - quais processos mudaram de status na semana W.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from ..config import HISTORICO_FILE
+from ..models.resumo import fontes_resultado, fonte_principal
+from ..models.status import obter_classificador
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS processos (
+    id INTEGER PRIMARY KEY,
+    tribunal TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    grau_principal TEXT,
+    UNIQUE (tribunal, numero)
+);
+CREATE INDEX IF NOT EXISTS idx_historico_numero ON processos (numero);
+CREATE TABLE IF NOT EXISTS nomes_movimento (
+    codigo INTEGER PRIMARY KEY,
+    nome TEXT
+);
+CREATE TABLE IF NOT EXISTS movimentos (
+    processo_id INTEGER NOT NULL,
+    data_hora TEXT NOT NULL,
+    codigo INTEGER NOT NULL,
+    grau TEXT NOT NULL DEFAULT '',
+    registrado_em TEXT NOT NULL,
+    PRIMARY KEY (processo_id, data_hora, codigo, grau)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estados (
+    processo_id INTEGER NOT NULL,
+    registrado_em TEXT NOT NULL,
+    ultima_atualizacao TEXT,
+    orgao_julgador TEXT,
+    PRIMARY KEY (processo_id, registrado_em)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transicoes_status (
+    processo_id INTEGER NOT NULL,
+    data_hora TEXT NOT NULL,
+    status_anterior TEXT,
+    status TEXT NOT NULL,
+    codigo INTEGER,
+    PRIMARY KEY (processo_id, data_hora)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_transicoes_data ON transicoes_status (data_hora);
+"""
+
+
+def normalizar_data_hora(valor):
+    """
+    Converte as datas do DataJud (ISO 8601 ou AAAAMMDDhhmmss) para AAAA-MM-DDThh:mm:ss,
+    que pode ser comparada como texto.
+    """
+    if not valor:
+        return ""
+    if len(valor) >= 10 and valor[4] == "-":
+        return (valor[:19] if len(valor) >= 19 else valor[:10] + "T00:00:00").replace(" ", "T")
+    if len(valor) >= 8 and valor[:8].isdigit():
+        hora = valor[8:14].ljust(6, "0") if valor[8:14].isdigit() else "000000"
+        return f"{valor[:4]}-{valor[4:6]}-{valor[6:8]}T{hora[:2]}:{hora[2:4]}:{hora[4:6]}"
+    return valor
+
+
+def intervalo_semana(ano, semana):
+    """
+    Primeiro e último instante (AAAA-MM-DDThh:mm:ss) da semana ISO `semana` do ano.
+
+    Returns:
+        tuple: (inicio, fim) da semana, de segunda-feira a domingo
+    """
+    quatro_de_janeiro = date(ano, 1, 4)
+    segunda = quatro_de_janeiro - timedelta(days=quatro_de_janeiro.isoweekday() - 1) + timedelta(weeks=semana - 1)
+    domingo = segunda + timedelta(days=6)
+    return f"{segunda.isoformat()}T00:00:00", f"{domingo.isoformat()}T23:59:59"
+
+
+class HistoricoProcessos:
+    """Histórico compacto de movimentos, dados gerais e status dos processos."""
+
+    def __init__(self, caminho=HISTORICO_FILE):
+        self.caminho = caminho
+        self._conexao = None
+        self._trava = threading.RLock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.executescript(ESQUEMA)
+            self._conexao = conexao
+            # Regras de status alteradas desde a última abertura: refazer as transições
+            linha = conexao.execute("SELECT valor FROM metadados WHERE chave = 'regras_status'").fetchone()
+            if linha is None or linha[0] != obter_classificador().assinatura:
+                self.recalcular_status()
+        return self._conexao
+
+    def fechar(self):
+        with self._trava:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+    def _id_processo(self, conexao, tribunal, numero, grau_principal=None):
+        linha = conexao.execute("SELECT id, grau_principal FROM processos WHERE tribunal = ? AND numero = ?",
+                                (tribunal, numero)).fetchone()
+        if linha is None:
+            return conexao.execute("INSERT INTO processos (tribunal, numero, grau_principal) VALUES (?, ?, ?)",
+                                   (tribunal, numero, grau_principal)).lastrowid
+        if grau_principal and linha[1] != grau_principal:
+            conexao.execute("UPDATE processos SET grau_principal = ? WHERE id = ?", (grau_principal, linha[0]))
+        return linha[0]
+
+    def registrar(self, tribunal, resultados, registrado_em=None):
+        """
+        Registra no histórico as respostas de uma consulta.
+
+        Args:
+            tribunal (str): Tipo do tribunal ('TJ' ou 'TRF')
+            resultados (dict): Número -> resposta da API (erros são ignorados)
+            registrado_em (str): Data/hora do registro (padrão: agora)
+
+        Returns:
+            int: Quantidade de movimentos novos gravados
+        """
+        registrado_em = registrado_em or time.strftime("%Y-%m-%dT%H:%M:%S")
+        novos = 0
+        with self._trava:
+            conexao = self._conectar()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for numero, resultado in resultados.items():
+                    fontes = fontes_resultado(resultado) if isinstance(resultado, dict) and "erro" not in resultado else []
+                    if fontes:
+                        novos += self._registrar_processo(conexao, tribunal, numero, fontes, registrado_em)
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+        return novos
+
+    def _registrar_processo(self, conexao, tribunal, numero, fontes, registrado_em):
+        principal = fonte_principal(fontes)
+        processo_id = self._id_processo(conexao, tribunal, numero, principal.get("grau") or "")
+
+        movimentos = []
+        nomes = {}
+        for fonte in fontes:
+            grau = fonte.get("grau") or ""
+            for mov in fonte.get("movimentos") or ():
+                if isinstance(mov, dict) and isinstance(mov.get("codigo"), int) and mov.get("dataHora"):
+                    movimentos.append((processo_id, normalizar_data_hora(mov["dataHora"]), mov["codigo"], grau,
+                                       registrado_em))
+                    if mov.get("nome"):
+                        nomes[mov["codigo"]] = mov["nome"]
+        conexao.executemany("INSERT OR IGNORE INTO nomes_movimento (codigo, nome) VALUES (?, ?)", nomes.items())
+        antes = conexao.total_changes
+        conexao.executemany("INSERT OR IGNORE INTO movimentos (processo_id, data_hora, codigo, grau, registrado_em) "
+                            "VALUES (?, ?, ?, ?, ?)", movimentos)
+        novos = conexao.total_changes - antes
+
+        # Dados gerais: um novo registro apenas quando algum deles muda
+        orgao = principal.get("orgaoJulgador")
+        estado = (normalizar_data_hora(principal.get("dataHoraUltimaAtualizacao")) or None,
+                  orgao.get("nome") if isinstance(orgao, dict) else orgao)
+        ultimo = conexao.execute("SELECT ultima_atualizacao, orgao_julgador FROM estados WHERE processo_id = ? "
+                                 "ORDER BY registrado_em DESC LIMIT 1", (processo_id,)).fetchone()
+        if ultimo is None or tuple(ultimo) != estado:
+            conexao.execute("INSERT OR REPLACE INTO estados (processo_id, registrado_em, ultima_atualizacao, "
+                            "orgao_julgador) VALUES (?, ?, ?, ?)", (processo_id, registrado_em) + estado)
+
+        if novos:
+            self._recalcular_transicoes(conexao, processo_id, principal.get("grau") or "")
+        return novos
+
+    def _recalcular_transicoes(self, conexao, processo_id, grau):
+        """Refaz as mudanças de status do processo a partir dos movimentos com status."""
+        classificador = obter_classificador()
+        regras = classificador.regras
+        codigos = list(regras)
+        if codigos:
+            linhas = conexao.execute(
+                f"SELECT data_hora, codigo FROM movimentos WHERE processo_id = ? AND grau = ? "
+                f"AND codigo IN ({','.join('?' * len(codigos))})", [processo_id, grau] + codigos).fetchall()
+        else:
+            # Sem regras de status não há transições ("IN ()" seria um erro de sintaxe);
+            # as gravadas com as regras anteriores são apagadas abaixo
+            linhas = []
+        # Apenas os movimentos que definem status são ordenados (na ordem de aplicação das regras)
+        linhas.sort(key=lambda linha: (linha[0], regras[linha[1]][1]))
+
+        transicoes = []
+        status_atual = classificador.padrao
+        for data_hora, codigo in linhas:
+            status = regras[codigo][0]
+            if transicoes and transicoes[-1][1] == data_hora:
+                # Movimentos na mesma data: prevalece o de maior precedência (o último na ordenação)
+                status_atual = transicoes.pop()[2]
+            if status != status_atual:
+                transicoes.append((processo_id, data_hora, status_atual, status, codigo))
+                status_atual = status
+        conexao.execute("DELETE FROM transicoes_status WHERE processo_id = ?", (processo_id,))
+        conexao.executemany("INSERT INTO transicoes_status (processo_id, data_hora, status_anterior, status, "
+                            "codigo) VALUES (?, ?, ?, ?, ?)", transicoes)
+
+    def recalcular_status(self):
+        """Refaz as mudanças de status de todos os processos (após mudar STATUS_MOVIMENTOS)."""
+        with self._trava:
+            conexao = self._conectar()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for processo_id, grau in conexao.execute("SELECT id, grau_principal FROM processos").fetchall():
+                    self._recalcular_transicoes(conexao, processo_id, grau or "")
+                conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('regras_status', ?)",
+                                (obter_classificador().assinatura,))
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+
+    def estado_em(self, numero, data, tribunal=None):
+        """
+        Situação do processo em uma data, a partir do histórico local.
+
+        Args:
+            numero (str): Número do processo
+            data (str): Data AAAA-MM-DD (considera o dia inteiro) ou data/hora ISO
+            tribunal (str): 'TJ' ou 'TRF' (opcional se o número for único)
+
+        Returns:
+            dict: numero, data, status, desde (data da última mudança de
+                status), ultimo_movimento, movimentos (quantidade até a data),
+                ultima_atualizacao e orgao_julgador registrados; None se o
+                processo não estiver no histórico
+        """
+        limite = normalizar_data_hora(data)
+        if len(data) <= 10:
+            limite = limite[:10] + "T23:59:59"
+
+        with self._trava:
+            conexao = self._conectar()
+            condicao, parametros = "numero = ?", [numero]
+            if tribunal:
+                condicao, parametros = "numero = ? AND tribunal = ?", [numero, tribunal]
+            processo = conexao.execute(f"SELECT id, tribunal FROM processos WHERE {condicao}", parametros).fetchone()
+            if processo is None:
+                return None
+            processo_id = processo[0]
+
+            transicao = conexao.execute(
+                "SELECT data_hora, status FROM transicoes_status WHERE processo_id = ? AND data_hora <= ? "
+                "ORDER BY data_hora DESC LIMIT 1", (processo_id, limite)).fetchone()
+            ultimo = conexao.execute(
+                "SELECT m.data_hora, m.codigo, n.nome FROM movimentos m LEFT JOIN nomes_movimento n "
+                "ON n.codigo = m.codigo WHERE m.processo_id = ? AND m.data_hora <= ? "
+                "ORDER BY m.data_hora DESC LIMIT 1", (processo_id, limite)).fetchone()
+            quantidade = conexao.execute("SELECT COUNT(*) FROM movimentos WHERE processo_id = ? AND data_hora <= ?",
+                                         (processo_id, limite)).fetchone()[0]
+            estado = conexao.execute(
+                "SELECT ultima_atualizacao, orgao_julgador FROM estados WHERE processo_id = ? AND registrado_em <= ? "
+                "ORDER BY registrado_em DESC LIMIT 1", (processo_id, limite)).fetchone()
+
+        return {
+            "numero": numero,
+            "tribunal": processo[1],
+            "data": limite,
+            "status": transicao[1] if transicao else obter_classificador().padrao,
+            "desde": transicao[0] if transicao else None,
+            "ultimo_movimento": {"data_hora": ultimo[0], "codigo": ultimo[1], "nome": ultimo[2]} if ultimo else None,
+            "movimentos": quantidade,
+            "ultima_atualizacao": estado[0] if estado else None,
+            "orgao_julgador": estado[1] if estado else None
+        }
+
+    def mudancas_status(self, inicio, fim, tribunal=None):
+        """
+        Mudanças de status com data entre `inicio` e `fim` (inclusive).
+
+        Returns:
+            list: Dicionários com numero, tribunal, data_hora, status_anterior,
+                status e codigo, em ordem cronológica
+        """
+        consulta = ("SELECT p.numero, p.tribunal, t.data_hora, t.status_anterior, t.status, t.codigo "
+                    "FROM transicoes_status t JOIN processos p ON p.id = t.processo_id "
+                    "WHERE t.data_hora BETWEEN ? AND ?")
+        parametros = [normalizar_data_hora(inicio), normalizar_data_hora(fim)]
+        if tribunal:
+            consulta += " AND p.tribunal = ?"
+            parametros.append(tribunal)
+        with self._trava:
+            linhas = self._conectar().execute(consulta + " ORDER BY t.data_hora", parametros).fetchall()
+        campos = ("numero", "tribunal", "data_hora", "status_anterior", "status", "codigo")
+        return [dict(zip(campos, linha)) for linha in linhas]
+
+    def mudancas_status_semana(self, ano, semana, tribunal=None):
+        """Mudanças de status na semana ISO `semana` do `ano`."""
+        inicio, fim = intervalo_semana(ano, semana)
+        return self.mudancas_status(inicio, fim, tribunal)
+
+
+_historico = None
+_trava_historico = threading.Lock()
+
+
+def obter_historico():
+    """Histórico compartilhado, em HISTORICO_FILE."""
+    global _historico
+    with _trava_historico:
+        if _historico is None:
+            _historico = HistoricoProcessos()
+        return _historico
+
+
+def registrar_no_historico(tribunal, resultados):
+    """
+    Registra respostas no histórico sem interromper a consulta em caso de falha.
+
+    Returns:
+        int: Quantidade de movimentos novos (0 em caso de erro)
+    """
+    try:
+        return obter_historico().registrar(tribunal, resultados)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Erro ao registrar o histórico dos processos {tribunal}: {str(e)}")
+        return 0
+
+
+def importar_cache(tribunal, armazenamento, tamanho_lote=500):
+    """
+    Registra no histórico os resultados já gravados no cache (útil na primeira
+    utilização do histórico).
+
+    Args:
+        tribunal (str): Tipo do tribunal ('TJ' ou 'TRF')
+        armazenamento: Resultados gravados (ArmazenamentoResultados ou ResultadosSQLite)
+        tamanho_lote (int): Processos por transação
+
+    Returns:
+        int: Quantidade de movimentos novos
+    """
+    historico = obter_historico()
+    novos = 0
+    lote = {}
+    for numero, resultado in armazenamento.items():
+        lote[numero] = resultado
+        if len(lote) >= tamanho_lote:
+            novos += historico.registrar(tribunal, lote)
+            lote = {}
+    if lote:
+        novos += historico.registrar(tribunal, lote)
+    return novos
@@ -0,0 +1,150 @@
+"""
+Importação em lote de números de processo a partir de arquivos TXT, CSV ou XLSX.
+O arquivo é lido em fluxo (linha a linha ou, no XLSX, linha a linha da planilha);
+os números são aceitos no formato de 20 dígitos ou no formato CNJ
+(NNNNNNN-DD.AAAA.J.TR.OOOO) e encaminhados ao TJ ou ao TRF pelos segmentos J e TR.
+"""
+
+import csv
+import os
+import re
+from ..config import IMPORTACAO_TRIBUNAIS
+from .cnj import normalizar_numero
+from .registro import obter_registro
+
+# Número CNJ formatado ou 20 dígitos sem separadores. "\d" também encontra
+# dígitos não ASCII, que `normalizar_numero` recusa: esses números são
+# contados como inválidos em vez de ignorados em silêncio
+PADRAO_NUMERO_CNJ = re.compile(r"(?<!\d)(\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}|\d{20})(?!\d)")
+
+EXTENSOES_SUPORTADAS = (".txt", ".csv", ".xlsx")
+
+# Menor número CNJ possível sem os zeros à esquerda (dígito verificador >= 02),
+# usado para não tratar células numéricas comuns (quantidades, anos) como processos
+MENOR_NUMERO_CELULA = 2 * 10 ** 11
+
+
+def extrair_numeros(texto):
+    """
+    Encontra os números de processo em um trecho de texto.
+
+    Args:
+        texto (str): Linha de um arquivo TXT/CSV ou célula de planilha
+
+    Returns:
+        list: Números encontrados, já normalizados para 20 dígitos; None no
+            lugar dos que não puderam ser normalizados (dígitos não ASCII)
+    """
+    return [normalizar_numero(numero) for numero in PADRAO_NUMERO_CNJ.findall(texto)]
+
+
+def identificar_tribunal(numero):
+    """
+    Identifica o tipo do tribunal pelos segmentos J (justiça) e TR (tribunal).
+
+    Args:
+        numero (str): Número de 20 dígitos (NNNNNNNDDAAAAJTROOOO)
+
+    Returns:
+        str: 'TJ', 'TRF' ou None se o tribunal não for atendido
+    """
+    return IMPORTACAO_TRIBUNAIS.get((numero[13], numero[14:16]))
+
+
+def _linhas_texto(caminho):
+    """Lê um arquivo TXT ou CSV linha a linha."""
+    with open(caminho, 'r', encoding='utf-8-sig', errors='replace', newline='') as arquivo:
+        if caminho.lower().endswith(".csv"):
+            for linha in csv.reader(arquivo, delimiter=_detectar_delimitador(arquivo)):
+                yield " ".join(linha)
+        else:
+            yield from arquivo
+
+
+def _detectar_delimitador(arquivo):
+    """Detecta o delimitador do CSV pela primeira linha (',' ou ';')."""
+    primeira_linha = arquivo.readline()
+    arquivo.seek(0)
+    return ";" if primeira_linha.count(";") > primeira_linha.count(",") else ","
+
+
+def _texto_celula(celula):
+    """
+    Converte uma célula de planilha em texto. Números inteiros (ou float
+    sem parte decimal) com até 20 dígitos voltam a ter os zeros à esquerda
+    que a planilha descartou, sem a notação científica de `str`.
+    """
+    if isinstance(celula, float) and celula.is_integer():
+        celula = int(celula)
+    if isinstance(celula, int) and not isinstance(celula, bool) and MENOR_NUMERO_CELULA <= celula < 10 ** 20:
+        return f"{celula:020d}"
+    return str(celula)
+
+
+def _linhas_planilha(caminho):
+    """Lê as linhas de todas as abas de um arquivo XLSX em modo somente leitura."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("A importação de arquivos XLSX requer o pacote openpyxl (pip install openpyxl).")
+
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        for aba in planilha.worksheets:
+            for linha in aba.iter_rows(values_only=True):
+                yield " ".join(_texto_celula(celula) for celula in linha if celula is not None)
+    finally:
+        planilha.close()
+
+
+def ler_numeros_arquivo(caminho):
+    """
+    Lê os números de processo de um arquivo, sem carregá-lo inteiro na memória.
+
+    Args:
+        caminho (str): Caminho do arquivo TXT, CSV ou XLSX
+
+    Yields:
+        str: Números de 20 dígitos, na ordem do arquivo (None para os que não
+            puderam ser normalizados)
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in EXTENSOES_SUPORTADAS:
+        raise ValueError(f"Formato de arquivo não suportado: {extensao}. Use TXT, CSV ou XLSX.")
+
+    linhas = _linhas_planilha(caminho) if extensao == ".xlsx" else _linhas_texto(caminho)
+    for linha in linhas:
+        yield from extrair_numeros(linha)
+
+
+def importar_processos(caminho):
+    """
+    Importa os números de processo de um arquivo para as listas do TJ e do TRF,
+    com uma única gravação por lista.
+
+    Args:
+        caminho (str): Caminho do arquivo TXT, CSV ou XLSX
+
+    Returns:
+        dict: Resumo por tipo ("TJ" e "TRF", no formato de RegistroProcessos.adicionar),
+            além de "outros_tribunais" (números de tribunais não atendidos) e
+            "invalidos" (quantidade de números que não puderam ser normalizados)
+    """
+    por_tribunal = {"TJ": [], "TRF": []}
+    outros_tribunais = []
+    invalidos = 0
+
+    for numero in ler_numeros_arquivo(caminho):
+        if numero is None:
+            invalidos += 1
+            continue
+        tipo = identificar_tribunal(numero)
+        if tipo:
+            por_tribunal[tipo].append(numero)
+        else:
+            outros_tribunais.append(numero)
+
+    resumo = {tipo: obter_registro(tipo).adicionar(numeros) for tipo, numeros in por_tribunal.items()}
+    resumo["outros_tribunais"] = outros_tribunais
+    resumo["invalidos"] = invalidos
+    return resumo
@@ -0,0 +1,226 @@
+"""
+Registro dos processos cadastrados de cada tribunal.
+Mantém os números em memória no registro compacto (arrays de inteiros de 64
+bits, ver RegistroCompacto), com buscas binárias em O(log n), e grava
+inclusões e exclusões em lote com uma única escrita no arquivo (ou uma única
+transação no banco).
+"""
+
+import os
+import threading
+from ..config import LISTA_TJ_FILE, LISTA_TRF_FILE, ARMAZENAMENTO_MOTOR
+from ..models.registro_compacto import RegistroCompacto
+from .cnj import normalizar_numero, validar_numeros
+from .file_handler import arquivo_corrompido, bloquear_arquivo, carregar_arquivo_json, salvar_arquivo_json
+
+
+class RegistroProcessos:
+    """Processos cadastrados de um tribunal ('TJ' ou 'TRF')."""
+
+    def __init__(self, tipo, caminho=None):
+        self.tipo = tipo
+        self.caminho = caminho or (LISTA_TJ_FILE if tipo == "TJ" else LISTA_TRF_FILE)
+        self._indice = RegistroCompacto(tipo)
+        # Números sem dígito verificador válido (cadastrados antes da validação):
+        # não cabem no registro compacto e são mantidos como estão, para remoção
+        self._legados = {}
+        self._assinatura = None
+        self._trava = threading.RLock()
+
+    @property
+    def _usa_banco(self):
+        return ARMAZENAMENTO_MOTOR == "sqlite"
+
+    def _assinatura_arquivo(self):
+        """Identifica a versão do arquivo em disco (alterada a cada gravação)."""
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+    def _atualizar_indice(self):
+        """Recarrega o índice apenas se o arquivo foi alterado desde a última leitura."""
+        assinatura = self._assinatura_arquivo()
+        if assinatura is not None and assinatura == self._assinatura:
+            return
+        lista = carregar_arquivo_json(self.caminho)
+        if arquivo_corrompido(self.caminho):
+            raise ValueError(f"A lista {self.caminho} não pôde ser lida.")
+        indice = RegistroCompacto(self.tipo)
+        _, invalidos = indice.adicionar(lista or [])
+        self._indice = indice
+        self._legados = dict.fromkeys(numero for numero in invalidos if isinstance(numero, str))
+        self._assinatura = assinatura
+
+    def _gravar_indice(self):
+        """Grava o índice no arquivo da lista, na ordem de cadastro (os legados primeiro)."""
+        if not salvar_arquivo_json(self.caminho, list(self._legados) + self._indice.para_json()):
+            self._assinatura = None
+            return False
+        self._assinatura = self._assinatura_arquivo()
+        return True
+
+    def numeros(self):
+        """Lista dos números cadastrados, na ordem de cadastro."""
+        if self._usa_banco:
+            from .banco_dados import carregar_lista
+            return carregar_lista(self.tipo)
+        with self._trava:
+            self._atualizar_indice()
+            return list(self._legados) + self._indice.para_json()
+
+    def __contains__(self, numero):
+        if self._usa_banco:
+            from .banco_dados import processo_cadastrado
+            return processo_cadastrado(self.tipo, numero)
+        with self._trava:
+            self._atualizar_indice()
+            return numero in self._indice or numero in self._legados
+
+    def __len__(self):
+        if self._usa_banco:
+            from .banco_dados import contar_processos
+            return contar_processos(self.tipo)
+        with self._trava:
+            self._atualizar_indice()
+            return len(self._indice) + len(self._legados)
+
+    def __iter__(self):
+        return iter(self.numeros())
+
+    @staticmethod
+    def _separar_validos(numeros, verificar_digito=True):
+        """
+        Separa números válidos (normalizados para 20 dígitos, sem repetição e
+        na ordem recebida) dos inválidos.
+
+        Args:
+            numeros (iterable): Números de processo
+            verificar_digito (bool): Se False, confere apenas o formato (permite
+                remover números cadastrados antes da verificação do dígito)
+
+        Returns:
+            tuple: (validos, invalidos, repetidos)
+        """
+        if verificar_digito:
+            normalizados, invalidos = validar_numeros(numeros)
+        else:
+            normalizados, invalidos = [], []
+            for numero in numeros:
+                normalizado = normalizar_numero(numero)
+                if normalizado is None:
+                    invalidos.append(numero)
+                else:
+                    normalizados.append(normalizado)
+        validos = {}
+        repetidos = []
+        for numero in normalizados:
+            if numero in validos:
+                repetidos.append(numero)
+            else:
+                validos[numero] = None
+        return list(validos), invalidos, repetidos
+
+    def adicionar(self, numeros):
+        """
+        Cadastra vários números com uma única gravação.
+
+        Args:
+            numeros (iterable): Números de processo
+
+        Returns:
+            dict: Listas "adicionados", "existentes" e "invalidos"; em caso de
+                falha na gravação, também a chave "erro"
+        """
+        validos, invalidos, repetidos = self._separar_validos(numeros)
+        # Números repetidos na própria entrada contam como já cadastrados
+        resumo = {"adicionados": [], "existentes": repetidos, "invalidos": invalidos}
+
+        try:
+            if self._usa_banco:
+                from .banco_dados import adicionar_numeros
+                resumo["adicionados"] = adicionar_numeros(self.tipo, validos)
+                incluidos = set(resumo["adicionados"])
+                resumo["existentes"] += [numero for numero in validos if numero not in incluidos]
+                return resumo
+
+            with self._trava, bloquear_arquivo(self.caminho):
+                self._atualizar_indice()
+                resumo["adicionados"], _ = self._indice.adicionar(validos)
+                incluidos = set(resumo["adicionados"])
+                resumo["existentes"] += [numero for numero in validos if numero not in incluidos]
+                if resumo["adicionados"] and not self._gravar_indice():
+                    raise IOError(f"Erro ao salvar a lista {self.caminho}.")
+        except Exception as e:
+            self._assinatura = None
+            resumo["adicionados"] = []
+            resumo["erro"] = str(e)
+        return resumo
+
+    def remover(self, numeros):
+        """
+        Remove vários números com uma única gravação.
+
+        Args:
+            numeros (iterable): Números de processo
+
+        Returns:
+            dict: Listas "removidos", "ausentes" e "invalidos"; em caso de
+                falha na gravação, também a chave "erro"
+        """
+        validos, invalidos, _ = self._separar_validos(numeros, verificar_digito=False)
+        resumo = {"removidos": [], "ausentes": [], "invalidos": invalidos}
+
+        try:
+            if self._usa_banco:
+                from .banco_dados import remover_numeros
+                resumo["removidos"] = remover_numeros(self.tipo, validos)
+                excluidos = set(resumo["removidos"])
+                resumo["ausentes"] = [numero for numero in validos if numero not in excluidos]
+                return resumo
+
+            with self._trava, bloquear_arquivo(self.caminho):
+                self._atualizar_indice()
+                legados = [numero for numero in validos if numero in self._legados]
+                for numero in legados:
+                    del self._legados[numero]
+                resumo["removidos"] = legados + self._indice.remover(
+                    [numero for numero in validos if numero not in legados])
+                excluidos = set(resumo["removidos"])
+                resumo["ausentes"] = [numero for numero in validos if numero not in excluidos]
+                if resumo["removidos"] and not self._gravar_indice():
+                    raise IOError(f"Erro ao salvar a lista {self.caminho}.")
+        except Exception as e:
+            self._assinatura = None
+            resumo["removidos"] = []
+            resumo["erro"] = str(e)
+        return resumo
+
+
+def descrever_operacao(resumo):
+    """Texto curto com as contagens de uma operação do registro."""
+    if "adicionados" in resumo:
+        partes = [f"{len(resumo['adicionados'])} adicionados", f"{len(resumo['existentes'])} já cadastrados"]
+    else:
+        partes = [f"{len(resumo['removidos'])} removidos", f"{len(resumo['ausentes'])} não cadastrados"]
+    partes.append(f"{len(resumo['invalidos'])} inválidos")
+    texto = ", ".join(partes)
+    if "erro" in resumo:
+        texto += f" (erro: {resumo['erro']})"
+    return texto
+
+
+_registros = {}
+_trava_registros = threading.Lock()
+
+
+def obter_registro(tipo):
+    """Retorna o registro compartilhado do tribunal ('TJ' ou 'TRF')."""
+    tipo = tipo.upper()
+    if tipo not in ("TJ", "TRF"):
+        raise ValueError("Tipo de processo inválido. Deve ser 'TJ' ou 'TRF'.")
+    with _trava_registros:
+        if tipo not in _registros:
+            _registros[tipo] = RegistroProcessos(tipo)
+        return _registros[tipo]
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+from ..config import SINCRONIZACAO_FILE, SINCRONIZACAO_MARGEM_SEGUNDOS
+from .file_handler import atualizar_arquivo_json, carregar_arquivo_json
+
+FORMATO_DATA_HORA = "%Y-%m-%dT%H:%M:%S.000Z"
+
+def momento_atual_utc():
+    """Retorna a data/hora atual em UTC no formato usado pelo DataJud."""
+    return datetime.now(timezone.utc).strftime(FORMATO_DATA_HORA)
+
+def obter_ultima_sincronizacao(tipo):
+    """
+    Retorna a data/hora da última sincronização bem-sucedida do tribunal,
+    já descontada a margem de segurança configurada.
+
+    Args:
+        tipo (str): Tipo do tribunal ('TJ' ou 'TRF')
+
+    Returns:
+        str: Data/hora ISO 8601 (UTC) ou None se nunca houve sincronização
+    """
+    registros = carregar_arquivo_json(SINCRONIZACAO_FILE)
+    if not isinstance(registros, dict) or tipo not in registros:
+        return None
+
+    try:
+        momento = datetime.strptime(registros[tipo], FORMATO_DATA_HORA)
+    except (ValueError, TypeError):
+        print(f"Registro de sincronização {tipo} inválido: {registros[tipo]}")
+        return None
+
+    momento -= timedelta(seconds=SINCRONIZACAO_MARGEM_SEGUNDOS)
+    return momento.strftime(FORMATO_DATA_HORA)
+
+def registrar_sincronizacao(tipo, momento):
+    """
+    Registra a data/hora de início de uma sincronização concluída.
+
+    Args:
+        tipo (str): Tipo do tribunal ('TJ' ou 'TRF')
+        momento (str): Data/hora ISO 8601 (UTC) em que a sincronização começou
+
+    Returns:
+        bool: True se o registro foi salvo com sucesso
+    """
+    def registrar(registros):
+        registros[tipo] = momento
+        return True
+
+    return atualizar_arquivo_json(SINCRONIZACAO_FILE, registrar, padrao=dict) is True